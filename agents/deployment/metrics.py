@@ -0,0 +1,518 @@
+"""In-process metrics registry with a Prometheus text endpoint."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import itertools
+import logging
+import math
+import os
+import threading
+from typing import Any, Callable, Iterable
+import weakref
+
+METRICS_ENABLED_ENV_VAR = "OBSERVABILITY_METRICS_ENABLED"
+METRICS_PORT_ENV_VAR = "OBSERVABILITY_METRICS_PORT"
+METRICS_HOST_ENV_VAR = "OBSERVABILITY_METRICS_HOST"
+DEFAULT_METRICS_HOST = "127.0.0.1"
+METRICS_PATH = "/metrics"
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_LATENCY_BUCKETS = (
+  0.0005,
+  0.001,
+  0.0025,
+  0.005,
+  0.01,
+  0.025,
+  0.05,
+  0.1,
+  0.25,
+  0.5,
+  1.0,
+  2.5,
+  5.0,
+  10.0,
+)
+_FALSY_VALUES = {"0", "false", "no", "off"}
+_LOGGER = logging.getLogger(__name__)
+
+
+def metrics_enabled() -> bool:
+  """Return False when OBSERVABILITY_METRICS_ENABLED disables recording."""
+  value = os.getenv(METRICS_ENABLED_ENV_VAR, "1").strip().lower()
+  return value not in _FALSY_VALUES
+
+
+def _escape_label(value: str) -> str:
+  """Escape a label value for the text exposition format."""
+  return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+  """Return {name="value",...} or an empty string."""
+  if not names:
+    return ""
+  pairs = ",".join(
+    f'{name}="{_escape_label(value)}"' for name, value in zip(names, values)
+  )
+  return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+  """Return a Prometheus-formatted sample value."""
+  if value == math.inf:
+    return "+Inf"
+  if float(value).is_integer():
+    return str(int(value))
+  return repr(float(value))
+
+
+class _ShardedChild:
+  """Per-label-set state split into one cell per recording thread.
+
+  Each thread only mutates its own cell, so recording needs no lock;
+  collection sums every cell and may lag an in-flight update slightly.
+  A cell is folded into a base total once its thread is gone, so
+  short-lived threads do not accumulate cells.
+  """
+
+  def __init__(self, cell_factory: Callable[[], list[float]]) -> None:
+    self._cell_factory = cell_factory
+    self._local = threading.local()
+    self._base = cell_factory()
+    self._cells: dict[int, list[float]] = {}
+    self._cells_lock = threading.Lock()
+    self._keys = itertools.count()
+    # Keys of cells whose thread has exited. Finalizers only append, so
+    # they never wait on _cells_lock from inside a garbage collection.
+    self._retired: deque[int] = deque()
+
+  def _cell(self) -> list[float]:
+    """Return the calling thread's cell, creating it on first use."""
+    cell = getattr(self._local, "cell", None)
+    if cell is None:
+      cell = self._cell_factory()
+      key = next(self._keys)
+      with self._cells_lock:
+        self._fold_retired()
+        self._cells[key] = cell
+      self._local.cell = cell
+      weakref.finalize(threading.current_thread(), self._retired.append, key)
+    return cell
+
+  def _fold_retired(self) -> None:
+    """Add exited threads' cells to the base; caller holds the lock."""
+    while self._retired:
+      cell = self._cells.pop(self._retired.popleft(), None)
+      if cell is None:
+        continue
+      for index, value in enumerate(cell):
+        self._base[index] += value
+
+  def _sum_cells(self, width: int) -> list[float]:
+    """Return the element-wise sum of the base and every live cell."""
+    with self._cells_lock:
+      self._fold_retired()
+      totals = list(self._base)
+      cells = list(self._cells.values())
+    for cell in cells:
+      for index in range(width):
+        totals[index] += cell[index]
+    return totals
+
+
+class CounterChild(_ShardedChild):
+  """Monotonic counter for one label set."""
+
+  def __init__(self) -> None:
+    super().__init__(lambda: [0.0])
+
+  def inc(self, amount: float = 1.0) -> None:
+    """Add amount to the counter."""
+    self._cell()[0] += amount
+
+  def value(self) -> float:
+    """Return the current total."""
+    return self._sum_cells(1)[0]
+
+
+class HistogramChild(_ShardedChild):
+  """Cumulative-bucket histogram for one label set."""
+
+  def __init__(self, buckets: tuple[float, ...]) -> None:
+    self.buckets = buckets
+    # Cell layout: one count per bucket, then +Inf, sum, and count.
+    width = len(buckets) + 3
+    super().__init__(lambda: [0.0] * width)
+
+  def observe(self, value: float) -> None:
+    """Record one observation."""
+    cell = self._cell()
+    cell[bisect_left(self.buckets, value)] += 1
+    cell[-2] += value
+    cell[-1] += 1
+
+  def snapshot(self) -> tuple[list[float], float, float]:
+    """Return (cumulative bucket counts incl. +Inf, sum, count)."""
+    totals = self._sum_cells(len(self.buckets) + 3)
+    cumulative = []
+    running = 0.0
+    for count in totals[:-2]:
+      running += count
+      cumulative.append(running)
+    return cumulative, totals[-2], totals[-1]
+
+
+class _MetricFamily:
+  """A named metric with labelled children."""
+
+  kind = ""
+
+  def __init__(
+    self,
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+  ) -> None:
+    self.name = name
+    self.documentation = documentation
+    self.labelnames = tuple(labelnames)
+    self._children: dict[tuple[str, ...], Any] = {}
+    self._lock = threading.Lock()
+
+  def _new_child(self) -> Any:
+    raise NotImplementedError
+
+  def labels(self, *values: Any) -> Any:
+    """Return the child for a label-value tuple."""
+    key = tuple(map(str, values))
+    child = self._children.get(key)
+    if child is None:
+      if len(key) != len(self.labelnames):
+        raise ValueError(
+          f"{self.name} expects labels {self.labelnames}, got {key}"
+        )
+      with self._lock:
+        child = self._children.get(key)
+        if child is None:
+          child = self._new_child()
+          self._children[key] = child
+    return child
+
+  def children(self) -> list[tuple[tuple[str, ...], Any]]:
+    """Return (label values, child) pairs sorted by labels."""
+    with self._lock:
+      return sorted(self._children.items())
+
+  def render(self) -> list[str]:
+    """Return exposition lines for this family."""
+    lines = [
+      f"# HELP {self.name} {self.documentation}",
+      f"# TYPE {self.name} {self.kind}",
+    ]
+    for values, child in self.children():
+      lines.extend(self._render_child(values, child))
+    return lines
+
+  def _render_child(self, values: tuple[str, ...], child: Any) -> list[str]:
+    raise NotImplementedError
+
+
+class Counter(_MetricFamily):
+  """Counter family."""
+
+  kind = "counter"
+
+  def _new_child(self) -> CounterChild:
+    return CounterChild()
+
+  def inc(self, amount: float = 1.0) -> None:
+    """Increment the unlabelled counter."""
+    self.labels().inc(amount)
+
+  def _render_child(
+    self,
+    values: tuple[str, ...],
+    child: CounterChild,
+  ) -> list[str]:
+    labels = _format_labels(self.labelnames, values)
+    return [f"{self.name}{labels} {_format_value(child.value())}"]
+
+
+class Histogram(_MetricFamily):
+  """Histogram family with fixed buckets."""
+
+  kind = "histogram"
+
+  def __init__(
+    self,
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+    buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+  ) -> None:
+    super().__init__(name, documentation, labelnames)
+    self.buckets = tuple(sorted(buckets))
+
+  def _new_child(self) -> HistogramChild:
+    return HistogramChild(self.buckets)
+
+  def observe(self, value: float) -> None:
+    """Observe a value on the unlabelled histogram."""
+    self.labels().observe(value)
+
+  def _render_child(
+    self,
+    values: tuple[str, ...],
+    child: HistogramChild,
+  ) -> list[str]:
+    cumulative, total, count = child.snapshot()
+    lines = []
+    bounds = [*self.buckets, math.inf]
+    for bound, bucket_count in zip(bounds, cumulative):
+      labels = _format_labels(
+        (*self.labelnames, "le"),
+        (*values, _format_value(bound)),
+      )
+      lines.append(
+        f"{self.name}_bucket{labels} {_format_value(bucket_count)}"
+      )
+    labels = _format_labels(self.labelnames, values)
+    lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+    lines.append(f"{self.name}_count{labels} {_format_value(count)}")
+    return lines
+
+
+class GaugeChild:
+  """Last-set value for one label set."""
+
+  def __init__(self) -> None:
+    self._value = 0.0
+
+  def set(self, value: float) -> None:
+    """Replace the current value."""
+    self._value = float(value)
+
+  def value(self) -> float:
+    """Return the current value."""
+    return self._value
+
+
+class Gauge(_MetricFamily):
+  """Gauge family."""
+
+  kind = "gauge"
+
+  def _new_child(self) -> GaugeChild:
+    return GaugeChild()
+
+  def set(self, value: float) -> None:
+    """Set the unlabelled gauge."""
+    self.labels().set(value)
+
+  def _render_child(
+    self,
+    values: tuple[str, ...],
+    child: GaugeChild,
+  ) -> list[str]:
+    labels = _format_labels(self.labelnames, values)
+    return [f"{self.name}{labels} {_format_value(child.value())}"]
+
+
+FamilyCollector = Callable[[], Iterable[_MetricFamily]]
+
+
+class MetricsRegistry:
+  """Named metric families rendered together in exposition format.
+
+  Collectors registered with register_collector() build extra families
+  on every render, for values that are read rather than recorded.
+  """
+
+  def __init__(self) -> None:
+    self._families: dict[str, _MetricFamily] = {}
+    self._collectors: list[FamilyCollector] = []
+    self._lock = threading.Lock()
+
+  def _get_or_create(self, cls: type, name: str, *args: Any, **kwargs: Any):
+    """Return the existing family or register a new one."""
+    with self._lock:
+      family = self._families.get(name)
+      if family is None:
+        family = cls(name, *args, **kwargs)
+        self._families[name] = family
+      elif not isinstance(family, cls):
+        raise ValueError(f"Metric {name} already registered as {family.kind}")
+      return family
+
+  def counter(
+    self,
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+  ) -> Counter:
+    """Return the counter family called name."""
+    return self._get_or_create(Counter, name, documentation, labelnames)
+
+  def histogram(
+    self,
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+    buckets: Iterable[float] = DEFAULT_LATENCY_BUCKETS,
+  ) -> Histogram:
+    """Return the histogram family called name."""
+    return self._get_or_create(
+      Histogram,
+      name,
+      documentation,
+      labelnames,
+      buckets=buckets,
+    )
+
+  def gauge(
+    self,
+    name: str,
+    documentation: str,
+    labelnames: Iterable[str] = (),
+  ) -> Gauge:
+    """Return the gauge family called name."""
+    return self._get_or_create(Gauge, name, documentation, labelnames)
+
+  def register_collector(self, collector: FamilyCollector) -> None:
+    """Call collector on every render and include its families."""
+    with self._lock:
+      if collector not in self._collectors:
+        self._collectors.append(collector)
+
+  def unregister_collector(self, collector: FamilyCollector) -> None:
+    """Stop calling a collector added with register_collector."""
+    with self._lock:
+      if collector in self._collectors:
+        self._collectors.remove(collector)
+
+  def render(self) -> str:
+    """Return every family in Prometheus text exposition format."""
+    with self._lock:
+      families = [family for _, family in sorted(self._families.items())]
+      collectors = list(self._collectors)
+    for collector in collectors:
+      try:
+        families.extend(collector())
+      except Exception as exc:  # pylint: disable=broad-except
+        _LOGGER.warning("Metrics collector %r failed: %s", collector, exc)
+    lines: list[str] = []
+    for family in families:
+      lines.extend(family.render())
+    return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+CALLS_TOTAL = REGISTRY.counter(
+  "system_monitor_calls_total",
+  "Calls to traced tools and chain functions.",
+  ("kind", "function", "outcome"),
+)
+CALL_DURATION_SECONDS = REGISTRY.histogram(
+  "system_monitor_call_duration_seconds",
+  "Latency of traced tools and chain functions.",
+  ("kind", "function"),
+)
+
+
+def call_recorder(kind: str, function: str) -> Callable[[float, bool], None]:
+  """Return a recorder bound to one function's metric children.
+
+  Label lookup happens once here, so each recorded call only touches the
+  calling thread's cells.
+  """
+  ok_calls = CALLS_TOTAL.labels(kind, function, "ok")
+  failed_calls = CALLS_TOTAL.labels(kind, function, "error")
+  latency = CALL_DURATION_SECONDS.labels(kind, function)
+
+  def _record(elapsed_seconds: float, failed: bool = False) -> None:
+    (failed_calls if failed else ok_calls).inc()
+    latency.observe(elapsed_seconds)
+
+  return _record
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+  """Serve REGISTRY at /metrics."""
+
+  registry: MetricsRegistry = REGISTRY
+
+  def do_GET(self) -> None:  # noqa: N802
+    if self.path.split("?", 1)[0] != METRICS_PATH:
+      self.send_error(404)
+      return
+    body = self.registry.render().encode("utf-8")
+    self.send_response(200)
+    self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+    _LOGGER.debug("metrics %s", format % args)
+
+
+def serve_metrics(
+  port: int,
+  host: str = DEFAULT_METRICS_HOST,
+  registry: MetricsRegistry = REGISTRY,
+) -> ThreadingHTTPServer:
+  """Serve registry on host:port from a daemon thread."""
+  handler = type(
+    "MetricsHandler",
+    (_MetricsHandler,),
+    {"registry": registry},
+  )
+  server = ThreadingHTTPServer((host, port), handler)
+  server.daemon_threads = True
+  thread = threading.Thread(
+    target=server.serve_forever,
+    name="metrics-http",
+    daemon=True,
+  )
+  thread.start()
+  return server
+
+
+_SERVER: ThreadingHTTPServer | None = None
+_SERVER_LOCK = threading.Lock()
+
+
+def start_metrics_server() -> bool:
+  """Start the /metrics endpoint when OBSERVABILITY_METRICS_PORT is set.
+
+  Returns:
+    True when the endpoint is serving; otherwise False.
+  """
+  global _SERVER
+  raw_port = os.getenv(METRICS_PORT_ENV_VAR)
+  if not raw_port:
+    return False
+  with _SERVER_LOCK:
+    if _SERVER is None:
+      try:
+        _SERVER = serve_metrics(
+          int(raw_port),
+          os.getenv(METRICS_HOST_ENV_VAR, DEFAULT_METRICS_HOST),
+        )
+      except (OSError, ValueError) as exc:
+        _LOGGER.warning("Metrics endpoint failed to start: %s", exc)
+        return False
+  return True
+
+
+def stop_metrics_server() -> None:
+  """Shut down the endpoint started by start_metrics_server."""
+  global _SERVER
+  with _SERVER_LOCK:
+    if _SERVER is not None:
+      _SERVER.shutdown()
+      _SERVER.server_close()
+      _SERVER = None
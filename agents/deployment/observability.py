@@ -2,15 +2,30 @@
 
 from __future__ import annotations
 
+import functools
+import inspect
 import logging
 import os
-from typing import Any
+import random
+import threading
+import time
+from typing import Any, Callable
+import weakref
 
+from .metrics import call_recorder, metrics_enabled
+
+TRACE_SAMPLE_RATE_ENV_VAR = "OBSERVABILITY_TRACE_SAMPLE_RATE"
+TRACE_SAMPLE_RATES_ENV_VAR = "OBSERVABILITY_TRACE_SAMPLE_RATES"
+TRACE_EXCLUDE_ENV_VAR = "OBSERVABILITY_TRACE_EXCLUDE"
+TRACE_AGGREGATE_ENV_VAR = "OBSERVABILITY_TRACE_AGGREGATE"
+TRACE_AGGREGATION_ENV_VAR = "OBSERVABILITY_TRACE_AGGREGATION"
+AGGREGATE_ATTRIBUTE_PREFIX = "aggregated"
 _DEFAULT_PROJECT_NAME = ""
 _LOGGER = logging.getLogger(__name__)
 _ARIZE_CONFIGURED = False
 _TRACER_PROVIDER = None
 _TRACER = None
+_BINDING_GENERATION = 0
 
 
 def configure_arize_ax() -> bool:
@@ -48,14 +63,26 @@ def configure_arize_ax() -> bool:
   if endpoint:
     register_kwargs["endpoint"] = endpoint
 
-  tracer_provider = register(**register_kwargs)
-  GoogleADKInstrumentor().instrument(tracer_provider=tracer_provider)
+  try:
+    tracer_provider = register(**register_kwargs)
+    GoogleADKInstrumentor().instrument(tracer_provider=tracer_provider)
+  except Exception as exc:  # pylint: disable=broad-except
+    _LOGGER.warning("Arize AX registration failed: %s", exc)
+    return False
   global _TRACER_PROVIDER
   _TRACER_PROVIDER = tracer_provider
   _ARIZE_CONFIGURED = True
+  rebind_tracing()
   return True
 
 
+def rebind_tracing() -> None:
+  """Make every decorated function re-resolve its tracer on next call."""
+  global _BINDING_GENERATION, _TRACER
+  _TRACER = None
+  _BINDING_GENERATION += 1
+
+
 def _get_tracer():
   """Return the configured tracer when available."""
   if not _ARIZE_CONFIGURED:
@@ -70,25 +97,257 @@ def _get_tracer():
   return _TRACER
 
 
-def trace_chain(*args, **kwargs):
-  """Return a tracer chain decorator or a no-op decorator."""
-  tracer = _get_tracer()
-  if tracer is not None and hasattr(tracer, "chain"):
-    return tracer.chain(*args, **kwargs)
+def _env_names(name: str) -> frozenset[str]:
+  """Return a comma-separated env var as a set of function names."""
+  return frozenset(
+    item.strip() for item in os.getenv(name, "").split(",") if item.strip()
+  )
 
-  def _decorator(func):
-    return func
 
-  return _decorator
+def _env_rates() -> dict[str, float]:
+  """Parse 'name=rate,...' per-function sample rates."""
+  rates: dict[str, float] = {}
+  for item in os.getenv(TRACE_SAMPLE_RATES_ENV_VAR, "").split(","):
+    name, _, rate = item.partition("=")
+    if not name.strip():
+      continue
+    try:
+      rates[name.strip()] = float(rate)
+    except ValueError:
+      _LOGGER.warning("Ignoring invalid trace sample rate: %s", item)
+  return rates
+
+
+def _function_names(func: Callable) -> tuple[str, str]:
+  """Return the short and module-qualified names used for matching."""
+  return func.__name__, f"{func.__module__}.{func.__qualname__}"
+
+
+def _aggregation_enabled() -> bool:
+  """Return False when OBSERVABILITY_TRACE_AGGREGATION disables it."""
+  value = os.getenv(TRACE_AGGREGATION_ENV_VAR, "1").strip().lower()
+  return value not in {"0", "false", "no", "off"}
+
+
+def _sample_rate(func: Callable, default: float | None) -> float:
+  """Return the configured sample rate for func."""
+  rates = _env_rates()
+  for name in _function_names(func):
+    if name in rates:
+      return rates[name]
+  if default is not None:
+    return default
+  try:
+    return float(os.getenv(TRACE_SAMPLE_RATE_ENV_VAR, "1"))
+  except ValueError:
+    return 1.0
+
+
+def _matches(func: Callable, env_var: str) -> bool:
+  """Return whether func is listed in a comma-separated env var."""
+  names = _env_names(env_var)
+  return any(name in names for name in _function_names(func))
+
+
+_SPAN_AGGREGATES: "weakref.WeakKeyDictionary[Any, dict[str, list[float]]]" = (
+  weakref.WeakKeyDictionary()
+)
+_SPAN_AGGREGATES_LOCK = threading.Lock()
+
+
+def _record_on_parent(name: str, elapsed: float) -> None:
+  """Fold one call of name into count/total/max attributes on the span."""
+  from opentelemetry import trace as otel_trace
+
+  span = otel_trace.get_current_span()
+  if not span.is_recording():
+    return
+  elapsed_ms = elapsed * 1000
+  with _SPAN_AGGREGATES_LOCK:
+    stats = _SPAN_AGGREGATES.setdefault(span, {})
+    entry = stats.get(name)
+    if entry is None:
+      entry = stats[name] = [0, 0.0, 0.0]
+    entry[0] += 1
+    entry[1] += elapsed_ms
+    entry[2] = max(entry[2], elapsed_ms)
+    count, total_ms, max_ms = entry
+  prefix = f"{AGGREGATE_ATTRIBUTE_PREFIX}.{name}"
+  span.set_attribute(f"{prefix}.calls", count)
+  span.set_attribute(f"{prefix}.total_ms", round(total_ms, 4))
+  span.set_attribute(f"{prefix}.max_ms", round(max_ms, 4))
+
+
+def _aggregated(func: Callable) -> Callable:
+  """Wrap func so its timings land on the parent span, not a new one."""
+  name = func.__name__
+  if inspect.iscoroutinefunction(func):
+
+    @functools.wraps(func)
+    async def _async_wrapper(*args, **kwargs):
+      start = time.perf_counter()
+      try:
+        return await func(*args, **kwargs)
+      finally:
+        _record_on_parent(name, time.perf_counter() - start)
+
+    return _async_wrapper
+
+  @functools.wraps(func)
+  def _wrapper(*args, **kwargs):
+    start = time.perf_counter()
+    try:
+      return func(*args, **kwargs)
+    finally:
+      _record_on_parent(name, time.perf_counter() - start)
+
+  return _wrapper
+
 
+def _sampled(func: Callable, traced: Callable, rate: float) -> Callable:
+  """Call traced for a rate fraction of calls and func otherwise."""
+  if inspect.iscoroutinefunction(func):
 
-def trace_tool(*args, **kwargs):
-  """Return a tracer tool decorator or a no-op decorator."""
+    @functools.wraps(func)
+    async def _async_wrapper(*args, **kwargs):
+      target = traced if random.random() < rate else func
+      return await target(*args, **kwargs)
+
+    return _async_wrapper
+
+  @functools.wraps(func)
+  def _wrapper(*args, **kwargs):
+    target = traced if random.random() < rate else func
+    return target(*args, **kwargs)
+
+  return _wrapper
+
+
+def _metered(func: Callable, impl: Callable, kind: str) -> Callable:
+  """Wrap impl so each call lands in the in-process metrics registry."""
+  record = call_recorder(kind, func.__name__)
+  if inspect.iscoroutinefunction(func):
+
+    @functools.wraps(func)
+    async def _async_wrapper(*args, **kwargs):
+      start = time.perf_counter()
+      failed = True
+      try:
+        result = await impl(*args, **kwargs)
+        failed = False
+        return result
+      finally:
+        record(time.perf_counter() - start, failed)
+
+    return _async_wrapper
+
+  @functools.wraps(func)
+  def _wrapper(*args, **kwargs):
+    start = time.perf_counter()
+    failed = True
+    try:
+      result = impl(*args, **kwargs)
+      failed = False
+      return result
+    finally:
+      record(time.perf_counter() - start, failed)
+
+  return _wrapper
+
+
+def _bind(
+  func: Callable,
+  kind: str,
+  args: tuple,
+  kwargs: dict[str, Any],
+  sample_rate: float | None,
+  aggregate: bool,
+) -> Callable:
+  """Return the implementation func should run under current settings."""
   tracer = _get_tracer()
-  if tracer is not None and hasattr(tracer, "tool"):
-    return tracer.tool(*args, **kwargs)
+  decorate = getattr(tracer, kind, None) if tracer is not None else None
+  if decorate is None or _matches(func, TRACE_EXCLUDE_ENV_VAR):
+    return func
+  aggregated = aggregate and _aggregation_enabled()
+  if aggregated or _matches(func, TRACE_AGGREGATE_ENV_VAR):
+    return _aggregated(func)
+  rate = _sample_rate(func, sample_rate)
+  if rate <= 0:
+    return func
+  traced = decorate(*args, **kwargs)(func)
+  if rate >= 1:
+    return traced
+  return _sampled(func, traced, rate)
+
+
+def _trace_decorator(
+  kind: str,
+  args: tuple,
+  kwargs: dict[str, Any],
+  sample_rate: float | None,
+  aggregate: bool,
+):
+  """Return a decorator that binds the tracing policy on first call.
+
+  Nothing tracer-related is imported or configured at decoration time.
+  Each wrapper resolves its implementation lazily and re-resolves after
+  configure_arize_ax() or rebind_tracing(), so tracing can be switched on
+  in a running process. Non-aggregated functions also record call counts
+  and latency in deployment.metrics whether or not tracing is on.
+  """
 
   def _decorator(func):
-    return func
+    binding: list[Any] = [-1, func]
+
+    def _resolve() -> Callable:
+      generation = _BINDING_GENERATION
+      if binding[0] != generation:
+        impl = _bind(func, kind, args, kwargs, sample_rate, aggregate)
+        if not aggregate and metrics_enabled():
+          impl = _metered(func, impl, kind)
+        binding[1] = impl
+        binding[0] = generation
+      return binding[1]
+
+    if inspect.iscoroutinefunction(func):
+
+      @functools.wraps(func)
+      async def _async_wrapper(*call_args, **call_kwargs):
+        return await _resolve()(*call_args, **call_kwargs)
+
+      return _async_wrapper
+
+    @functools.wraps(func)
+    def _wrapper(*call_args, **call_kwargs):
+      return _resolve()(*call_args, **call_kwargs)
+
+    return _wrapper
 
   return _decorator
+
+
+def trace_chain(
+  *args,
+  sample_rate: float | None = None,
+  aggregate: bool = False,
+  **kwargs,
+):
+  """Return a chain-span decorator, or a no-op when tracing is off.
+
+  Args:
+    sample_rate: Fraction of calls that get a span; overridden per
+      function by OBSERVABILITY_TRACE_SAMPLE_RATES.
+    aggregate: Record call count and latency on the parent span instead
+      of opening a span per call. Meant for tiny hot-path helpers.
+  """
+  return _trace_decorator("chain", args, kwargs, sample_rate, aggregate)
+
+
+def trace_tool(
+  *args,
+  sample_rate: float | None = None,
+  aggregate: bool = False,
+  **kwargs,
+):
+  """Return a tool-span decorator, or a no-op when tracing is off."""
+  return _trace_decorator("tool", args, kwargs, sample_rate, aggregate)
@@ -1,16 +1,39 @@
 """Root agent for OneClickSystemMonitor."""
 
+import os
+
 from google.adk.agents import ParallelAgent, SequentialAgent
 from google.adk.agents.run_config import RunConfig, StreamingMode
 
-from .callbacks import only_ram_after_agent_callback, skip_agent_if_requested
+from deployment.metrics import start_metrics_server
 from deployment.observability import configure_arize_ax
+
+from .callbacks import only_ram_after_agent_callback, skip_agent_if_requested
+from .exporter import start_host_exporter
+from .metric_store import start_metric_store
+from .sub_agents.collector.agent import direct_collector_agent
 from .sub_agents.cpu.agent import cpu_agent
 from .sub_agents.disk.agent import disk_agent
 from .sub_agents.memory.agent import memory_agent
+from .sub_agents.process.agent import process_agent
 from .sub_agents.summary.agent import summary_agent
+from .tools.sampler import start_background_sampler
 
+# Instrument ADK before any Runner starts so the first run's root, agent,
+# and LLM spans are exported; tool decorators still bind lazily.
 configure_arize_ax()
+start_background_sampler()
+start_metric_store()
+start_host_exporter()
+start_metrics_server()
+
+COLLECTION_MODE_ENV_VAR = "SYSTEM_MONITOR_COLLECTION_MODE"
+LLM_COLLECTION_MODE = "llm"
+DIRECT_COLLECTION_MODE = "direct"
+COLLECTION_MODE = os.getenv(
+  COLLECTION_MODE_ENV_VAR,
+  LLM_COLLECTION_MODE,
+).strip().lower()
 
 RUN_CONFIG = RunConfig(
   streaming_mode=StreamingMode.NONE,
@@ -18,11 +41,14 @@ RUN_CONFIG = RunConfig(
   custom_metadata={"trace": "oneclicksystemmonitor"},
 )
 
-system_info_gatherer = ParallelAgent(
-  name="system_info_gatherer",
-  description="Collects CPU, memory, and disk stats in parallel.",
-  sub_agents=[cpu_agent, memory_agent, disk_agent],
-)
+if COLLECTION_MODE == DIRECT_COLLECTION_MODE:
+  system_info_gatherer = direct_collector_agent
+else:
+  system_info_gatherer = ParallelAgent(
+    name="system_info_gatherer",
+    description="Collects CPU, memory, disk, and process stats in parallel.",
+    sub_agents=[cpu_agent, memory_agent, disk_agent, process_agent],
+  )
 
 root_agent = SequentialAgent(
   name="oneclick_system_monitor",
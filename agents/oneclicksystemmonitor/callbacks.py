@@ -9,27 +9,55 @@ import os
 from pathlib import Path
 from typing import Any, Optional, TYPE_CHECKING
 
+from google.adk.models import LlmResponse
 from google.genai import types
 
+from deployment.metrics import REGISTRY
 from deployment.observability import trace_chain
 
+from .log_writer import (
+  DEFAULT_BACKUP_COUNT,
+  DEFAULT_MAX_BYTES,
+  BatchedJsonlWriter,
+  get_jsonl_writer,
+)
+from .redaction import SENSITIVE_KEY_FRAGMENTS, Redactor
+from .severity import calibrate_severity
+from .severity_cache import get_severity_cache, parse_severity_response
+from .summary_log import (
+  CONTEXT_KEYS,
+  METRIC_KEYS,
+  SUMMARY_INPUT_SCHEMA_V1,
+  encode_summary_record,
+)
+from .tools.env import env_int
+
 SKIP_KEYWORD = "skip"
 ONLY_RAM_KEYWORD = "only ram"
 SKIP_RESPONSE = "Skipping agent execution as requested."
 RAM_UNAVAILABLE_RESPONSE = "Total RAM: unavailable."
 RAM_RESPONSE_TEMPLATE = "Total RAM: {total_gb} GB"
-SUMMARY_INPUT_SCHEMA_VERSION = "summary-input-v1"
 DEFAULT_SUMMARY_INPUT_LOG_PATH = "agents/summary_agent_inputs.jsonl"
-REDACTED_VALUE = "[REDACTED]"
-SENSITIVE_KEY_FRAGMENTS = (
-  "api_key",
-  "apikey",
-  "token",
-  "secret",
-  "password",
-  "passwd",
-)
+SUMMARY_LOG_MAX_BYTES_ENV_VAR = "SUMMARY_AGENT_INPUT_LOG_MAX_BYTES"
+SUMMARY_LOG_BACKUPS_ENV_VAR = "SUMMARY_AGENT_INPUT_LOG_BACKUPS"
+SUMMARY_LOG_COMPRESS_ENV_VAR = "SUMMARY_AGENT_INPUT_LOG_COMPRESS"
+SUMMARY_LOG_MAX_VALUE_CHARS_ENV_VAR = "SUMMARY_AGENT_INPUT_MAX_VALUE_CHARS"
+SUMMARY_LOG_MAX_ITEMS_ENV_VAR = "SUMMARY_AGENT_INPUT_MAX_ITEMS"
 _LOGGER = logging.getLogger(__name__)
+SEVERITY_DECISIONS = REGISTRY.counter(
+  "system_monitor_severity_decisions_total",
+  "Severity verdicts by where they came from.",
+  ("source",),
+)
+SEVERITY_CACHE_LOOKUPS = REGISTRY.counter(
+  "system_monitor_severity_cache_lookups_total",
+  "Severity cache lookups by result.",
+  ("result",),
+)
+SUMMARY_INPUTS_LOGGED = REGISTRY.counter(
+  "system_monitor_summary_inputs_logged_total",
+  "Summary-agent inputs queued for the capture log.",
+)
 
 
 def _find_repo_root() -> Path:
@@ -42,6 +70,7 @@ def _find_repo_root() -> Path:
 
 if TYPE_CHECKING:
   from google.adk.agents.callback_context import CallbackContext
+  from google.adk.models import LlmRequest
 
 
 @trace_chain()
@@ -85,35 +114,14 @@ def _snapshot_state(state: Any) -> dict[str, Any]:
 
 
 @trace_chain()
-def _redact_sensitive(
-  value: Any,
-  path: list[str],
-  redacted: list[str],
-) -> Any:
-  """Recursively redact likely secrets from payloads."""
-  if isinstance(value, dict):
-    sanitized: dict[str, Any] = {}
-    for key, item in value.items():
-      key_text = str(key)
-      lowered = key_text.lower()
-      if any(fragment in lowered for fragment in SENSITIVE_KEY_FRAGMENTS):
-        redacted.append(".".join(path + [key_text]))
-        sanitized[key_text] = REDACTED_VALUE
-      else:
-        sanitized[key_text] = _redact_sensitive(
-          item,
-          path + [key_text],
-          redacted,
-        )
-    return sanitized
-
-  if isinstance(value, list):
-    return [
-      _redact_sensitive(item, path + [str(index)], redacted)
-      for index, item in enumerate(value)
-    ]
-
-  return value
+def _redact_sensitive(value: Any) -> tuple[Any, list[str]]:
+  """Return a redacted copy of value and the paths that were masked."""
+  return _REDACTOR.redact(value)
+
+
+def _build_metrics_block(state: Any) -> dict[str, Any]:
+  """Return the metrics block summary_reporter calibrates from."""
+  return {key: state.get(key) for key in METRIC_KEYS}
 
 
 def _resolve_summary_log_path() -> Path:
@@ -137,6 +145,38 @@ def _resolve_summary_log_path() -> Path:
   return repo_root / log_path
 
 
+def _optional_cap(name: str) -> int | None:
+  """Return a positive size cap from the environment, or None."""
+  cap = env_int(name, 0, minimum=0)
+  return cap if cap > 0 else None
+
+
+_REDACTOR = Redactor(
+  SENSITIVE_KEY_FRAGMENTS,
+  max_string_length=_optional_cap(SUMMARY_LOG_MAX_VALUE_CHARS_ENV_VAR),
+  max_items=_optional_cap(SUMMARY_LOG_MAX_ITEMS_ENV_VAR),
+)
+
+
+def _summary_log_writer() -> BatchedJsonlWriter:
+  """Return the background writer for the summary input log."""
+  compress = os.getenv(SUMMARY_LOG_COMPRESS_ENV_VAR, "0").strip().lower()
+  return get_jsonl_writer(
+    _resolve_summary_log_path(),
+    max_bytes=env_int(
+      SUMMARY_LOG_MAX_BYTES_ENV_VAR,
+      DEFAULT_MAX_BYTES,
+      minimum=0,
+    ),
+    backup_count=env_int(
+      SUMMARY_LOG_BACKUPS_ENV_VAR,
+      DEFAULT_BACKUP_COUNT,
+      minimum=0,
+    ),
+    compress=compress in {"1", "true", "yes", "on", "gzip"},
+  )
+
+
 @trace_chain()
 def skip_agent_if_requested(
   callback_context: "CallbackContext",
@@ -176,36 +216,94 @@ def log_summary_input_payload(
 ) -> Optional[types.Content]:
   """Persist summary-agent inputs as JSONL for supervised fine-tuning."""
   state = _snapshot_state(getattr(callback_context, "state", {}))
-  redacted_fields: list[str] = []
-  state_snapshot = _redact_sensitive(state, [], redacted_fields)
+  state_snapshot, redacted_fields = _redact_sensitive(state)
 
   payload = {
-    "schema_version": SUMMARY_INPUT_SCHEMA_VERSION,
+    "schema_version": SUMMARY_INPUT_SCHEMA_V1,
     "captured_at": datetime.now(timezone.utc).isoformat(),
     "agent": {"name": "summary_reporter"},
     "user_request": _extract_user_text(callback_context.user_content),
-    "metrics": {
-      "cpu_stats": state_snapshot.get("cpu_stats"),
-      "memory_stats": state_snapshot.get("memory_stats"),
-      "disk_stats": state_snapshot.get("disk_stats"),
-    },
-    "context": {
-      "host_context": state_snapshot.get("host_context"),
-      "app_context": state_snapshot.get("app_context"),
-      "recent_incidents": state_snapshot.get("recent_incidents"),
-      "user_reports": state_snapshot.get("user_reports"),
-    },
+    "metrics": _build_metrics_block(state_snapshot),
+    "context": {key: state_snapshot.get(key) for key in CONTEXT_KEYS},
     "state": state_snapshot,
     "redacted_fields": redacted_fields,
   }
 
-  log_path = _resolve_summary_log_path()
-  log_path.parent.mkdir(parents=True, exist_ok=True)
-  with log_path.open("a", encoding="utf-8") as handle:
-    handle.write(
-      json.dumps(payload, ensure_ascii=True, default=str) + "\n"
-    )
+  writer = _summary_log_writer()
+  writer.write(encode_summary_record(payload))
+  SUMMARY_INPUTS_LOGGED.inc()
+  _LOGGER.debug("Summary input queued for %s", writer.path)
 
-  _LOGGER.info("Summary input logged to %s", log_path)
+  return None
+
+
+@trace_chain()
+def severity_fast_path_before_model_callback(
+  callback_context: "CallbackContext",
+  llm_request: "LlmRequest",
+) -> Optional[LlmResponse]:
+  """Answer unambiguous snapshots locally instead of calling the model."""
+  metrics = _build_metrics_block(getattr(callback_context, "state", {}))
+  decision = calibrate_severity(metrics)
+  if decision is None:
+    return None
+
+  SEVERITY_DECISIONS.labels("local").inc()
+  _LOGGER.info("Severity decided locally: %s", decision.severity)
+  return _severity_response(json.dumps(decision.to_dict()))
+
+
+def _severity_response(text: str) -> LlmResponse:
+  """Wrap severity JSON text as a model response."""
+  return LlmResponse(
+    content=types.Content(role="model", parts=[types.Part(text=text)])
+  )
+
+
+@trace_chain()
+def severity_cache_before_model_callback(
+  callback_context: "CallbackContext",
+  llm_request: "LlmRequest",
+) -> Optional[LlmResponse]:
+  """Return a cached severity verdict for similar metrics snapshots."""
+  cache = get_severity_cache()
+  if cache is None:
+    return None
+
+  metrics = _build_metrics_block(getattr(callback_context, "state", {}))
+  cached = cache.get(cache.key_for(metrics))
+  if cached is None:
+    SEVERITY_CACHE_LOOKUPS.labels("miss").inc()
+    return None
+
+  SEVERITY_CACHE_LOOKUPS.labels("hit").inc()
+  SEVERITY_DECISIONS.labels("cache").inc()
+  _LOGGER.info("Severity served from cache.")
+  return _severity_response(cached)
+
+
+@trace_chain()
+def severity_cache_after_model_callback(
+  callback_context: "CallbackContext",
+  llm_response: LlmResponse,
+) -> Optional[LlmResponse]:
+  """Remember the model's severity verdict for the current metrics."""
+  content = getattr(llm_response, "content", None)
+  if not content or not content.parts:
+    return None
+
+  response_text = "".join(
+    part.text for part in content.parts if getattr(part, "text", None)
+  )
+  normalized = parse_severity_response(response_text)
+  if normalized is None:
+    return None
+
+  SEVERITY_DECISIONS.labels("model").inc()
+  cache = get_severity_cache()
+  if cache is None:
+    return None
 
+  metrics = _build_metrics_block(getattr(callback_context, "state", {}))
+  cache.put(cache.key_for(metrics), normalized)
   return None
@@ -0,0 +1,243 @@
+"""Serve collector output as Prometheus gauges.
+
+One collection is cached per scrape interval and shared by every scraper.
+Once a sample exists, scrapes never wait for the next one: an expired
+sample is served as-is while a single background refresh replaces it.
+Refreshes run on one long-lived worker thread with its own event loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable
+
+from deployment.metrics import REGISTRY, Gauge, MetricsRegistry
+
+from .tools.collection import collect_system_stats
+from .tools.env import env_float
+
+EXPORTER_ENABLED_ENV_VAR = "SYSTEM_MONITOR_EXPORTER"
+EXPORTER_INTERVAL_ENV_VAR = "SYSTEM_MONITOR_EXPORTER_INTERVAL"
+DEFAULT_EXPORTER_INTERVAL = 15.0
+FIRST_SAMPLE_TIMEOUT = 10.0
+_TRUTHY_VALUES = {"1", "true", "yes", "on"}
+_LOGGER = logging.getLogger(__name__)
+
+# (metric name, help text, state key, field) for scalar collector fields.
+SCALAR_GAUGES: tuple[tuple[str, str, str, str], ...] = (
+  ("host_cpu_usage_percent", "Overall CPU usage.", "cpu_stats",
+   "usage_percent"),
+  ("host_cpu_temperature_celsius", "CPU temperature.", "cpu_stats",
+   "temperature_c"),
+  ("host_memory_total_gb", "Installed memory.", "memory_stats", "total_gb"),
+  ("host_memory_available_gb", "Available memory.", "memory_stats",
+   "available_gb"),
+  ("host_memory_used_percent", "Memory in use.", "memory_stats",
+   "used_percent"),
+  ("host_memory_cache_gb", "Page cache size.", "memory_stats", "cache_gb"),
+  ("host_swap_total_gb", "Swap size.", "memory_stats", "swap_total_gb"),
+  ("host_swap_used_gb", "Swap in use.", "memory_stats", "swap_used_gb"),
+  ("host_swap_used_percent", "Swap in use.", "memory_stats",
+   "swap_used_percent"),
+  ("host_disk_read_mb_per_second", "Disk read throughput.", "disk_stats",
+   "read_mb_s"),
+  ("host_disk_write_mb_per_second", "Disk write throughput.", "disk_stats",
+   "write_mb_s"),
+)
+# (metric name, help text, drive field) for per-mount gauges.
+DRIVE_GAUGES: tuple[tuple[str, str, str], ...] = (
+  ("host_disk_total_gb", "Mount size.", "total_gb"),
+  ("host_disk_free_gb", "Free space on the mount.", "free_gb"),
+  ("host_disk_used_percent", "Mount space in use.", "used_percent"),
+)
+
+
+def state_families(state: dict[str, Any]) -> list[Gauge]:
+  """Return gauge families for a collector state mapping."""
+  families: list[Gauge] = []
+  for name, documentation, state_key, field in SCALAR_GAUGES:
+    value = (state.get(state_key) or {}).get(field)
+    if value is None:
+      continue
+    gauge = Gauge(name, documentation)
+    gauge.set(value)
+    families.append(gauge)
+
+  per_core = (state.get("cpu_stats") or {}).get("per_core_percent") or []
+  if per_core:
+    cores = Gauge(
+      "host_cpu_core_usage_percent",
+      "Per-core CPU usage.",
+      ("core",),
+    )
+    for index, value in enumerate(per_core):
+      cores.labels(index).set(value)
+    families.append(cores)
+
+  drives = (state.get("disk_stats") or {}).get("drives") or []
+  for name, documentation, field in DRIVE_GAUGES:
+    gauge = Gauge(name, documentation, ("mount",))
+    for drive in drives:
+      if drive.get(field) is not None:
+        gauge.labels(drive.get("mount", "")).set(drive[field])
+    if gauge.children():
+      families.append(gauge)
+  return families
+
+
+class HostMetricsExporter:
+  """Cache collector output and expose it as gauge families."""
+
+  def __init__(
+    self,
+    interval: float = DEFAULT_EXPORTER_INTERVAL,
+    collect: Callable[[], Any] = collect_system_stats,
+    first_sample_timeout: float = FIRST_SAMPLE_TIMEOUT,
+  ) -> None:
+    if interval <= 0:
+      raise ValueError("Exporter interval must be positive.")
+    self.interval = interval
+    self.first_sample_timeout = first_sample_timeout
+    self.collections = 0
+    self._collect = collect
+    self._state: dict[str, Any] | None = None
+    self._taken_at: float | None = None
+    self._refreshing = False
+    self._lock = threading.Lock()
+    self._first_sample = threading.Event()
+    self._wake = threading.Event()
+    self._stopping = False
+    self._worker: threading.Thread | None = None
+
+  def start(self) -> None:
+    """Start the refresh worker once; snapshot() calls this if needed."""
+    with self._lock:
+      if self._worker is not None:
+        return
+      self._stopping = False
+      self._worker = threading.Thread(
+        target=self._run,
+        name="host-exporter-refresh",
+        daemon=True,
+      )
+      self._worker.start()
+
+  def stop(self, timeout: float | None = None) -> None:
+    """Stop the refresh worker after any refresh in progress."""
+    with self._lock:
+      worker = self._worker
+      self._worker = None
+      self._stopping = True
+    self._wake.set()
+    if worker is not None:
+      worker.join(timeout)
+
+  def _run(self) -> None:
+    """Refresh whenever woken, reusing one event loop until stopped."""
+    loop = asyncio.new_event_loop()
+    try:
+      while True:
+        self._wake.wait()
+        self._wake.clear()
+        if self._stopping:
+          return
+        self._refresh(loop)
+    finally:
+      loop.close()
+
+  def _refresh(self, loop: asyncio.AbstractEventLoop) -> None:
+    """Collect once and publish the result."""
+    state = None
+    try:
+      state = self._collect()
+      if inspect.isawaitable(state):
+        state = loop.run_until_complete(state)
+    except Exception as exc:  # pylint: disable=broad-except
+      _LOGGER.warning("Exporter collection failed: %s", exc)
+    with self._lock:
+      if state is not None:
+        self._state = state
+        self._taken_at = time.monotonic()
+      self.collections += 1
+      self._refreshing = False
+    self._first_sample.set()
+
+  def snapshot(self) -> tuple[dict[str, Any] | None, float | None]:
+    """Return the cached state and its age in seconds.
+
+    Wakes the refresh worker at most once when the cache has expired.
+    Only the very first call waits, for up to first_sample_timeout.
+    """
+    if self._worker is None:
+      self.start()
+    with self._lock:
+      now = time.monotonic()
+      expired = self._taken_at is None or now - self._taken_at >= self.interval
+      if expired and not self._refreshing:
+        self._refreshing = True
+        self._wake.set()
+      state = self._state
+    if state is None:
+      self._first_sample.wait(self.first_sample_timeout)
+    with self._lock:
+      if self._taken_at is None:
+        return None, None
+      return self._state, time.monotonic() - self._taken_at
+
+  def families(self) -> list[Gauge]:
+    """Return gauges for the cached sample plus its age."""
+    state, age = self.snapshot()
+    if state is None:
+      return []
+    sample_age = Gauge(
+      "system_monitor_exporter_sample_age_seconds",
+      "Seconds since the served host sample was collected.",
+    )
+    sample_age.set(round(age, 3))
+    return [sample_age, *state_families(state)]
+
+
+_EXPORTER: HostMetricsExporter | None = None
+_EXPORTER_LOCK = threading.Lock()
+
+
+def start_host_exporter(
+  force: bool = False,
+  registry: MetricsRegistry = REGISTRY,
+) -> HostMetricsExporter | None:
+  """Add host gauges to the metrics registry when enabled.
+
+  Args:
+    force: Start even if SYSTEM_MONITOR_EXPORTER is not set.
+    registry: Registry whose renders include the host gauges.
+
+  Returns:
+    The running exporter, or None when disabled.
+  """
+  global _EXPORTER
+  enabled = os.getenv(EXPORTER_ENABLED_ENV_VAR, "").strip().lower()
+  if not force and enabled not in _TRUTHY_VALUES:
+    return None
+  with _EXPORTER_LOCK:
+    if _EXPORTER is None:
+      _EXPORTER = HostMetricsExporter(
+        interval=env_float(EXPORTER_INTERVAL_ENV_VAR, DEFAULT_EXPORTER_INTERVAL)
+      )
+      registry.register_collector(_EXPORTER.families)
+      _EXPORTER.start()
+  return _EXPORTER
+
+
+def stop_host_exporter(registry: MetricsRegistry = REGISTRY) -> None:
+  """Remove the host gauges added by start_host_exporter."""
+  global _EXPORTER
+  with _EXPORTER_LOCK:
+    if _EXPORTER is not None:
+      registry.unregister_collector(_EXPORTER.families)
+      _EXPORTER.stop()
+      _EXPORTER = None
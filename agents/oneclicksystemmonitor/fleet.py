@@ -0,0 +1,472 @@
+"""Serve collector payloads to a fleet aggregator and summarize many hosts.
+
+Each host runs a small keep-alive HTTP endpoint that returns the
+exporter's cached collection as JSON, so a poll never triggers more than
+one collection per exporter interval. FleetCollector polls many such
+endpoints from one event loop with a bounded number of requests in
+flight, one reused connection per host, and a deadline per host; a slow
+or unreachable host only costs its own slot.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import logging
+import math
+import socket
+import sys
+import threading
+import time
+from typing import Any, Iterable
+
+from deployment.metrics import DEFAULT_METRICS_HOST
+
+from .exporter import start_host_exporter
+from .severity import SEVERITY_ORDER, build_severity_signals
+from .tools.deadlines import within_deadline
+from .tools.env import env_int
+
+FLEET_CONCURRENCY_ENV_VAR = "SYSTEM_MONITOR_FLEET_CONCURRENCY"
+FLEET_TIMEOUT_ENV_VAR = "SYSTEM_MONITOR_FLEET_TIMEOUT_MS"
+DEFAULT_FLEET_CONCURRENCY = 32
+DEFAULT_FLEET_TIMEOUT_MS = 3000
+DEFAULT_FLEET_TOP_HOSTS = 5
+STATS_PATH = "/stats"
+# Seconds an idle keep-alive connection holds its server thread.
+STATS_IDLE_TIMEOUT = 120.0
+JSON_CONTENT_TYPE = "application/json"
+UNKNOWN_SEVERITY = "unknown"
+NO_SAMPLE_ERROR = "No sample collected yet."
+_LOGGER = logging.getLogger(__name__)
+
+
+class _StatsHandler(BaseHTTPRequestHandler):
+  """Serve the cached collection at /stats over HTTP/1.1 keep-alive."""
+
+  protocol_version = "HTTP/1.1"
+  timeout = STATS_IDLE_TIMEOUT
+  source: Any = None
+  host_name = ""
+
+  def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+    body = json.dumps(payload, default=str).encode("utf-8")
+    self.send_response(status)
+    self.send_header("Content-Type", JSON_CONTENT_TYPE)
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def do_GET(self) -> None:  # noqa: N802
+    if self.path.split("?", 1)[0] != STATS_PATH:
+      self.send_error(404)
+      return
+    state, age = self.source.snapshot()
+    if state is None:
+      self._send_json(503, {"host": self.host_name, "error": NO_SAMPLE_ERROR})
+      return
+    self._send_json(
+      200,
+      {
+        "host": self.host_name,
+        "age_seconds": round(age, 3),
+        "state": state,
+      },
+    )
+
+  def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+    _LOGGER.debug("stats %s", format % args)
+
+
+class StatsServer(ThreadingHTTPServer):
+  """Threaded stats server that counts accepted connections."""
+
+  daemon_threads = True
+
+  def __init__(self, *args: Any, **kwargs: Any) -> None:
+    super().__init__(*args, **kwargs)
+    self.connections = 0
+
+  def process_request(self, request: Any, client_address: Any) -> None:
+    self.connections += 1
+    super().process_request(request, client_address)
+
+  def handle_error(self, request: Any, client_address: Any) -> None:
+    """Log pollers that hung up mid-response, e.g. after a timeout."""
+    if isinstance(sys.exc_info()[1], ConnectionError):
+      _LOGGER.debug("Stats client %s disconnected.", client_address)
+      return
+    super().handle_error(request, client_address)
+
+
+def serve_stats(
+  port: int,
+  host: str = DEFAULT_METRICS_HOST,
+  source: Any = None,
+  host_name: str | None = None,
+) -> StatsServer:
+  """Serve collector payloads on host:port from a daemon thread.
+
+  Args:
+    port: TCP port; 0 picks a free one.
+    host: Interface to bind.
+    source: Object with a HostMetricsExporter-style snapshot() method;
+      defaults to the shared host exporter.
+    host_name: Name reported to aggregators; defaults to the hostname.
+  """
+  if source is None:
+    source = start_host_exporter(force=True)
+  handler = type(
+    "StatsHandler",
+    (_StatsHandler,),
+    {
+      "source": source,
+      "host_name": host_name or socket.gethostname(),
+    },
+  )
+  server = StatsServer((host, port), handler)
+  thread = threading.Thread(
+    target=server.serve_forever,
+    name="stats-http",
+    daemon=True,
+  )
+  thread.start()
+  return server
+
+
+class _StatsConnection:
+  """One keep-alive HTTP/1.1 connection to a host's stats endpoint."""
+
+  def __init__(self, address: str) -> None:
+    host, _, port = address.rpartition(":")
+    self.address = address
+    self.host = host.strip("[]") or DEFAULT_METRICS_HOST
+    self.port = int(port)
+    self.connects = 0
+    self._reader: asyncio.StreamReader | None = None
+    self._writer: asyncio.StreamWriter | None = None
+
+  async def fetch(self) -> dict[str, Any]:
+    """Return the decoded /stats payload.
+
+    A reused connection the server has since closed is retried once on
+    a fresh one.
+
+    Raises:
+      OSError: If the host cannot be reached.
+      EOFError: If the response is cut short.
+      ValueError: If the response is not a 200 JSON object.
+    """
+    reused = self._writer is not None
+    try:
+      return await self._request()
+    except (OSError, EOFError):
+      self.close()
+      if not reused:
+        raise
+    return await self._request()
+
+  async def _request(self) -> dict[str, Any]:
+    """Send one GET and read one Content-Length framed response."""
+    if self._writer is None:
+      self._reader, self._writer = await asyncio.open_connection(
+        self.host,
+        self.port,
+      )
+      self.connects += 1
+    self._writer.write(
+      (
+        f"GET {STATS_PATH} HTTP/1.1\r\n"
+        f"Host: {self.address}\r\n"
+        "Accept: application/json\r\n\r\n"
+      ).encode("ascii")
+    )
+    await self._writer.drain()
+
+    status_line = await self._reader.readline()
+    if not status_line:
+      raise ConnectionResetError("Connection closed by host.")
+    parts = status_line.split(None, 2)
+    if len(parts) < 2 or not parts[1].isdigit():
+      raise ValueError("Malformed HTTP status line.")
+    status = int(parts[1])
+    headers = {}
+    while True:
+      line = await self._reader.readline()
+      if line in (b"\r\n", b"\n"):
+        break
+      if not line:
+        raise ConnectionResetError("Connection closed by host.")
+      name, _, value = line.decode("latin-1").partition(":")
+      headers[name.strip().lower()] = value.strip()
+    body = await self._reader.readexactly(
+      int(headers.get("content-length", 0))
+    )
+    if headers.get("connection", "").lower() == "close":
+      self.close()
+
+    if status != 200:
+      error = f"HTTP {status}"
+      if headers.get("content-type") == JSON_CONTENT_TYPE:
+        detail = json.loads(body)
+        if isinstance(detail, dict):
+          error = detail.get("error") or error
+      raise ValueError(error)
+    payload = json.loads(body)
+    if not isinstance(payload, dict):
+      raise ValueError("Stats payload is not a JSON object.")
+    return payload
+
+  def close(self) -> None:
+    """Drop the connection; the next fetch reconnects."""
+    if self._writer is not None:
+      try:
+        self._writer.close()
+      except RuntimeError:
+        # The connection belongs to an event loop that has since closed.
+        pass
+    self._reader = None
+    self._writer = None
+
+
+def _malformed_state(state: Any) -> str | None:
+  """Return why a host's state cannot be summarized, or None if usable."""
+  if not isinstance(state, dict):
+    return "Stats state is not a JSON object."
+  for key, block in state.items():
+    if key.endswith("_stats") and not isinstance(block, (dict, type(None))):
+      return f"Stats block {key} is not a JSON object."
+  return None
+
+
+class FleetCollector:
+  """Poll many stats endpoints concurrently over reused connections.
+
+  Connections are bound to the event loop that opened them, so repeated
+  polls should run on one loop; switching loops reconnects every host.
+
+  Args:
+    hosts: "host:port" addresses of stats endpoints.
+    concurrency: Most requests in flight at once; defaults to
+      SYSTEM_MONITOR_FLEET_CONCURRENCY.
+    timeout: Per-host deadline in seconds, including connecting;
+      defaults to SYSTEM_MONITOR_FLEET_TIMEOUT_MS.
+  """
+
+  def __init__(
+    self,
+    hosts: Iterable[str],
+    concurrency: int | None = None,
+    timeout: float | None = None,
+  ) -> None:
+    self.hosts = list(dict.fromkeys(hosts))
+    self.concurrency = concurrency or env_int(
+      FLEET_CONCURRENCY_ENV_VAR,
+      DEFAULT_FLEET_CONCURRENCY,
+    )
+    if timeout is None:
+      timeout = (
+        env_int(FLEET_TIMEOUT_ENV_VAR, DEFAULT_FLEET_TIMEOUT_MS) / 1000
+      )
+    self.timeout = timeout
+    self._connections = {
+      address: _StatsConnection(address) for address in self.hosts
+    }
+    self._loop: asyncio.AbstractEventLoop | None = None
+
+  @property
+  def connects(self) -> int:
+    """Return how many TCP connections have been opened in total."""
+    return sum(connection.connects for connection in self._connections.values())
+
+  async def _poll_host(
+    self,
+    connection: _StatsConnection,
+    slots: asyncio.Semaphore,
+  ) -> dict[str, Any]:
+    """Fetch one host within its deadline and describe the outcome."""
+    async with slots:
+      start = time.perf_counter()
+      try:
+        payload, error = await within_deadline(
+          connection.fetch(),
+          None,
+          self.timeout,
+        )
+      except (OSError, EOFError, ValueError) as exc:
+        payload, error = None, str(exc) or type(exc).__name__
+      latency_ms = round((time.perf_counter() - start) * 1000, 2)
+    if payload is None:
+      # A cancelled or failed request leaves the stream mid-response.
+      connection.close()
+      payload = {}
+    state = payload.get("state")
+    if error is None:
+      error = _malformed_state(state)
+      if error is not None:
+        state = None
+    return {
+      "address": connection.address,
+      "host": payload.get("host") or connection.address,
+      "state": state,
+      "age_seconds": payload.get("age_seconds"),
+      "latency_ms": latency_ms,
+      "error": error,
+    }
+
+  async def poll(self) -> list[dict[str, Any]]:
+    """Poll every host once and return one result per host, in order.
+
+    Results with a None state carry an error such as "timed out after
+    3000 ms" or the connection failure.
+    """
+    loop = asyncio.get_running_loop()
+    if self._loop is not loop:
+      self.close()
+      self._loop = loop
+    slots = asyncio.Semaphore(self.concurrency)
+    return list(
+      await asyncio.gather(
+        *(
+          self._poll_host(self._connections[address], slots)
+          for address in self.hosts
+        )
+      )
+    )
+
+  def close(self) -> None:
+    """Close every open connection."""
+    for connection in self._connections.values():
+      connection.close()
+
+
+def _host_severity(state: dict[str, Any]) -> str:
+  """Return the worst signal's severity, or unknown when incomplete."""
+  signals = build_severity_signals(state)
+  if not signals:
+    return UNKNOWN_SEVERITY
+  return SEVERITY_ORDER[max(signal.rank() for signal in signals)]
+
+
+def _distribution(values: list[float]) -> dict[str, Any] | None:
+  """Return count, mean, max, and p95 for a list of values."""
+  if not values:
+    return None
+  ordered = sorted(values)
+  p95_index = max(math.ceil(0.95 * len(ordered)) - 1, 0)
+  return {
+    "count": len(ordered),
+    "mean": round(math.fsum(ordered) / len(ordered), 2),
+    "max": round(ordered[-1], 2),
+    "p95": round(ordered[p95_index], 2),
+  }
+
+
+def summarize_fleet(
+  results: list[dict[str, Any]],
+  top: int = DEFAULT_FLEET_TOP_HOSTS,
+) -> dict[str, Any]:
+  """Return fleet-wide distributions, severity counts, and worst hosts.
+
+  Each reachable host is graded with the same threshold signals as the
+  local severity calibration, PSI included when the host reports it.
+  """
+  severity_counts = dict.fromkeys((*SEVERITY_ORDER, UNKNOWN_SEVERITY), 0)
+  rows = []
+  unreachable = []
+  for result in results:
+    state = result["state"]
+    if state is None:
+      unreachable.append(
+        {"host": result["host"], "error": result["error"]}
+      )
+      continue
+    severity = _host_severity(state)
+    severity_counts[severity] += 1
+    drives = (state.get("disk_stats") or {}).get("drives") or []
+    rows.append(
+      {
+        "host": result["host"],
+        "severity": severity,
+        "cpu_usage_percent": (state.get("cpu_stats") or {}).get(
+          "usage_percent"
+        ),
+        "memory_used_percent": (state.get("memory_stats") or {}).get(
+          "used_percent"
+        ),
+        "max_disk_used_percent": max(
+          (drive.get("used_percent", 0) for drive in drives),
+          default=None,
+        ),
+      }
+    )
+
+  distributions = {
+    field: _distribution(
+      [row[field] for row in rows if row[field] is not None]
+    )
+    for field in (
+      "cpu_usage_percent",
+      "memory_used_percent",
+      "max_disk_used_percent",
+    )
+  }
+  rank = {severity: index for index, severity in enumerate(SEVERITY_ORDER)}
+  rows.sort(
+    key=lambda row: (
+      rank.get(row["severity"], -1),
+      row["cpu_usage_percent"] or 0,
+    ),
+    reverse=True,
+  )
+  return {
+    "hosts": len(results),
+    "reachable": len(rows),
+    "severity_counts": severity_counts,
+    **distributions,
+    "worst_hosts": rows[:top],
+    "unreachable": unreachable,
+  }
+
+
+def format_fleet_report(summary: dict[str, Any]) -> str:
+  """Render a fleet summary as plain text."""
+  counts = summary["severity_counts"]
+  lines = [
+    (
+      f"Fleet summary: {summary['reachable']} of {summary['hosts']} "
+      "hosts reporting"
+    ),
+    "- Severity: "
+    + ", ".join(f"{count} {severity}" for severity, count in counts.items()),
+  ]
+  for field, label in (
+    ("cpu_usage_percent", "CPU usage"),
+    ("memory_used_percent", "Memory used"),
+    ("max_disk_used_percent", "Fullest disk"),
+  ):
+    stats = summary.get(field)
+    if stats:
+      lines.append(
+        (
+          f"- {label}: avg {stats['mean']}%, p95 {stats['p95']}%, "
+          f"max {stats['max']}%"
+        )
+      )
+  if summary["worst_hosts"]:
+    lines.append("Worst hosts:")
+    for row in summary["worst_hosts"]:
+      lines.append(
+        (
+          f"- {row['host']}: {row['severity']} (CPU "
+          f"{row['cpu_usage_percent']}%, memory "
+          f"{row['memory_used_percent']}%, disk "
+          f"{row['max_disk_used_percent']}%)"
+        )
+      )
+  if summary["unreachable"]:
+    lines.append("Unreachable:")
+    for row in summary["unreachable"]:
+      lines.append(f"- {row['host']}: {row['error']}")
+  return "\n".join(lines)
@@ -0,0 +1,229 @@
+"""Batched background writer for JSONL logs."""
+
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import logging
+from pathlib import Path
+import queue
+import shutil
+import threading
+import time
+from typing import Any
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+DEFAULT_BACKUP_COUNT = 5
+COMPRESSED_SUFFIX = ".gz"
+_STOP = object()
+_FLUSH = object()
+_LOGGER = logging.getLogger(__name__)
+
+
+class BatchedJsonlWriter:
+  """Queue JSON records and append them from a daemon thread.
+
+  A batch is written once it holds batch_size records or flush_interval
+  seconds after its first record was queued, whichever comes first;
+  flush() and close() write it at once. When the file would grow past
+  max_bytes it is rotated to path.1 (path.1.gz when compress is set),
+  shifting older segments up to backup_count.
+  """
+
+  def __init__(
+    self,
+    path: str | Path,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+    backup_count: int = DEFAULT_BACKUP_COUNT,
+    compress: bool = False,
+  ) -> None:
+    self.path = Path(path)
+    self.batch_size = batch_size
+    self.flush_interval = flush_interval
+    self.max_bytes = max_bytes
+    self.backup_count = backup_count
+    self.compress = compress
+    self.dropped = 0
+    self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+    self._flushed = threading.Condition()
+    self._pending = 0
+    self._stopped = False
+    self._thread = threading.Thread(
+      target=self._run,
+      name=f"jsonl-writer:{self.path.name}",
+      daemon=True,
+    )
+    self._thread.start()
+
+  def write(self, record: dict[str, Any]) -> None:
+    """Queue one record; never blocks on disk I/O."""
+    with self._flushed:
+      self._pending += 1
+    self._queue.put(record)
+
+  def flush(self, timeout: float | None = None) -> bool:
+    """Block until every queued record is on disk.
+
+    Returns False on timeout, or at once when the writer thread has
+    stopped with records still queued.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with self._flushed:
+      if self._pending and not self._stopped:
+        # Cut the current batch short instead of waiting out its interval.
+        self._queue.put(_FLUSH)
+      while self._pending:
+        if self._stopped:
+          return False
+        remaining = None
+        if deadline is not None:
+          remaining = deadline - time.monotonic()
+          if remaining <= 0:
+            return False
+        self._flushed.wait(remaining)
+    return True
+
+  def close(self) -> None:
+    """Drain the queue and stop the writer thread."""
+    if self._thread.is_alive():
+      self._queue.put(_STOP)
+      self._thread.join()
+
+  def _segment_path(self, index: int) -> Path:
+    """Return the path of the index-th rotated segment."""
+    suffix = f".{index}"
+    if self.compress:
+      suffix += COMPRESSED_SUFFIX
+    return self.path.with_name(self.path.name + suffix)
+
+  def _rotate(self) -> None:
+    """Shift rotated segments and move the live file to segment 1."""
+    if self.backup_count <= 0:
+      self.path.unlink(missing_ok=True)
+      return
+    for index in range(self.backup_count - 1, 0, -1):
+      source = self._segment_path(index)
+      if source.exists():
+        source.replace(self._segment_path(index + 1))
+    target = self._segment_path(1)
+    if not self.compress:
+      self.path.replace(target)
+      return
+    staged = self.path.with_name(self.path.name + ".rotating")
+    self.path.replace(staged)
+    with staged.open("rb") as source, gzip.open(target, "wb") as sink:
+      shutil.copyfileobj(source, sink)
+    staged.unlink()
+
+  def _write(self, records: list[Any]) -> None:
+    """Serialize a batch and append it with a single write."""
+    lines = []
+    for record in records:
+      try:
+        lines.append(
+          json.dumps(
+            record,
+            ensure_ascii=True,
+            default=str,
+            separators=(",", ":"),
+          )
+        )
+      except (TypeError, ValueError):
+        self.dropped += 1
+        _LOGGER.exception("Dropping unserializable log record.")
+    if not lines:
+      return
+    chunk = ("\n".join(lines) + "\n").encode("utf-8")
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    if self.max_bytes > 0 and self.path.exists():
+      if self.path.stat().st_size + len(chunk) > self.max_bytes:
+        self._rotate()
+    with self.path.open("ab") as handle:
+      handle.write(chunk)
+
+  def _run(self) -> None:
+    """Write batches until stopped, then wake any waiting flush."""
+    try:
+      self._drain()
+    finally:
+      with self._flushed:
+        self._stopped = True
+        self._flushed.notify_all()
+
+  def _drain(self) -> None:
+    """Write queued batches until the stop sentinel arrives."""
+    stop = False
+    while not stop:
+      records: list[Any] = []
+      deadline = None
+      while True:
+        timeout = None
+        if deadline is not None:
+          timeout = deadline - time.monotonic()
+          if timeout <= 0:
+            break
+        try:
+          item = self._queue.get(timeout=timeout)
+        except queue.Empty:
+          break
+        if item is _STOP:
+          stop = True
+          break
+        if item is _FLUSH:
+          break
+        records.append(item)
+        if len(records) >= self.batch_size:
+          break
+        if deadline is None:
+          deadline = time.monotonic() + self.flush_interval
+      if records:
+        try:
+          self._write(records)
+        except Exception:  # pylint: disable=broad-except
+          # Any failure drops this batch only; the thread keeps going.
+          self.dropped += len(records)
+          _LOGGER.exception("Failed to write %s", self.path)
+        with self._flushed:
+          self._pending -= len(records)
+          self._flushed.notify_all()
+
+
+_WRITERS: dict[Path, BatchedJsonlWriter] = {}
+_WRITERS_LOCK = threading.Lock()
+
+
+def get_jsonl_writer(path: Path, **options: Any) -> BatchedJsonlWriter:
+  """Return the process-wide writer for path, creating it on first use."""
+  writer = _WRITERS.get(path)
+  if writer is not None:
+    return writer
+  with _WRITERS_LOCK:
+    writer = _WRITERS.get(path)
+    if writer is None:
+      writer = BatchedJsonlWriter(path, **options)
+      _WRITERS[path] = writer
+  return writer
+
+
+def flush_jsonl_writers(timeout: float | None = None) -> bool:
+  """Flush every open writer; return False if any timed out."""
+  with _WRITERS_LOCK:
+    writers = list(_WRITERS.values())
+  return all([writer.flush(timeout) for writer in writers])
+
+
+def close_jsonl_writers() -> None:
+  """Drain and stop every open writer."""
+  with _WRITERS_LOCK:
+    writers = list(_WRITERS.values())
+    _WRITERS.clear()
+  for writer in writers:
+    writer.close()
+
+
+atexit.register(close_jsonl_writers)
@@ -0,0 +1,316 @@
+"""Durable SQLite metric history with rollups and retention."""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import math
+import os
+from pathlib import Path
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from .tools.history import METRIC_HISTORY
+
+METRIC_STORE_PATH_ENV_VAR = "SYSTEM_MONITOR_HISTORY_DB"
+RAW_RESOLUTION = "raw"
+MINUTE_RESOLUTION = "1m"
+HOUR_RESOLUTION = "1h"
+ROLLUP_SECONDS = {MINUTE_RESOLUTION: 60, HOUR_RESOLUTION: 3600}
+DEFAULT_RETENTION_SECONDS = {
+  RAW_RESOLUTION: 24 * 3600,
+  MINUTE_RESOLUTION: 7 * 24 * 3600,
+  HOUR_RESOLUTION: 90 * 24 * 3600,
+}
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_PRUNE_INTERVAL = 300.0
+_STOP = object()
+_LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = (
+  "CREATE TABLE IF NOT EXISTS samples ("
+  " metric_group TEXT NOT NULL,"
+  " series TEXT NOT NULL,"
+  " ts REAL NOT NULL,"
+  " value REAL NOT NULL)",
+  "CREATE INDEX IF NOT EXISTS samples_series_ts"
+  " ON samples (metric_group, series, ts)",
+  "CREATE INDEX IF NOT EXISTS samples_ts ON samples (ts)",
+  "CREATE TABLE IF NOT EXISTS rollups ("
+  " resolution TEXT NOT NULL,"
+  " metric_group TEXT NOT NULL,"
+  " series TEXT NOT NULL,"
+  " bucket_start REAL NOT NULL,"
+  " count INTEGER NOT NULL,"
+  " total REAL NOT NULL,"
+  " minimum REAL NOT NULL,"
+  " maximum REAL NOT NULL,"
+  " PRIMARY KEY (resolution, metric_group, series, bucket_start))",
+  "CREATE INDEX IF NOT EXISTS rollups_bucket"
+  " ON rollups (resolution, bucket_start)",
+)
+_ROLLUP_UPSERT = (
+  "INSERT INTO rollups VALUES (?, ?, ?, ?, 1, ?, ?, ?) "
+  "ON CONFLICT (resolution, metric_group, series, bucket_start) DO UPDATE SET"
+  " count = count + 1,"
+  " total = total + excluded.total,"
+  " minimum = min(minimum, excluded.minimum),"
+  " maximum = max(maximum, excluded.maximum)"
+)
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+  """Open a WAL-mode connection tuned for append-heavy writes."""
+  connection = sqlite3.connect(str(path), check_same_thread=False)
+  connection.execute("PRAGMA journal_mode=WAL")
+  connection.execute("PRAGMA synchronous=NORMAL")
+  return connection
+
+
+class MetricStore:
+  """Batch metric rows into SQLite from a background writer thread."""
+
+  def __init__(
+    self,
+    path: str | Path,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+    retention_seconds: dict[str, float] | None = None,
+    prune_interval: float = DEFAULT_PRUNE_INTERVAL,
+  ) -> None:
+    self.path = Path(path)
+    self.batch_size = batch_size
+    self.flush_interval = flush_interval
+    self.retention_seconds = dict(DEFAULT_RETENTION_SECONDS)
+    self.retention_seconds.update(retention_seconds or {})
+    self.prune_interval = prune_interval
+    self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+    self._flushed = threading.Condition()
+    self._pending = 0
+    self._stopped = False
+    self._last_prune = 0.0
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    self._writer = _connect(self.path)
+    for statement in _SCHEMA:
+      self._writer.execute(statement)
+    self._writer.commit()
+    self._reader = _connect(self.path)
+    self._reader_lock = threading.Lock()
+    self._thread = threading.Thread(
+      target=self._run,
+      name="metric-store-writer",
+      daemon=True,
+    )
+    self._thread.start()
+
+  def enqueue(
+    self,
+    group: str,
+    values: dict[str, float | None],
+    timestamp: float,
+  ) -> None:
+    """Queue one sample row without touching the database."""
+    rows = [
+      (group, series, timestamp, float(value))
+      for series, value in values.items()
+      if value is not None and not math.isnan(value)
+    ]
+    if not rows:
+      return
+    with self._flushed:
+      self._pending += 1
+    self._queue.put(rows)
+
+  def flush(self, timeout: float | None = None) -> bool:
+    """Block until every queued row is committed.
+
+    Returns False on timeout, or at once when the writer thread has
+    stopped with rows still queued.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    with self._flushed:
+      while self._pending:
+        if self._stopped:
+          return False
+        remaining = None
+        if deadline is not None:
+          remaining = deadline - time.monotonic()
+          if remaining <= 0:
+            return False
+        self._flushed.wait(remaining)
+    return True
+
+  def close(self) -> None:
+    """Drain the queue, stop the writer, and close connections."""
+    if self._thread.is_alive():
+      self._queue.put(_STOP)
+      self._thread.join()
+    with self._reader_lock:
+      self._reader.close()
+
+  def query_range(
+    self,
+    group: str,
+    series: str,
+    start: float,
+    end: float,
+    resolution: str = RAW_RESOLUTION,
+  ) -> list[dict[str, float]]:
+    """Return samples or rollup buckets in [start, end] from the index."""
+    with self._reader_lock:
+      if resolution == RAW_RESOLUTION:
+        rows = self._reader.execute(
+          "SELECT ts, value FROM samples "
+          "WHERE metric_group = ? AND series = ? AND ts BETWEEN ? AND ? "
+          "ORDER BY ts",
+          (group, series, start, end),
+        ).fetchall()
+        return [{"ts": ts, "value": value} for ts, value in rows]
+
+      if resolution not in ROLLUP_SECONDS:
+        raise ValueError(f"Unknown resolution: {resolution}")
+      rows = self._reader.execute(
+        "SELECT bucket_start, count, total, minimum, maximum FROM rollups "
+        "WHERE resolution = ? AND metric_group = ? AND series = ? "
+        "AND bucket_start BETWEEN ? AND ? ORDER BY bucket_start",
+        (resolution, group, series, start, end),
+      ).fetchall()
+    return [
+      {
+        "ts": bucket_start,
+        "count": count,
+        "mean": total / count,
+        "min": minimum,
+        "max": maximum,
+      }
+      for bucket_start, count, total, minimum, maximum in rows
+    ]
+
+  def _drain(self, first: Any) -> tuple[list[tuple], int, bool]:
+    """Collect queued batches up to batch_size rows."""
+    rows: list[tuple] = []
+    batches = 0
+    stop = False
+    item = first
+    while True:
+      if item is _STOP:
+        stop = True
+      else:
+        rows.extend(item)
+        batches += 1
+      if stop or len(rows) >= self.batch_size:
+        break
+      try:
+        item = self._queue.get_nowait()
+      except queue.Empty:
+        break
+    return rows, batches, stop
+
+  def _write(self, rows: list[tuple]) -> None:
+    """Insert raw rows and fold them into every rollup in one transaction."""
+    rollup_rows = []
+    for group, series, timestamp, value in rows:
+      for resolution, seconds in ROLLUP_SECONDS.items():
+        bucket_start = timestamp - timestamp % seconds
+        rollup_rows.append(
+          (resolution, group, series, bucket_start, value, value, value)
+        )
+    with self._writer:
+      self._writer.executemany(
+        "INSERT INTO samples VALUES (?, ?, ?, ?)",
+        rows,
+      )
+      self._writer.executemany(_ROLLUP_UPSERT, rollup_rows)
+
+  def _prune(self, now: float) -> None:
+    """Delete raw samples and rollups past their retention."""
+    with self._writer:
+      self._writer.execute(
+        "DELETE FROM samples WHERE ts < ?",
+        (now - self.retention_seconds[RAW_RESOLUTION],),
+      )
+      for resolution in ROLLUP_SECONDS:
+        self._writer.execute(
+          "DELETE FROM rollups WHERE resolution = ? AND bucket_start < ?",
+          (resolution, now - self.retention_seconds[resolution]),
+        )
+    self._last_prune = now
+
+  def _run(self) -> None:
+    """Write until stopped, then close and wake any waiting flush."""
+    try:
+      self._write_until_stopped()
+    finally:
+      with self._flushed:
+        self._stopped = True
+        self._flushed.notify_all()
+      self._writer.close()
+
+  def _write_until_stopped(self) -> None:
+    """Write batches until stopped, pruning on a slow cadence."""
+    stop = False
+    while not stop:
+      try:
+        first = self._queue.get(timeout=self.flush_interval)
+      except queue.Empty:
+        first = None
+      batches = 0
+      if first is not None:
+        rows, batches, stop = self._drain(first)
+        if rows:
+          try:
+            self._write(rows)
+          except Exception:  # pylint: disable=broad-except
+            # Any failure drops this batch only; the thread keeps going.
+            _LOGGER.exception("Metric store write failed.")
+      now = time.time()
+      if now - self._last_prune >= self.prune_interval:
+        try:
+          self._prune(now)
+        except Exception:  # pylint: disable=broad-except
+          _LOGGER.exception("Metric store prune failed.")
+      if batches:
+        with self._flushed:
+          self._pending -= batches
+          self._flushed.notify_all()
+
+
+_METRIC_STORE: MetricStore | None = None
+_METRIC_STORE_LOCK = threading.Lock()
+
+
+def start_metric_store() -> bool:
+  """Open the store and mirror METRIC_HISTORY into it when configured.
+
+  Returns:
+    True when the store is running; otherwise False.
+  """
+  global _METRIC_STORE
+  raw_path = os.getenv(METRIC_STORE_PATH_ENV_VAR)
+  if not raw_path:
+    return False
+  with _METRIC_STORE_LOCK:
+    if _METRIC_STORE is None:
+      _METRIC_STORE = MetricStore(Path(raw_path).expanduser())
+      METRIC_HISTORY.add_sink(_METRIC_STORE.enqueue)
+      atexit.register(stop_metric_store)
+  return True
+
+
+def stop_metric_store() -> None:
+  """Flush and close the process-wide store."""
+  global _METRIC_STORE
+  with _METRIC_STORE_LOCK:
+    if _METRIC_STORE is not None:
+      METRIC_HISTORY.remove_sink(_METRIC_STORE.enqueue)
+      _METRIC_STORE.close()
+      _METRIC_STORE = None
+
+
+def get_metric_store() -> MetricStore | None:
+  """Return the process-wide store when one was started."""
+  return _METRIC_STORE
@@ -0,0 +1,159 @@
+"""Iterative secret redaction for session-state payloads."""
+
+from __future__ import annotations
+
+from itertools import islice
+import re
+from typing import Any, Iterator
+
+REDACTED_VALUE = "[REDACTED]"
+SENSITIVE_KEY_FRAGMENTS = (
+  "api_key",
+  "apikey",
+  "token",
+  "secret",
+  "password",
+  "passwd",
+)
+TRUNCATED_KEY = "__truncated__"
+TRUNCATED_ITEMS_TEMPLATE = "[TRUNCATED {count} items]"
+TRUNCATED_STRING_TEMPLATE = "...[TRUNCATED {count} chars]"
+MAX_MEMOIZED_KEYS = 4096
+
+
+class _Frame:
+  """One container being copied: its remaining items and output."""
+
+  __slots__ = ("items", "target", "is_dict", "overflow")
+
+  def __init__(
+    self,
+    items: Iterator[tuple[Any, Any]],
+    target: dict[str, Any] | list[Any],
+    is_dict: bool,
+    overflow: int,
+  ) -> None:
+    self.items = items
+    self.target = target
+    self.is_dict = is_dict
+    self.overflow = overflow
+
+
+class Redactor:
+  """Copy nested dicts and lists, masking values under sensitive keys.
+
+  The walk uses an explicit stack and one shared path list, so cost is
+  linear in the number of nodes regardless of depth. Key decisions are
+  memoized, and optional caps truncate oversized strings and containers.
+  """
+
+  def __init__(
+    self,
+    fragments: tuple[str, ...] = SENSITIVE_KEY_FRAGMENTS,
+    max_string_length: int | None = None,
+    max_items: int | None = None,
+  ) -> None:
+    self.max_string_length = max_string_length
+    self.max_items = max_items
+    self._pattern = re.compile(
+      "|".join(re.escape(fragment) for fragment in fragments),
+      re.IGNORECASE,
+    )
+    self._decisions: dict[str, bool] = {}
+
+  def is_sensitive(self, key: str) -> bool:
+    """Return whether a key names a secret, memoizing the answer."""
+    decision = self._decisions.get(key)
+    if decision is None:
+      if len(self._decisions) >= MAX_MEMOIZED_KEYS:
+        self._decisions.clear()
+      decision = self._pattern.search(key) is not None
+      self._decisions[key] = decision
+    return decision
+
+  def _open(self, value: Any) -> tuple[Any, _Frame | None]:
+    """Return the output for value and a frame if it has children."""
+    if isinstance(value, dict):
+      target: Any = {}
+      items: Iterator[tuple[Any, Any]] = iter(value.items())
+      is_dict = True
+    elif isinstance(value, list):
+      target = []
+      items = enumerate(value)
+      is_dict = False
+    elif (
+      isinstance(value, str)
+      and self.max_string_length is not None
+      and len(value) > self.max_string_length
+    ):
+      dropped = len(value) - self.max_string_length
+      return (
+        value[:self.max_string_length]
+        + TRUNCATED_STRING_TEMPLATE.format(count=dropped),
+        None,
+      )
+    else:
+      return value, None
+
+    overflow = 0
+    if self.max_items is not None and len(value) > self.max_items:
+      overflow = len(value) - self.max_items
+      items = islice(items, self.max_items)
+    return target, _Frame(items, target, is_dict, overflow)
+
+  @staticmethod
+  def _close(frame: _Frame) -> None:
+    """Append the truncation marker for a capped container."""
+    if not frame.overflow:
+      return
+    if frame.is_dict:
+      frame.target[TRUNCATED_KEY] = frame.overflow
+    else:
+      frame.target.append(
+        TRUNCATED_ITEMS_TEMPLATE.format(count=frame.overflow)
+      )
+
+  def redact(self, value: Any) -> tuple[Any, list[str]]:
+    """Return a redacted copy of value and the dotted redacted paths."""
+    redacted: list[str] = []
+    root, frame = self._open(value)
+    if frame is None:
+      return root, redacted
+
+    path: list[str] = []
+    stack = [frame]
+    containers = (dict, list)
+    cap_strings = self.max_string_length is not None
+    is_sensitive = self.is_sensitive
+    while stack:
+      frame = stack[-1]
+      target = frame.target
+      is_dict = frame.is_dict
+      for key, item in frame.items:
+        if is_dict:
+          key = str(key)
+          if is_sensitive(key):
+            path.append(key)
+            redacted.append(".".join(path))
+            path.pop()
+            target[key] = REDACTED_VALUE
+            continue
+        if isinstance(item, containers) or (
+          cap_strings and isinstance(item, str)
+        ):
+          child, child_frame = self._open(item)
+        else:
+          child, child_frame = item, None
+        if is_dict:
+          target[key] = child
+        else:
+          target.append(child)
+        if child_frame is not None:
+          path.append(key if is_dict else str(key))
+          stack.append(child_frame)
+          break
+      else:
+        self._close(stack.pop())
+        if stack:
+          path.pop()
+    return root, redacted
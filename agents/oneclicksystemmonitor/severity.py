@@ -0,0 +1,213 @@
+"""Rule-based severity calibration for OneClickSystemMonitor."""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+from .tools.pressure import some_avg10
+from .tools.summary_tools import (
+  CPU_HIGH_THRESHOLD,
+  CPU_MODERATE_THRESHOLD,
+  CPU_PRESSURE_HIGH_THRESHOLD,
+  CPU_PRESSURE_MODERATE_THRESHOLD,
+  DISK_HIGH_THRESHOLD,
+  DISK_MODERATE_THRESHOLD,
+  IO_PRESSURE_HIGH_THRESHOLD,
+  IO_PRESSURE_MODERATE_THRESHOLD,
+  MEMORY_HIGH_THRESHOLD,
+  MEMORY_MODERATE_THRESHOLD,
+  MEMORY_PRESSURE_HIGH_THRESHOLD,
+  MEMORY_PRESSURE_MODERATE_THRESHOLD,
+)
+
+SEVERITY_MARGIN_ENV_VAR = "SUMMARY_SEVERITY_MARGIN_PERCENT"
+DEFAULT_SEVERITY_MARGIN = 5.0
+GREEN = "green"
+YELLOW = "yellow"
+RED = "red"
+SEVERITY_ORDER = (GREEN, YELLOW, RED)
+
+
+class SeveritySignal:
+  """One metric compared against moderate and high thresholds.
+
+  max_rank caps the signal's contribution; utilization signals are
+  capped at yellow when stall (PSI) signals for the same resource exist.
+  """
+
+  def __init__(
+    self,
+    label: str,
+    value: float,
+    moderate: float,
+    high: float,
+    higher_is_worse: bool = True,
+    max_rank: int = 2,
+  ) -> None:
+    self.label = label
+    self.value = value
+    self.moderate = moderate
+    self.high = high
+    self.higher_is_worse = higher_is_worse
+    self.max_rank = max_rank
+
+  def rank(self, offset: float = 0.0) -> int:
+    """Return the severity rank of the value shifted by offset."""
+    value = self.value + offset
+    if self.higher_is_worse:
+      if value >= self.high:
+        rank = 2
+      elif value >= self.moderate:
+        rank = 1
+      else:
+        rank = 0
+    elif value <= self.high:
+      rank = 2
+    elif value <= self.moderate:
+      rank = 1
+    else:
+      rank = 0
+    return min(rank, self.max_rank)
+
+  def rank_range(self, margin: float) -> tuple[int, int]:
+    """Return the lowest and highest rank within +/- margin."""
+    ranks = (self.rank(-margin), self.rank(), self.rank(margin))
+    return min(ranks), max(ranks)
+
+
+class SeverityDecision:
+  """Locally calibrated severity verdict."""
+
+  def __init__(self, severity: str, reason: str) -> None:
+    self.severity = severity
+    self.reason = reason
+
+  def to_dict(self) -> dict[str, str]:
+    """Return the verdict in the model's JSON response shape."""
+    return {"severity": self.severity, "reason": self.reason}
+
+
+def _severity_margin() -> float:
+  """Return the confidence margin in percentage points."""
+  raw_margin = os.getenv(SEVERITY_MARGIN_ENV_VAR)
+  if not raw_margin:
+    return DEFAULT_SEVERITY_MARGIN
+  try:
+    return max(float(raw_margin), 0.0)
+  except ValueError:
+    return DEFAULT_SEVERITY_MARGIN
+
+
+def build_severity_signals(
+  metrics: dict[str, Any],
+) -> list[SeveritySignal] | None:
+  """Return threshold signals, or None when a metric is missing.
+
+  When a collector reports PSI, a stall signal for that resource is
+  added and its utilization signal can raise severity only to yellow.
+  """
+  cpu_stats = metrics.get("cpu_stats") or {}
+  memory_stats = metrics.get("memory_stats") or {}
+  disk_stats = metrics.get("disk_stats") or {}
+
+  cpu_usage = cpu_stats.get("usage_percent")
+  memory_available = memory_stats.get("available_percent")
+  drives = disk_stats.get("drives")
+  if cpu_usage is None or memory_available is None or drives is None:
+    return None
+
+  disk_usage = 0.0
+  for drive in drives:
+    disk_usage = max(disk_usage, drive.get("used_percent", 0))
+
+  cpu_stall = some_avg10(cpu_stats)
+  memory_stall = some_avg10(memory_stats)
+  io_stall = some_avg10(disk_stats)
+  signals = [
+    SeveritySignal(
+      "CPU usage",
+      cpu_usage,
+      CPU_MODERATE_THRESHOLD,
+      CPU_HIGH_THRESHOLD,
+      max_rank=2 if cpu_stall is None else 1,
+    ),
+    SeveritySignal(
+      "Available memory",
+      memory_available,
+      MEMORY_MODERATE_THRESHOLD,
+      MEMORY_HIGH_THRESHOLD,
+      higher_is_worse=False,
+      max_rank=2 if memory_stall is None else 1,
+    ),
+    SeveritySignal(
+      "Disk usage",
+      disk_usage,
+      DISK_MODERATE_THRESHOLD,
+      DISK_HIGH_THRESHOLD,
+    ),
+  ]
+  for label, stall, moderate, high in (
+    (
+      "CPU stall time",
+      cpu_stall,
+      CPU_PRESSURE_MODERATE_THRESHOLD,
+      CPU_PRESSURE_HIGH_THRESHOLD,
+    ),
+    (
+      "Memory stall time",
+      memory_stall,
+      MEMORY_PRESSURE_MODERATE_THRESHOLD,
+      MEMORY_PRESSURE_HIGH_THRESHOLD,
+    ),
+    (
+      "I/O stall time",
+      io_stall,
+      IO_PRESSURE_MODERATE_THRESHOLD,
+      IO_PRESSURE_HIGH_THRESHOLD,
+    ),
+  ):
+    if stall is not None:
+      signals.append(SeveritySignal(label, stall, moderate, high))
+  return signals
+
+
+def _reason_for(severity: str, signals: list[SeveritySignal]) -> str:
+  """Return a short sentence explaining the local verdict."""
+  if severity == GREEN:
+    return "CPU, memory, and disk usage are all well within healthy ranges."
+  rank = SEVERITY_ORDER.index(severity)
+  drivers = [
+    f"{signal.label} at {round(signal.value, 2)}%"
+    for signal in signals
+    if signal.rank() == rank
+  ]
+  verb = "is" if len(drivers) == 1 else "are"
+  level = "critical" if severity == RED else "elevated"
+  return f"{' and '.join(drivers)} {verb} {level}."
+
+
+def calibrate_severity(
+  metrics: dict[str, Any],
+  margin: float | None = None,
+) -> SeverityDecision | None:
+  """Return a local verdict for unambiguous snapshots.
+
+  A snapshot is unambiguous when moving every metric by +/- margin
+  percentage points cannot change the overall severity. Borderline or
+  incomplete snapshots return None so the caller escalates to the model.
+  """
+  signals = build_severity_signals(metrics)
+  if not signals:
+    return None
+  if margin is None:
+    margin = _severity_margin()
+
+  lowest = max(signal.rank_range(margin)[0] for signal in signals)
+  highest = max(signal.rank_range(margin)[1] for signal in signals)
+  if lowest != highest:
+    return None
+
+  severity = SEVERITY_ORDER[highest]
+  return SeverityDecision(severity, _reason_for(severity, signals))
+
@@ -0,0 +1,262 @@
+"""Quantized-metrics response cache for the severity model."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import math
+import os
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Any
+
+from .tools.env import env_float, env_int
+
+CACHE_ENABLED_ENV_VAR = "SUMMARY_RESPONSE_CACHE_ENABLED"
+CACHE_TTL_ENV_VAR = "SUMMARY_RESPONSE_CACHE_TTL_SECONDS"
+CACHE_MAX_ENTRIES_ENV_VAR = "SUMMARY_RESPONSE_CACHE_MAX_ENTRIES"
+CACHE_BUCKETS_ENV_VAR = "SUMMARY_RESPONSE_CACHE_BUCKETS"
+CACHE_PATH_ENV_VAR = "SUMMARY_RESPONSE_CACHE_PATH"
+DEFAULT_CACHE_TTL_SECONDS = 300.0
+DEFAULT_CACHE_MAX_ENTRIES = 256
+DEFAULT_BUCKET_WIDTHS = {
+  "percent": 5.0,
+  "mb_s": 10.0,
+  "gb": 1.0,
+  "avg10": 5.0,
+  "avg60": 5.0,
+  "avg300": 5.0,
+  "default": 1.0,
+}
+IGNORED_METRIC_KEYS = frozenset(
+  {
+    "per_core_percent",
+    "top_process",
+    "top_processes",
+    "total_delta_us",
+    "interval_s",
+  }
+)
+VALID_SEVERITIES = frozenset({"green", "yellow", "red"})
+_FALSY_VALUES = {"0", "false", "no", "off"}
+_LOGGER = logging.getLogger(__name__)
+
+
+def _bucket_width(key: str, bucket_widths: dict[str, float]) -> float:
+  """Return the bucket width for a metric key based on its unit suffix."""
+  for suffix, width in bucket_widths.items():
+    if suffix != "default" and key.endswith(suffix):
+      return width
+  return bucket_widths.get("default", DEFAULT_BUCKET_WIDTHS["default"])
+
+
+def _quantize(
+  value: Any,
+  key: str,
+  bucket_widths: dict[str, float],
+) -> Any:
+  """Return a hashable, bucketed copy of a metrics value."""
+  if isinstance(value, dict):
+    return tuple(
+      (item_key, _quantize(item, item_key, bucket_widths))
+      for item_key, item in sorted(value.items())
+      if item_key not in IGNORED_METRIC_KEYS
+      and not isinstance(item, str)
+    )
+  if isinstance(value, list):
+    return tuple(_quantize(item, key, bucket_widths) for item in value)
+  if isinstance(value, bool) or value is None:
+    return value
+  if isinstance(value, (int, float)):
+    width = _bucket_width(key, bucket_widths)
+    if width <= 0:
+      return value
+    return math.floor(value / width)
+  return None
+
+
+def fingerprint_metrics(
+  metrics: dict[str, Any],
+  bucket_widths: dict[str, float] | None = None,
+) -> str:
+  """Return a stable hash of the bucketed numeric metrics.
+
+  String fields such as *_reason and the per-core and top-process details
+  are ignored so that steady hosts map to the same key.
+  """
+  if bucket_widths is None:
+    bucket_widths = DEFAULT_BUCKET_WIDTHS
+  quantized = _quantize(metrics, "", bucket_widths)
+  encoded = repr(quantized).encode("utf-8")
+  return hashlib.sha256(encoded).hexdigest()
+
+
+def parse_severity_response(text: str | None) -> str | None:
+  """Return normalized severity JSON from model text, or None."""
+  if not text:
+    return None
+  start = text.find("{")
+  end = text.rfind("}")
+  if start == -1 or end < start:
+    return None
+  try:
+    payload = json.loads(text[start:end + 1])
+  except json.JSONDecodeError:
+    return None
+  if not isinstance(payload, dict):
+    return None
+  if payload.get("severity") not in VALID_SEVERITIES:
+    return None
+  return json.dumps(
+    {"severity": payload["severity"], "reason": payload.get("reason", "")}
+  )
+
+
+class SeverityResponseCache:
+  """LRU + TTL cache of severity JSON keyed by metric fingerprints."""
+
+  def __init__(
+    self,
+    max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+    ttl_seconds: float = DEFAULT_CACHE_TTL_SECONDS,
+    bucket_widths: dict[str, float] | None = None,
+    store_path: str | Path | None = None,
+  ) -> None:
+    if max_entries <= 0:
+      raise ValueError("Cache max_entries must be positive.")
+    self.max_entries = max_entries
+    self.ttl_seconds = ttl_seconds
+    self.bucket_widths = dict(bucket_widths or DEFAULT_BUCKET_WIDTHS)
+    self.hits = 0
+    self.misses = 0
+    self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+    self._lock = threading.Lock()
+    self._store: sqlite3.Connection | None = None
+    if store_path is not None:
+      self._open_store(Path(store_path))
+
+  def __len__(self) -> int:
+    return len(self._entries)
+
+  def key_for(self, metrics: dict[str, Any]) -> str:
+    """Return the cache key for a metrics block."""
+    return fingerprint_metrics(metrics, self.bucket_widths)
+
+  def get(self, key: str) -> str | None:
+    """Return cached severity JSON and update hit/miss counters."""
+    now = time.time()
+    with self._lock:
+      entry = self._entries.get(key)
+      if entry is None or entry[0] <= now:
+        if entry is not None:
+          self._discard(key)
+        self.misses += 1
+        return None
+      self._entries.move_to_end(key)
+      self.hits += 1
+      return entry[1]
+
+  def put(self, key: str, response: str) -> None:
+    """Store severity JSON, evicting the least recently used entry."""
+    expires_at = time.time() + self.ttl_seconds
+    with self._lock:
+      self._entries[key] = (expires_at, response)
+      self._entries.move_to_end(key)
+      while len(self._entries) > self.max_entries:
+        oldest_key = next(iter(self._entries))
+        self._discard(oldest_key)
+      if self._store is not None:
+        self._store.execute(
+          "INSERT OR REPLACE INTO severity_cache VALUES (?, ?, ?)",
+          (key, response, expires_at),
+        )
+        self._store.execute(
+          "DELETE FROM severity_cache WHERE expires_at <= ?",
+          (time.time(),),
+        )
+        self._store.commit()
+
+  def stats(self) -> dict[str, Any]:
+    """Return hit/miss counters and the current size."""
+    with self._lock:
+      lookups = self.hits + self.misses
+      return {
+        "hits": self.hits,
+        "misses": self.misses,
+        "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        "size": len(self._entries),
+      }
+
+  def close(self) -> None:
+    """Close the on-disk backing store."""
+    with self._lock:
+      if self._store is not None:
+        self._store.close()
+        self._store = None
+
+  def _discard(self, key: str) -> None:
+    """Drop a key from memory and the backing store. Caller holds lock."""
+    self._entries.pop(key, None)
+    if self._store is not None:
+      self._store.execute("DELETE FROM severity_cache WHERE key = ?", (key,))
+
+  def _open_store(self, store_path: Path) -> None:
+    """Open the SQLite backing store and load unexpired entries."""
+    store_path.parent.mkdir(parents=True, exist_ok=True)
+    store = sqlite3.connect(str(store_path), check_same_thread=False)
+    store.execute(
+      "CREATE TABLE IF NOT EXISTS severity_cache ("
+      "key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL)"
+    )
+    rows = store.execute(
+      "SELECT key, response, expires_at FROM severity_cache "
+      "WHERE expires_at > ? ORDER BY expires_at DESC LIMIT ?",
+      (time.time(), self.max_entries),
+    ).fetchall()
+    for key, response, expires_at in reversed(rows):
+      self._entries[key] = (expires_at, response)
+    self._store = store
+
+
+def _parse_bucket_widths(raw_value: str | None) -> dict[str, float]:
+  """Parse 'percent=5,mb_s=10' style bucket overrides."""
+  bucket_widths = dict(DEFAULT_BUCKET_WIDTHS)
+  if not raw_value:
+    return bucket_widths
+  for item in raw_value.split(","):
+    name, _, width = item.partition("=")
+    try:
+      bucket_widths[name.strip()] = float(width)
+    except ValueError:
+      _LOGGER.warning("Ignoring invalid cache bucket width: %s", item)
+  return bucket_widths
+
+
+_SEVERITY_CACHE: SeverityResponseCache | None = None
+_SEVERITY_CACHE_LOCK = threading.Lock()
+
+
+def get_severity_cache() -> SeverityResponseCache | None:
+  """Return the process-wide cache, or None when disabled."""
+  global _SEVERITY_CACHE
+  enabled = os.getenv(CACHE_ENABLED_ENV_VAR, "1").strip().lower()
+  if enabled in _FALSY_VALUES:
+    return None
+  if _SEVERITY_CACHE is not None:
+    return _SEVERITY_CACHE
+  with _SEVERITY_CACHE_LOCK:
+    if _SEVERITY_CACHE is None:
+      _SEVERITY_CACHE = SeverityResponseCache(
+        max_entries=env_int(
+          CACHE_MAX_ENTRIES_ENV_VAR,
+          DEFAULT_CACHE_MAX_ENTRIES,
+        ),
+        ttl_seconds=env_float(CACHE_TTL_ENV_VAR, DEFAULT_CACHE_TTL_SECONDS),
+        bucket_widths=_parse_bucket_widths(os.getenv(CACHE_BUCKETS_ENV_VAR)),
+        store_path=os.getenv(CACHE_PATH_ENV_VAR) or None,
+      )
+  return _SEVERITY_CACHE
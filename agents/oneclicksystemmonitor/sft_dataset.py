@@ -0,0 +1,249 @@
+"""Build sharded SFT datasets from captured summary inputs.
+
+Capture logs are streamed in fixed-size line chunks. Worker processes
+parse, label, and fingerprint each chunk; the parent keeps only the
+fingerprints it has already written, so memory stays bounded by the
+number of in-flight chunks and distinct quantized metric vectors rather
+than by input size.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import json
+import logging
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator
+
+from .severity import calibrate_severity
+from .severity_cache import fingerprint_metrics
+from .summary_log import (
+  SUMMARY_INPUT_SCHEMA_V1,
+  decode_summary_record,
+  encode_summary_record,
+)
+
+SFT_SYSTEM_INSTRUCTION = (
+  "You are a system health severity calibrator. Read the input metrics and "
+  "return JSON with fields: severity (green|yellow|red) and reason (short "
+  "sentence)."
+)
+SFT_INPUT_PREFIX = "Input sample:\n"
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_SHARD_SIZE = 50_000
+SHARD_NAME_TEMPLATE = "sft-{index:05d}.jsonl"
+_COMPACT = (",", ":")
+_LOGGER = logging.getLogger(__name__)
+
+
+class BuildStats:
+  """Counters reported by build_sft_dataset."""
+
+  def __init__(self) -> None:
+    self.read = 0
+    self.malformed = 0
+    self.unlabeled = 0
+    self.duplicates = 0
+    self.written = 0
+    self.shards: list[Path] = []
+
+  def merge(self, chunk_stats: dict[str, int]) -> None:
+    """Add per-chunk worker counters."""
+    self.read += chunk_stats["read"]
+    self.malformed += chunk_stats["malformed"]
+    self.unlabeled += chunk_stats["unlabeled"]
+
+  def to_dict(self) -> dict[str, Any]:
+    """Return counters and shard paths as JSON-friendly values."""
+    return {
+      "read": self.read,
+      "malformed": self.malformed,
+      "unlabeled": self.unlabeled,
+      "duplicates": self.duplicates,
+      "written": self.written,
+      "shards": [str(path) for path in self.shards],
+    }
+
+
+def _training_input(record: dict[str, Any]) -> dict[str, Any]:
+  """Return the v1 sample shape used in sft_training.jsonl."""
+  sample = dict(decode_summary_record(record))
+  sample["schema_version"] = SUMMARY_INPUT_SCHEMA_V1
+  sample["state"] = encode_summary_record(sample)["state"]
+  return sample
+
+
+def build_sft_example(record: dict[str, Any]) -> dict[str, Any] | None:
+  """Return one labeled training example, or None if unlabelable."""
+  sample = _training_input(record)
+  decision = calibrate_severity(sample.get("metrics") or {}, margin=0.0)
+  if decision is None:
+    return None
+  return {
+    "systemInstruction": {
+      "role": "system",
+      "parts": [{"text": SFT_SYSTEM_INSTRUCTION}],
+    },
+    "contents": [
+      {
+        "role": "user",
+        "parts": [
+          {
+            "text": SFT_INPUT_PREFIX
+            + json.dumps(sample, ensure_ascii=True, separators=_COMPACT)
+          }
+        ],
+      },
+      {
+        "role": "model",
+        "parts": [
+          {
+            "text": json.dumps(decision.to_dict(), separators=_COMPACT),
+          }
+        ],
+      },
+    ],
+  }
+
+
+def label_chunk(
+  lines: list[str],
+) -> tuple[list[tuple[str, str]], dict[str, int]]:
+  """Label a chunk of capture lines in a worker process.
+
+  Returns:
+    (fingerprint, example JSON line) pairs in input order, and counters.
+  """
+  examples: list[tuple[str, str]] = []
+  stats = {"read": 0, "malformed": 0, "unlabeled": 0}
+  for line in lines:
+    if not line.strip():
+      continue
+    stats["read"] += 1
+    try:
+      record = json.loads(line)
+      example = build_sft_example(record)
+    except (json.JSONDecodeError, ValueError, TypeError, AttributeError):
+      stats["malformed"] += 1
+      continue
+    if example is None:
+      stats["unlabeled"] += 1
+      continue
+    fingerprint = fingerprint_metrics(
+      decode_summary_record(record).get("metrics") or {}
+    )
+    examples.append(
+      (fingerprint, json.dumps(example, ensure_ascii=True, separators=_COMPACT))
+    )
+  return examples, stats
+
+
+def _iter_chunks(
+  sources: Iterable[Path],
+  chunk_size: int,
+) -> Iterator[list[str]]:
+  """Yield lists of at most chunk_size lines across all sources."""
+  chunk: list[str] = []
+  for source in sources:
+    with source.open("r", encoding="utf-8") as handle:
+      for line in handle:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+          yield chunk
+          chunk = []
+  if chunk:
+    yield chunk
+
+
+class _ShardWriter:
+  """Append lines to numbered shard files of at most shard_size lines."""
+
+  def __init__(self, output_dir: Path, shard_size: int) -> None:
+    self.output_dir = output_dir
+    self.shard_size = shard_size
+    self.paths: list[Path] = []
+    self._handle: IO[str] | None = None
+    self._count = 0
+
+  def write(self, line: str) -> None:
+    """Append one line, opening the next shard when the current is full."""
+    if self._handle is None or self._count >= self.shard_size:
+      self.close()
+      path = self.output_dir / SHARD_NAME_TEMPLATE.format(
+        index=len(self.paths)
+      )
+      self._handle = path.open("w", encoding="utf-8")
+      self.paths.append(path)
+      self._count = 0
+    self._handle.write(line + "\n")
+    self._count += 1
+
+  def close(self) -> None:
+    """Close the current shard."""
+    if self._handle is not None:
+      self._handle.close()
+      self._handle = None
+
+
+def _completed_chunks(
+  chunks: Iterator[list[str]],
+  workers: int,
+) -> Iterator[tuple[list[tuple[str, str]], dict[str, int]]]:
+  """Yield labeled chunks in input order with bounded in-flight work."""
+  if workers <= 1:
+    for chunk in chunks:
+      yield label_chunk(chunk)
+    return
+
+  with ProcessPoolExecutor(max_workers=workers) as executor:
+    pending: deque[Future] = deque()
+    for chunk in chunks:
+      pending.append(executor.submit(label_chunk, chunk))
+      if len(pending) >= workers * 2:
+        yield pending.popleft().result()
+    while pending:
+      yield pending.popleft().result()
+
+
+def build_sft_dataset(
+  sources: Iterable[str | Path],
+  output_dir: str | Path,
+  workers: int = 1,
+  chunk_size: int = DEFAULT_CHUNK_SIZE,
+  shard_size: int = DEFAULT_SHARD_SIZE,
+) -> BuildStats:
+  """Label capture logs and write deduplicated, sharded SFT files.
+
+  Args:
+    sources: v1 or v2 summary-input JSONL files.
+    output_dir: Directory that receives sft-NNNNN.jsonl shards.
+    workers: Worker processes; 1 labels in-process.
+    chunk_size: Lines handed to a worker at a time.
+    shard_size: Maximum examples per shard.
+
+  Returns:
+    Counters for read, malformed, unlabeled, duplicate, and written
+    records plus the shard paths.
+  """
+  output_path = Path(output_dir)
+  output_path.mkdir(parents=True, exist_ok=True)
+  stats = BuildStats()
+  seen: set[str] = set()
+  shards = _ShardWriter(output_path, shard_size)
+  chunks = _iter_chunks((Path(source) for source in sources), chunk_size)
+  try:
+    for examples, chunk_stats in _completed_chunks(chunks, workers):
+      stats.merge(chunk_stats)
+      for fingerprint, line in examples:
+        if fingerprint in seen:
+          stats.duplicates += 1
+          continue
+        seen.add(fingerprint)
+        shards.write(line)
+        stats.written += 1
+  finally:
+    shards.close()
+  stats.shards = shards.paths
+  _LOGGER.info("Built SFT dataset: %s", stats.to_dict())
+  return stats
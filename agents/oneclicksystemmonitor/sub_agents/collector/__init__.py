@@ -0,0 +1,5 @@
+"""Direct collection sub-agent package."""
+
+from .agent import direct_collector_agent
+
+__all__ = ["direct_collector_agent"]
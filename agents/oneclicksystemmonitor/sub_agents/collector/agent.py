@@ -0,0 +1,46 @@
+"""LLM-free system collection agent for OneClickSystemMonitor."""
+
+from __future__ import annotations
+
+import json
+from typing import AsyncGenerator, TYPE_CHECKING
+
+from google.adk.agents import BaseAgent
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from ...tools.collection import collect_system_stats
+
+if TYPE_CHECKING:
+  from google.adk.agents.invocation_context import InvocationContext
+
+
+class DirectCollectorAgent(BaseAgent):
+  """Invoke every collector concurrently without a model round-trip."""
+
+  async def _run_async_impl(
+    self,
+    ctx: "InvocationContext",
+  ) -> AsyncGenerator[Event, None]:
+    """Collect stats and publish them as one state-delta event."""
+    state_delta = await collect_system_stats()
+    yield Event(
+      author=self.name,
+      invocation_id=ctx.invocation_id,
+      branch=ctx.branch,
+      content=types.Content(
+        role="model",
+        parts=[
+          types.Part(
+            text=json.dumps(state_delta, ensure_ascii=True, default=str)
+          )
+        ],
+      ),
+      actions=EventActions(state_delta=state_delta),
+    )
+
+
+direct_collector_agent = DirectCollectorAgent(
+  name="system_info_gatherer",
+  description="Collects CPU, memory, and disk stats without LLM calls.",
+)
@@ -4,10 +4,10 @@ from google.adk.agents import LlmAgent
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.tools import FunctionTool
 
-from ...tools import collect_cpu_stats
+from ...tools import collect_cpu_stats_async
 
 CPU_AGENT_INSTRUCTION = (
-  "Collect CPU usage information using the collect_cpu_stats tool and "
+  "Collect CPU usage information using the collect_cpu_stats_async tool and "
   "return the tool response."
 )
 
@@ -19,5 +19,5 @@ cpu_agent = LlmAgent(
   ),
   description="Collects CPU usage statistics.",
   instruction=CPU_AGENT_INSTRUCTION,
-  tools=[FunctionTool(func=collect_cpu_stats)],
+  tools=[FunctionTool(func=collect_cpu_stats_async)],
 )
@@ -4,11 +4,11 @@ from google.adk.agents import LlmAgent
 from google.adk.models.lite_llm import LiteLlm
 from google.adk.tools import FunctionTool
 
-from ...tools import collect_memory_stats
+from ...tools import collect_memory_stats_async
 
 MEMORY_AGENT_INSTRUCTION = (
-  "Collect memory usage information using the collect_memory_stats tool and "
-  "return the tool response."
+  "Collect memory usage information using the collect_memory_stats_async "
+  "tool and return the tool response."
 )
 
 memory_agent = LlmAgent(
@@ -19,5 +19,5 @@ memory_agent = LlmAgent(
   ),
   description="Collects memory usage statistics.",
   instruction=MEMORY_AGENT_INSTRUCTION,
-  tools=[FunctionTool(func=collect_memory_stats)],
+  tools=[FunctionTool(func=collect_memory_stats_async)],
 )
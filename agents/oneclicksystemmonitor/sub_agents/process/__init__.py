@@ -0,0 +1,5 @@
+"""Process sub-agent package."""
+
+from .agent import process_agent
+
+__all__ = ["process_agent"]
@@ -0,0 +1,19 @@
+"""Process table sub-agent for OneClickSystemMonitor."""
+
+from google.adk.agents import LlmAgent
+from google.adk.tools import FunctionTool
+
+from ...tools import collect_process_stats
+
+PROCESS_AGENT_INSTRUCTION = (
+  "Collect per-process usage grouped by name and user using the "
+  "collect_process_stats tool and return the tool response."
+)
+
+process_agent = LlmAgent(
+  name="process_monitor",
+  model="gemma-3-27b-it",
+  description="Collects per-process usage grouped by name and user.",
+  instruction=PROCESS_AGENT_INSTRUCTION,
+  tools=[FunctionTool(func=collect_process_stats)],
+)
@@ -3,7 +3,12 @@
 from google.adk.agents import LlmAgent
 from google.adk.models.lite_llm import LiteLlm
 
-from ...callbacks import log_summary_input_payload
+from ...callbacks import (
+  log_summary_input_payload,
+  severity_cache_after_model_callback,
+  severity_cache_before_model_callback,
+  severity_fast_path_before_model_callback,
+)
 
 # ENDPOINT_ID = "8117895558498091008"
 ENDPOINT_ID = "2340903136488587264"
@@ -22,5 +27,10 @@ summary_agent = LlmAgent(
     "and reason (short sentence)."
   ),
   before_agent_callback=log_summary_input_payload,
+  before_model_callback=[
+    severity_fast_path_before_model_callback,
+    severity_cache_before_model_callback,
+  ],
+  after_model_callback=severity_cache_after_model_callback,
   # tools=[FunctionTool(func=generate_summary_report)],
 )
@@ -0,0 +1,154 @@
+"""Summary-input log schemas, reader, and v1 to v2 converter.
+
+summary-input-v1 stored every collector payload twice, under metrics and
+again under state. summary-input-v2 stores each value once: state keeps
+only session keys that are not already in metrics or context, and lists
+of per-drive or per-process records become column arrays.
+
+Upgrade an existing log with scripts/convert_summary_log.py.
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator
+
+SUMMARY_INPUT_SCHEMA_V1 = "summary-input-v1"
+SUMMARY_INPUT_SCHEMA_V2 = "summary-input-v2"
+METRIC_KEYS = ("cpu_stats", "memory_stats", "disk_stats")
+CONTEXT_KEYS = (
+  "host_context",
+  "app_context",
+  "recent_incidents",
+  "user_reports",
+)
+COLUMNAR_FIELDS = (
+  ("cpu_stats", "top_processes"),
+  ("disk_stats", "drives"),
+)
+_LOGGER = logging.getLogger(__name__)
+
+
+def _to_columns(rows: list[Any]) -> Any:
+  """Turn a list of flat records into {field: [values...]}."""
+  if not all(isinstance(row, dict) for row in rows):
+    return rows
+  columns: dict[str, list[Any]] = {}
+  for index, row in enumerate(rows):
+    for key in row:
+      if key not in columns:
+        columns[key] = [None] * index
+    for key, column in columns.items():
+      column.append(row.get(key))
+  return columns
+
+
+def _from_columns(columns: Any) -> Any:
+  """Invert _to_columns back into a list of records."""
+  if not isinstance(columns, dict):
+    return columns
+  names = list(columns)
+  if not names:
+    return []
+  return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def _map_columnar(
+  metrics: dict[str, Any],
+  convert: Any,
+) -> dict[str, Any]:
+  """Return metrics with COLUMNAR_FIELDS passed through convert."""
+  converted = dict(metrics)
+  for metric_key, field in COLUMNAR_FIELDS:
+    block = converted.get(metric_key)
+    if isinstance(block, dict) and block.get(field) is not None:
+      block = dict(block)
+      block[field] = convert(block[field])
+      converted[metric_key] = block
+  return converted
+
+
+def encode_summary_record(record: dict[str, Any]) -> dict[str, Any]:
+  """Return the v2 form of a v1-shaped summary input record."""
+  if record.get("schema_version") == SUMMARY_INPUT_SCHEMA_V2:
+    return record
+  metrics = record.get("metrics") or {}
+  context = record.get("context") or {}
+  shared = {**context, **metrics}
+  state = {
+    key: value
+    for key, value in (record.get("state") or {}).items()
+    if key not in shared or shared[key] != value
+  }
+  encoded = dict(record)
+  encoded["schema_version"] = SUMMARY_INPUT_SCHEMA_V2
+  encoded["metrics"] = _map_columnar(metrics, _to_columns)
+  encoded["state"] = state
+  return encoded
+
+
+def decode_summary_record(record: dict[str, Any]) -> dict[str, Any]:
+  """Return a v1-shaped view of a v1 or v2 record.
+
+  The rebuilt state holds every non-null metrics and context value plus
+  the residual v2 state, so readers can treat both versions alike.
+  """
+  version = record.get("schema_version")
+  if version == SUMMARY_INPUT_SCHEMA_V1:
+    return record
+  if version != SUMMARY_INPUT_SCHEMA_V2:
+    raise ValueError(f"Unknown summary input schema: {version}")
+  metrics = _map_columnar(record.get("metrics") or {}, _from_columns)
+  state = {
+    key: value
+    for key, value in {**(record.get("context") or {}), **metrics}.items()
+    if value is not None
+  }
+  state.update(record.get("state") or {})
+  decoded = dict(record)
+  decoded["metrics"] = metrics
+  decoded["state"] = state
+  return decoded
+
+
+def _open_text(path: Path, mode: str) -> IO[str]:
+  """Open a plain or gzip-compressed JSONL file."""
+  if path.suffix == ".gz":
+    return gzip.open(path, mode + "t", encoding="utf-8")
+  return path.open(mode, encoding="utf-8")
+
+
+def _iter_raw_records(lines: Iterable[str]) -> Iterator[dict[str, Any]]:
+  """Yield parsed records, skipping blank or malformed lines."""
+  for number, line in enumerate(lines, start=1):
+    if not line.strip():
+      continue
+    try:
+      yield json.loads(line)
+    except json.JSONDecodeError:
+      _LOGGER.warning("Skipping malformed summary log line %s", number)
+
+
+def iter_summary_records(path: str | Path) -> Iterator[dict[str, Any]]:
+  """Stream v1-shaped records from a v1, v2, or mixed log file."""
+  with _open_text(Path(path), "r") as handle:
+    for record in _iter_raw_records(handle):
+      yield decode_summary_record(record)
+
+
+def convert_summary_log(source: str | Path, destination: str | Path) -> int:
+  """Stream-convert a summary log to v2 and return the record count."""
+  count = 0
+  with _open_text(Path(source), "r") as reader, \
+      _open_text(Path(destination), "w") as writer:
+    for record in _iter_raw_records(reader):
+      encoded = encode_summary_record(record)
+      writer.write(
+        json.dumps(encoded, ensure_ascii=True, separators=(",", ":"))
+        + "\n"
+      )
+      count += 1
+  return count
@@ -1,13 +1,17 @@
 """Tool exports for OneClickSystemMonitor."""
 
-from .cpu_tools import collect_cpu_stats
+from .cpu_tools import collect_cpu_stats, collect_cpu_stats_async
 from .disk_tools import collect_disk_stats
-from .memory_tools import collect_memory_stats
+from .memory_tools import collect_memory_stats, collect_memory_stats_async
+from .process_tools import collect_process_stats
 from .summary_tools import generate_summary_report
 
 __all__ = [
   "collect_cpu_stats",
+  "collect_cpu_stats_async",
   "collect_disk_stats",
   "collect_memory_stats",
+  "collect_memory_stats_async",
+  "collect_process_stats",
   "generate_summary_report",
 ]
@@ -0,0 +1,661 @@
+"""Collector backends for OneClickSystemMonitor.
+
+The tools talk to psutil by default. On Linux, the procfs backend reads
+/proc and /sys directly through persistent descriptors and reusable
+buffers, parsing each file in one pass while returning objects with the
+same attribute names psutil uses, so tool output stays identical.
+
+Inside a cgroup v2 container with CPU or memory limits, either backend
+is wrapped by CgroupBackend, which reports CPU, memory, and disk I/O
+relative to the container's own quota instead of the whole node.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+import sys
+import threading
+import time
+from typing import Any
+
+BACKEND_ENV_VAR = "SYSTEM_MONITOR_COLLECTOR_BACKEND"
+PSUTIL_BACKEND = "psutil"
+PROCFS_BACKEND = "procfs"
+AUTO_BACKEND = "auto"
+DEFAULT_BACKEND = PSUTIL_BACKEND
+PROCFS_ROOT = "/proc"
+SYSFS_BLOCK_ROOT = "/sys/block"
+CGROUP_ENV_VAR = "SYSTEM_MONITOR_CGROUP"
+CGROUP_AUTO = "auto"
+CGROUP_OFF = "off"
+CGROUP_CONTROLLERS = frozenset({"cpu", "memory"})
+DISK_SECTOR_SIZE = 512
+INITIAL_BUFFER_SIZE = 16 * 1024
+_MOUNT_ESCAPE_PATTERN = re.compile(rb"\\([0-7]{3})")
+
+
+class CollectorRecord:
+  """Attribute bag mirroring the psutil named tuples the tools read."""
+
+  def __init__(self, **fields: Any) -> None:
+    self.__dict__.update(fields)
+
+  def __repr__(self) -> str:
+    fields = ", ".join(f"{key}={value!r}" for key, value in vars(self).items())
+    return f"{type(self).__name__}({fields})"
+
+
+class _ProcFile:
+  """Re-readable kernel file backed by one descriptor and one buffer.
+
+  Collectors on different pool threads share backends, so reads and
+  close hold a per-file lock around the shared descriptor and buffer.
+  """
+
+  def __init__(self, path: str) -> None:
+    self.path = path
+    self._fd: int | None = None
+    self._buffer = bytearray(INITIAL_BUFFER_SIZE)
+    self._lock = threading.Lock()
+
+  def read(self) -> bytes:
+    """Return the current file contents using a single pread per call."""
+    with self._lock:
+      while True:
+        if self._fd is None:
+          self._fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        try:
+          size = os.preadv(self._fd, [self._buffer], 0)
+        except OSError:
+          self._close()
+          raise
+        if size < len(self._buffer):
+          return bytes(memoryview(self._buffer)[:size])
+        self._buffer = bytearray(len(self._buffer) * 2)
+
+  def close(self) -> None:
+    """Release the underlying descriptor."""
+    with self._lock:
+      self._close()
+
+  def _close(self) -> None:
+    """Release the descriptor; the caller holds the lock."""
+    if self._fd is not None:
+      try:
+        os.close(self._fd)
+      finally:
+        self._fd = None
+
+
+def _unescape_mount_field(field: bytes) -> str:
+  """Decode octal escapes used by /proc/self/mounts."""
+  if b"\\" in field:
+    field = _MOUNT_ESCAPE_PATTERN.sub(
+      lambda match: bytes([int(match.group(1), 8)]),
+      field,
+    )
+  return field.decode("utf-8", "surrogateescape")
+
+
+def _usage_percent(used: float, total: float) -> float:
+  """Return used/total as a percentage rounded like psutil."""
+  if total <= 0:
+    return 0.0
+  return round(used / total * 100, 1)
+
+
+class ProcfsBackend:
+  """Linux backend that parses /proc and /sys without psutil."""
+
+  name = PROCFS_BACKEND
+
+  def __init__(
+    self,
+    procfs_root: str = PROCFS_ROOT,
+    sysfs_block_root: str = SYSFS_BLOCK_ROOT,
+  ) -> None:
+    self._stat = _ProcFile(f"{procfs_root}/stat")
+    self._meminfo = _ProcFile(f"{procfs_root}/meminfo")
+    self._diskstats = _ProcFile(f"{procfs_root}/diskstats")
+    self._mounts = _ProcFile(f"{procfs_root}/self/mounts")
+    self._filesystems_path = f"{procfs_root}/filesystems"
+    self._sysfs_block_root = sysfs_block_root
+    self._physical_fstypes: set[str] | None = None
+    self._storage_devices: dict[str, bool] = {}
+    self._last_cpu_times: list[tuple[int, int]] | None = None
+    self._lock = threading.Lock()
+
+  def close(self) -> None:
+    """Release every cached descriptor."""
+    for proc_file in (self._stat, self._meminfo, self._diskstats, self._mounts):
+      proc_file.close()
+
+  def _read_cpu_times(self) -> list[tuple[int, int]]:
+    """Return (busy, total) jiffies per CPU from /proc/stat."""
+    per_cpu = []
+    for line in self._stat.read().split(b"\n"):
+      if not line.startswith(b"cpu") or line.startswith(b"cpu "):
+        if per_cpu:
+          break
+        continue
+      values = [int(value) for value in line.split()[1:]]
+      total = sum(values) - sum(values[8:10])
+      busy = total - values[3] - (values[4] if len(values) > 4 else 0)
+      per_cpu.append((busy, total))
+    return per_cpu
+
+  def cpu_percent(
+    self,
+    interval: float | None = None,
+    percpu: bool = False,
+  ) -> float | list[float]:
+    """Return CPU utilization with psutil.cpu_percent semantics."""
+    with self._lock:
+      if interval:
+        before = self._read_cpu_times()
+      else:
+        before = self._last_cpu_times
+    if interval:
+      time.sleep(interval)
+    with self._lock:
+      after = self._read_cpu_times()
+      self._last_cpu_times = after
+    if before is None or len(before) != len(after):
+      before = [(0, 0)] * len(after)
+
+    per_core = []
+    busy_sum = 0
+    total_sum = 0
+    for (busy_start, total_start), (busy_end, total_end) in zip(before, after):
+      busy_delta = busy_end - busy_start
+      total_delta = total_end - total_start
+      busy_sum += busy_delta
+      total_sum += total_delta
+      if total_delta <= 0:
+        per_core.append(0.0)
+      else:
+        per_core.append(
+          round(min(max(busy_delta / total_delta * 100, 0.0), 100.0), 1)
+        )
+
+    if percpu:
+      return per_core
+    if total_sum <= 0:
+      return 0.0
+    return round(min(max(busy_sum / total_sum * 100, 0.0), 100.0), 1)
+
+  def _read_meminfo(self) -> dict[bytes, int]:
+    """Return /proc/meminfo values in bytes keyed by field name."""
+    values = {}
+    for line in self._meminfo.read().split(b"\n"):
+      fields = line.split()
+      if len(fields) >= 2:
+        values[fields[0]] = int(fields[1]) * 1024
+    return values
+
+  def virtual_memory(self) -> CollectorRecord:
+    """Return memory stats with psutil.virtual_memory semantics."""
+    mems = self._read_meminfo()
+    total = mems[b"MemTotal:"]
+    free = mems[b"MemFree:"]
+    buffers = mems.get(b"Buffers:", 0)
+    cached = mems.get(b"Cached:", 0) + mems.get(b"SReclaimable:", 0)
+    available = mems.get(b"MemAvailable:") or free + buffers + cached
+    if available < 0:
+      available = 0
+    elif available > total:
+      available = free
+    return CollectorRecord(
+      total=total,
+      available=available,
+      percent=_usage_percent(total - available, total),
+      used=total - available,
+      free=free,
+      buffers=buffers,
+      cached=cached,
+    )
+
+  def swap_memory(self) -> CollectorRecord:
+    """Return swap stats with psutil.swap_memory semantics."""
+    mems = self._read_meminfo()
+    total = mems.get(b"SwapTotal:", 0)
+    free = mems.get(b"SwapFree:", 0)
+    used = total - free
+    return CollectorRecord(
+      total=total,
+      used=used,
+      free=free,
+      percent=_usage_percent(used, total),
+    )
+
+  def _is_storage_device(self, name: str) -> bool:
+    """Return True for whole block devices, mirroring psutil totals."""
+    known = self._storage_devices.get(name)
+    if known is None:
+      device_path = f"{self._sysfs_block_root}/{name.replace('/', '!')}"
+      known = os.path.exists(device_path)
+      self._storage_devices[name] = known
+    return known
+
+  def disk_io_counters(self) -> CollectorRecord | None:
+    """Return summed disk counters with psutil.disk_io_counters semantics."""
+    read_count = write_count = read_sectors = write_sectors = 0
+    found = False
+    for line in self._diskstats.read().split(b"\n"):
+      fields = line.split()
+      if len(fields) == 14 or len(fields) >= 18:
+        name = fields[2].decode("ascii", "replace")
+        reads, writes = int(fields[3]), int(fields[7])
+        rsectors, wsectors = int(fields[5]), int(fields[9])
+      elif len(fields) == 7:
+        name = fields[2].decode("ascii", "replace")
+        reads, rsectors, writes, wsectors = map(int, fields[3:7])
+      else:
+        continue
+      if not self._is_storage_device(name):
+        continue
+      found = True
+      read_count += reads
+      write_count += writes
+      read_sectors += rsectors
+      write_sectors += wsectors
+
+    if not found:
+      return None
+    return CollectorRecord(
+      read_count=read_count,
+      write_count=write_count,
+      read_bytes=read_sectors * DISK_SECTOR_SIZE,
+      write_bytes=write_sectors * DISK_SECTOR_SIZE,
+    )
+
+  def _load_physical_fstypes(self) -> set[str]:
+    """Return filesystem types backed by devices, read once."""
+    if self._physical_fstypes is None:
+      fstypes = set()
+      with open(self._filesystems_path, encoding="utf-8") as handle:
+        for line in handle:
+          fields = line.split()
+          if not fields:
+            continue
+          if fields[0] != "nodev":
+            fstypes.add(fields[0])
+          elif len(fields) > 1 and fields[1] == "zfs":
+            fstypes.add("zfs")
+      self._physical_fstypes = fstypes
+    return self._physical_fstypes
+
+  def disk_partitions(
+    self,
+    all: bool = False,  # noqa: A002 - mirrors psutil.disk_partitions
+  ) -> list[CollectorRecord]:
+    """Return mounted partitions with psutil.disk_partitions semantics."""
+    fstypes = None if all else self._load_physical_fstypes()
+    partitions = []
+    for line in self._mounts.read().split(b"\n"):
+      fields = line.split()
+      if len(fields) < 4:
+        continue
+      device = _unescape_mount_field(fields[0])
+      fstype = _unescape_mount_field(fields[2])
+      if device == "none":
+        device = ""
+      if fstypes is not None and (not device or fstype not in fstypes):
+        continue
+      partitions.append(
+        CollectorRecord(
+          device=device,
+          mountpoint=_unescape_mount_field(fields[1]),
+          fstype=fstype,
+          opts=_unescape_mount_field(fields[3]),
+        )
+      )
+    return partitions
+
+  def disk_usage(self, path: str) -> CollectorRecord:
+    """Return filesystem usage with psutil.disk_usage semantics."""
+    stats = os.statvfs(path)
+    total = stats.f_blocks * stats.f_frsize
+    free_for_root = stats.f_bfree * stats.f_frsize
+    free = stats.f_bavail * stats.f_frsize
+    used = total - free_for_root
+    return CollectorRecord(
+      total=total,
+      used=used,
+      free=free,
+      percent=_usage_percent(used, used + free),
+    )
+
+
+_PROCFS_BACKEND: ProcfsBackend | None = None
+_PROCFS_LOCK = threading.Lock()
+
+
+def _procfs_available() -> bool:
+  """Return True when the procfs backend can run on this host."""
+  return (
+    sys.platform.startswith("linux")
+    and hasattr(os, "preadv")
+    and os.access(f"{PROCFS_ROOT}/stat", os.R_OK)
+  )
+
+
+def get_procfs_backend() -> ProcfsBackend | None:
+  """Return the shared procfs backend when it is selected and usable."""
+  global _PROCFS_BACKEND
+  choice = os.getenv(BACKEND_ENV_VAR, DEFAULT_BACKEND).strip().lower()
+  if choice not in (PROCFS_BACKEND, AUTO_BACKEND):
+    return None
+  if _PROCFS_BACKEND is not None:
+    return _PROCFS_BACKEND
+  if not _procfs_available():
+    return None
+  with _PROCFS_LOCK:
+    if _PROCFS_BACKEND is None:
+      _PROCFS_BACKEND = ProcfsBackend()
+  return _PROCFS_BACKEND
+
+
+def _cgroup_v2_dir(procfs_root: str = PROCFS_ROOT) -> str | None:
+  """Return this process's cgroup v2 directory, or None.
+
+  Hybrid hosts whose cgroup2 mount has no cpu or memory controller keep
+  their limits in cgroup v1 and are treated as having no cgroup.
+  """
+  try:
+    with open(f"{procfs_root}/self/cgroup", encoding="utf-8") as handle:
+      membership = handle.read().splitlines()
+    with open(f"{procfs_root}/self/mountinfo", encoding="utf-8") as handle:
+      mountinfo = handle.read().splitlines()
+  except OSError:
+    return None
+  relative = next(
+    (line[3:] for line in membership if line.startswith("0::")),
+    None,
+  )
+  if relative is None:
+    return None
+  for line in mountinfo:
+    pre, _, post = line.partition(" - ")
+    if not post.startswith("cgroup2 "):
+      continue
+    fields = pre.split()
+    mount_root = fields[3]
+    mountpoint = _unescape_mount_field(fields[4].encode())
+    if mount_root != "/" and relative.startswith(mount_root):
+      relative = relative[len(mount_root):]
+    path = os.path.normpath(f"{mountpoint}/{relative.lstrip('/')}")
+    try:
+      with open(f"{path}/cgroup.controllers", encoding="utf-8") as handle:
+        controllers = handle.read().split()
+    except OSError:
+      continue
+    if CGROUP_CONTROLLERS.intersection(controllers):
+      return path
+  return None
+
+
+class CgroupV2:
+  """Cheap readers for one cgroup v2 directory.
+
+  Each interface file is read with one pread on a cached descriptor. A
+  missing file (controller not enabled, or the root cgroup) reads as
+  None, and callers fall back to host-wide values.
+  """
+
+  def __init__(self, path: str) -> None:
+    self.path = path
+    self._files: dict[str, _ProcFile] = {}
+    self._last_cpu: tuple[float, int] | None = None
+    self._lock = threading.Lock()
+    self._read_lock = threading.Lock()
+
+  def _read(self, name: str) -> bytes | None:
+    """Return an interface file's contents, or None when absent."""
+    with self._read_lock:
+      proc_file = self._files.get(name)
+      if proc_file is None:
+        proc_file = _ProcFile(f"{self.path}/{name}")
+        self._files[name] = proc_file
+      try:
+        return proc_file.read()
+      except OSError:
+        return None
+
+  def close(self) -> None:
+    """Release every cached descriptor."""
+    with self._read_lock:
+      for proc_file in self._files.values():
+        proc_file.close()
+
+  def _read_keyed(self, name: str) -> dict[bytes, int]:
+    """Return a flat-keyed file such as memory.stat as a dict."""
+    raw = self._read(name)
+    if raw is None:
+      return {}
+    values = {}
+    for line in raw.split(b"\n"):
+      fields = line.split()
+      if len(fields) == 2:
+        values[fields[0]] = int(fields[1])
+    return values
+
+  def _read_limit(self, name: str) -> int | None:
+    """Return a single-value limit file, None when absent or 'max'."""
+    raw = self._read(name)
+    if raw is None:
+      return None
+    value = raw.strip()
+    if not value or value == b"max":
+      return None
+    return int(value)
+
+  def memory_limit(self) -> int | None:
+    """Return memory.max in bytes, or None when unlimited."""
+    return self._read_limit("memory.max")
+
+  def memory_usage(self) -> tuple[int, dict[bytes, int]] | None:
+    """Return (memory.current, memory.stat fields) or None."""
+    current = self._read_limit("memory.current")
+    if current is None:
+      return None
+    return current, self._read_keyed("memory.stat")
+
+  def swap(self) -> tuple[int, int] | None:
+    """Return (swap limit, swap used) in bytes, or None when unlimited."""
+    limit = self._read_limit("memory.swap.max")
+    if limit is None:
+      return None
+    return limit, self._read_limit("memory.swap.current") or 0
+
+  def cpu_quota(self) -> float | None:
+    """Return the CPU quota from cpu.max in cores, or None."""
+    raw = self._read("cpu.max")
+    if raw is None:
+      return None
+    fields = raw.split()
+    if len(fields) != 2 or fields[0] == b"max":
+      return None
+    return int(fields[0]) / int(fields[1])
+
+  def cpu_percent(self, quota: float, interval: float | None) -> float | None:
+    """Return CPU use as a percentage of quota since the last call."""
+    with self._lock:
+      if interval:
+        before = self._cpu_sample()
+      else:
+        before = self._last_cpu
+    if interval:
+      time.sleep(interval)
+    after = self._cpu_sample()
+    if after is None:
+      return None
+    with self._lock:
+      self._last_cpu = after
+    if before is None or after[0] <= before[0]:
+      return 0.0
+    elapsed_usec = (after[0] - before[0]) * 1_000_000
+    busy_usec = after[1] - before[1]
+    percent = busy_usec / (elapsed_usec * quota) * 100
+    return round(min(max(percent, 0.0), 100.0), 1)
+
+  def _cpu_sample(self) -> tuple[float, int] | None:
+    """Return (monotonic time, cpu.stat usage_usec)."""
+    usage = self._read_keyed("cpu.stat").get(b"usage_usec")
+    if usage is None:
+      return None
+    return time.monotonic(), usage
+
+  def io_bytes(self) -> CollectorRecord | None:
+    """Return io.stat totals summed across devices, or None."""
+    raw = self._read("io.stat")
+    if raw is None:
+      return None
+    totals = {b"rbytes": 0, b"wbytes": 0, b"rios": 0, b"wios": 0}
+    for line in raw.split(b"\n"):
+      for field in line.split()[1:]:
+        key, _, value = field.partition(b"=")
+        if key in totals:
+          totals[key] += int(value)
+    return CollectorRecord(
+      read_count=totals[b"rios"],
+      write_count=totals[b"wios"],
+      read_bytes=totals[b"rbytes"],
+      write_bytes=totals[b"wbytes"],
+    )
+
+
+class CgroupBackend:
+  """Report CPU, memory, and disk I/O against a container's limits.
+
+  Calls the cgroup cannot answer, and everything other than CPU,
+  memory, and disk I/O, go to the wrapped host backend. cpu_percent
+  with percpu=True returns one entry per quota core, each equal to the
+  container's overall utilization, since per-core figures are
+  meaningless under a CFS quota.
+  """
+
+  def __init__(self, host: Any, cgroup: CgroupV2) -> None:
+    self.host = host
+    self.cgroup = cgroup
+    self.name = f"cgroup+{getattr(host, 'name', 'psutil')}"
+
+  def __getattr__(self, name: str) -> Any:
+    return getattr(self.host, name)
+
+  def cpu_percent(
+    self,
+    interval: float | None = None,
+    percpu: bool = False,
+  ) -> float | list[float]:
+    """Return CPU utilization relative to cpu.max."""
+    quota = self.cgroup.cpu_quota()
+    if quota is None:
+      return self.host.cpu_percent(interval=interval, percpu=percpu)
+    percent = self.cgroup.cpu_percent(quota, interval)
+    if percent is None:
+      return self.host.cpu_percent(interval=interval, percpu=percpu)
+    if percpu:
+      return [percent] * max(math.ceil(quota), 1)
+    return percent
+
+  def virtual_memory(self) -> Any:
+    """Return memory stats with memory.max as the total."""
+    limit = self.cgroup.memory_limit()
+    usage = self.cgroup.memory_usage() if limit is not None else None
+    if usage is None:
+      return self.host.virtual_memory()
+    current, stat = usage
+    # Working set as kubelet computes it: reclaimable file cache is free.
+    used = max(current - stat.get(b"inactive_file", 0), 0)
+    available = max(limit - used, 0)
+    return CollectorRecord(
+      total=limit,
+      available=available,
+      percent=_usage_percent(used, limit),
+      used=used,
+      free=max(limit - current, 0),
+      cached=stat.get(b"file", 0),
+    )
+
+  def swap_memory(self) -> Any:
+    """Return swap stats with memory.swap.max as the total."""
+    swap = self.cgroup.swap()
+    if swap is None:
+      return self.host.swap_memory()
+    total, used = swap
+    return CollectorRecord(
+      total=total,
+      used=used,
+      free=max(total - used, 0),
+      percent=_usage_percent(used, total),
+    )
+
+  def disk_io_counters(self) -> Any:
+    """Return the container's own block I/O from io.stat."""
+    counters = self.cgroup.io_bytes()
+    if counters is None:
+      return self.host.disk_io_counters()
+    return counters
+
+
+_CGROUP: CgroupV2 | None = None
+_CGROUP_CHECKED = False
+_CGROUP_LOCK = threading.Lock()
+_LAST_WRAPPED: tuple[Any, CgroupBackend] | None = None
+
+
+def get_cgroup() -> CgroupV2 | None:
+  """Return the cgroup v2 reader when a CPU or memory limit is set.
+
+  Detection runs once; a host or pod without limits keeps host metrics.
+  """
+  global _CGROUP, _CGROUP_CHECKED
+  choice = os.getenv(CGROUP_ENV_VAR, CGROUP_AUTO).strip().lower()
+  if choice == CGROUP_OFF:
+    return None
+  if not _CGROUP_CHECKED:
+    with _CGROUP_LOCK:
+      if not _CGROUP_CHECKED:
+        path = _cgroup_v2_dir()
+        if path is not None:
+          cgroup = CgroupV2(path)
+          if cgroup.cpu_quota() is not None or cgroup.memory_limit():
+            _CGROUP = cgroup
+        _CGROUP_CHECKED = True
+  return _CGROUP
+
+
+def _wrap_for_cgroup(host: Any) -> Any:
+  """Return host wrapped in a CgroupBackend when running in a cgroup.
+
+  The wrapper for the most recent host is reused so callers that key
+  caches on backend identity keep hitting them.
+  """
+  global _LAST_WRAPPED
+  cgroup = get_cgroup()
+  if cgroup is None:
+    return host
+  wrapped = _LAST_WRAPPED
+  if (
+    wrapped is not None
+    and wrapped[0] is host
+    and wrapped[1].cgroup is cgroup
+  ):
+    return wrapped[1]
+  backend = CgroupBackend(host, cgroup)
+  _LAST_WRAPPED = (host, backend)
+  return backend
+
+
+def select_backend(fallback: Any) -> Any:
+  """Return the procfs backend when enabled, else the psutil fallback.
+
+  Either one is wrapped in a CgroupBackend inside a cgroup v2 container.
+  """
+  backend = get_procfs_backend()
+  if backend is None:
+    backend = fallback
+  return _wrap_for_cgroup(backend)
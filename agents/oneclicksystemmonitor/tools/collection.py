@@ -0,0 +1,98 @@
+"""Run the system collectors directly, without an LLM in the loop."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+from typing import Any, Callable
+
+from deployment.observability import trace_chain
+
+from .cpu_tools import collect_cpu_stats_async
+from .deadlines import (
+  collection_timeout,
+  collector_timeout,
+  timed_out_stats,
+  timeout_reason,
+)
+from .disk_tools import collect_disk_stats
+from .executor import run_blocking
+from .memory_tools import collect_memory_stats_async
+from .process_tools import collect_process_stats
+
+Collector = Callable[[Any], Any]
+
+COLLECTORS: tuple[tuple[str, Collector], ...] = (
+  ("cpu_stats", collect_cpu_stats_async),
+  ("memory_stats", collect_memory_stats_async),
+  ("disk_stats", collect_disk_stats),
+  ("process_stats", collect_process_stats),
+)
+_LOGGER = logging.getLogger(__name__)
+
+
+class CollectionContext:
+  """Minimal ToolContext stand-in that captures state writes."""
+
+  def __init__(self) -> None:
+    self.state: dict[str, Any] = {}
+
+
+async def _run_collector(collector: Collector, context: Any) -> Any:
+  """Await async collectors and push sync ones onto the collector pool."""
+  if inspect.iscoroutinefunction(collector):
+    return await collector(context)
+  result = await run_blocking(collector, context)
+  if inspect.isawaitable(result):
+    result = await result
+  return result
+
+
+@trace_chain()
+async def collect_system_stats(
+  collectors: tuple[tuple[str, Collector], ...] | None = None,
+  timeout: float | None = None,
+) -> dict[str, Any]:
+  """Run collectors concurrently and return the state they wrote.
+
+  Each collector is abandoned once it exceeds its deadline, the smaller
+  of collector_timeout() and timeout, so the call returns within that
+  bound even when a probe is stuck in a syscall. Collectors write into
+  contexts of their own, and only finished ones are copied into the
+  returned mapping, so an abandoned collector's late write is dropped.
+
+  Args:
+    collectors: (state_key, collector) pairs; defaults to COLLECTORS.
+    timeout: Cap on the whole collection in seconds; defaults to
+      collection_timeout().
+
+  Returns:
+    Mapping of state keys such as cpu_stats to collected data. Timed-out
+    collectors map to a payload whose stats_reason says so; keys of
+    collectors that failed are omitted.
+  """
+  if collectors is None:
+    collectors = COLLECTORS
+  if timeout is None:
+    timeout = collection_timeout()
+  deadline = min(collector_timeout(), timeout)
+  contexts = [CollectionContext() for _ in collectors]
+  results = await asyncio.gather(
+    *(
+      asyncio.wait_for(_run_collector(collector, context), deadline)
+      for (_, collector), context in zip(collectors, contexts)
+    ),
+    return_exceptions=True,
+  )
+  state: dict[str, Any] = {}
+  for (state_key, _), context, result in zip(collectors, contexts, results):
+    if isinstance(result, asyncio.TimeoutError):
+      reason = timeout_reason(deadline)
+      _LOGGER.warning("Collector for %s %s.", state_key, reason)
+      state[state_key] = timed_out_stats(reason)
+    elif isinstance(result, BaseException):
+      _LOGGER.warning("Collector for %s failed: %s", state_key, result)
+    else:
+      state.update(context.state)
+  return state
@@ -1,5 +1,6 @@
 """CPU collection tool for OneClickSystemMonitor."""
 
+import asyncio
 from typing import Any
 
 import psutil
@@ -7,34 +8,52 @@ from google.adk.tools import ToolContext
 
 from deployment.observability import trace_chain, trace_tool
 
+from .backends import select_backend
+from .deadlines import (
+  collector_timeout,
+  probe_timeout,
+  timed_out_stats,
+  within_deadline,
+)
+from .env import env_int
+from .executor import run_probe
+from .process_table import ProcessSummary, ProcessTable
+from .history import CPU_GROUP, METRIC_HISTORY, cpu_history_values
+from .pressure import CPU_RESOURCE, read_pressure
+from .sampler import get_latest_snapshot
+from .sampling_window import shared_sampling_window
+
 CPU_SAMPLE_INTERVAL = 0.1
+TOP_PROCESS_COUNT_ENV_VAR = "SYSTEM_MONITOR_TOP_PROCESS_COUNT"
+DEFAULT_TOP_PROCESS_COUNT = 5
 TEMPERATURE_UNAVAILABLE_REASON = "CPU temperature not supported."
 TOP_PROCESS_UNAVAILABLE_REASON = "Top process data unavailable."
+TOP_PROCESS_PENDING_REASON = (
+  "Top processes are measured from the next collection."
+)
 
+_PROCESS_TABLE = ProcessTable()
 
-class _ProcessSummary:
-  """Lightweight process summary."""
 
-  def __init__(self, name: str, cpu_percent: float) -> None:
-    self.name = name
-    self.cpu_percent = cpu_percent
+def _top_process_count() -> int:
+  """Return how many top CPU processes to report."""
+  return env_int(TOP_PROCESS_COUNT_ENV_VAR, DEFAULT_TOP_PROCESS_COUNT)
 
 
 @trace_chain()
-def _get_top_process() -> _ProcessSummary | None:
-  """Return the top CPU process if available."""
-  top_process = None
-  for process in psutil.process_iter(["name"]):
-    try:
-      cpu_percent = process.cpu_percent(interval=None)
-    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-      continue
+def _get_top_processes(count: int) -> list[ProcessSummary]:
+  """Return the top CPU processes from the primed process table."""
+  try:
+    return _PROCESS_TABLE.top(count)
+  except (AttributeError, OSError, psutil.Error):
+    return []
 
-    if top_process is None or cpu_percent > top_process.cpu_percent:
-      process_name = process.info.get("name") or "Unknown"
-      top_process = _ProcessSummary(process_name, cpu_percent)
 
-  return top_process
+@trace_chain()
+def _get_top_process() -> ProcessSummary | None:
+  """Return the top CPU process if available."""
+  top_processes = _get_top_processes(1)
+  return top_processes[0] if top_processes else None
 
 
 @trace_chain()
@@ -55,37 +74,154 @@ def _get_temperature() -> tuple[float | None, str | None]:
   return None, TEMPERATURE_UNAVAILABLE_REASON
 
 
-@trace_tool()
-def collect_cpu_stats(tool_context: ToolContext) -> dict[str, Any]:
-  """Collect CPU statistics using psutil."""
-  per_core = psutil.cpu_percent(interval=CPU_SAMPLE_INTERVAL, percpu=True)
+def _cpu_data(
+  per_core: list[float],
+  processes: list[ProcessSummary],
+  temperature: tuple[float | None, str | None],
+  top_process_reason: str | None = None,
+) -> dict[str, Any]:
+  """Build the cpu_stats payload from raw readings.
+
+  Args:
+    per_core: Per-core usage percentages.
+    processes: Top CPU processes, highest first.
+    temperature: (temperature_c, temperature_reason).
+    top_process_reason: Reason reported when processes is empty;
+      defaults to TOP_PROCESS_UNAVAILABLE_REASON.
+  """
   overall = round(sum(per_core) / max(len(per_core), 1), 2)
 
-  top_process = _get_top_process()
-  top_process_data = None
-  top_process_reason = TOP_PROCESS_UNAVAILABLE_REASON
-  if top_process:
-    top_process_data = {
-      "name": top_process.name,
-      "cpu_percent": round(top_process.cpu_percent, 2),
+  top_processes = [
+    {
+      "name": process.name,
+      "cpu_percent": round(process.cpu_percent, 2),
     }
+    for process in processes
+  ]
+  top_process_data = None
+  top_process_reason = top_process_reason or TOP_PROCESS_UNAVAILABLE_REASON
+  if top_processes:
+    top_process_data = top_processes[0]
     top_process_reason = None
 
-  temperature_c, temperature_reason = _get_temperature()
+  temperature_c, temperature_reason = temperature
 
-  data = {
+  return {
     "usage_percent": overall,
     "per_core_percent": [round(value, 2) for value in per_core],
     "top_process": top_process_data,
+    "top_processes": top_processes,
     "top_process_reason": top_process_reason,
     "temperature_c": temperature_c,
     "temperature_reason": temperature_reason,
   }
 
+
+def _publish(tool_context: ToolContext, data: dict[str, Any]) -> dict[str, Any]:
+  """Add CPU pressure, store cpu_stats, and wrap the tool response."""
+  data["pressure"], data["pressure_reason"] = read_pressure(CPU_RESOURCE)
   tool_context.state["cpu_stats"] = data
+  METRIC_HISTORY.record(CPU_GROUP, cpu_history_values(data))
 
   return {
     "status": "ok",
     "data": data,
     "error": None,
   }
+
+
+@trace_tool()
+def collect_cpu_stats(tool_context: ToolContext) -> dict[str, Any]:
+  """Collect CPU statistics using psutil.
+
+  Process CPU is a delta since the table was primed, so a collection
+  that primes it and reads a background snapshot, with no sampling
+  interval in between, reports TOP_PROCESS_PENDING_REASON instead.
+  """
+  primed = _PROCESS_TABLE.is_primed
+  if not primed:
+    _PROCESS_TABLE.prime()
+  snapshot = get_latest_snapshot()
+  if snapshot is not None:
+    per_core = snapshot.per_core_percent
+  else:
+    per_core = select_backend(psutil).cpu_percent(
+      interval=CPU_SAMPLE_INTERVAL,
+      percpu=True,
+    )
+
+  processes: list[ProcessSummary] = []
+  process_reason = TOP_PROCESS_PENDING_REASON
+  if primed or snapshot is None:
+    processes = _get_top_processes(_top_process_count())
+    process_reason = None
+  data = _cpu_data(per_core, processes, _get_temperature(), process_reason)
+  return _publish(tool_context, data)
+
+
+async def _collect_cpu_data() -> dict[str, Any]:
+  """Gather per-core usage, top processes, and temperature."""
+  timeout = probe_timeout()
+  primed = _PROCESS_TABLE.is_primed
+  snapshot = get_latest_snapshot()
+  if snapshot is not None:
+    per_core = snapshot.per_core_percent
+    if not primed:
+      await within_deadline(run_probe(_PROCESS_TABLE.prime), None, timeout)
+  elif primed:
+    per_core = (await shared_sampling_window()).per_core_percent
+  else:
+    _, window = await asyncio.gather(
+      within_deadline(run_probe(_PROCESS_TABLE.prime), None, timeout),
+      shared_sampling_window(),
+    )
+    per_core = window.per_core_percent
+
+  temperature_probe = within_deadline(
+    run_probe(_get_temperature),
+    None,
+    timeout,
+  )
+  if primed or snapshot is None:
+    (processes, process_reason), (temperature, temperature_reason) = (
+      await asyncio.gather(
+        within_deadline(
+          run_probe(_get_top_processes, _top_process_count()),
+          [],
+          timeout,
+        ),
+        temperature_probe,
+      )
+    )
+  else:
+    # Primed just now: no interval has passed for a CPU delta.
+    processes, process_reason = [], TOP_PROCESS_PENDING_REASON
+    temperature, temperature_reason = await temperature_probe
+  if temperature_reason is not None:
+    temperature = (None, temperature_reason)
+  return _cpu_data(per_core, processes, temperature, process_reason)
+
+
+@trace_tool()
+async def collect_cpu_stats_async(tool_context: ToolContext) -> dict[str, Any]:
+  """Collect CPU statistics without blocking the event loop.
+
+  Process-table walks and sensor reads run on the collector pool under
+  the probe deadline, and per-core usage comes from the sampling window
+  shared with disk stats. The whole collection has the collector
+  deadline; when it runs over, stats_reason says so.
+  """
+  data, reason = await within_deadline(
+    _collect_cpu_data(),
+    None,
+    collector_timeout(),
+  )
+  if reason is not None:
+    data = timed_out_stats(reason)
+    tool_context.state["cpu_stats"] = data
+    return {
+      "status": "ok",
+      "data": data,
+      "error": None,
+    }
+  return _publish(tool_context, data)
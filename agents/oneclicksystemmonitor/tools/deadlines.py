@@ -0,0 +1,84 @@
+"""Latency budgets for collectors and the probes inside them.
+
+Every probe (a process walk, a sensor read, a statvfs sweep) gets its
+own deadline and degrades to a *_reason string when it runs over. Each
+collector gets a larger deadline, and a whole collection is capped so a
+report is never held up by one stuck syscall. Blocking work that misses
+its deadline cannot be interrupted; it is abandoned on its pool thread,
+and executor.run_probe keeps retries from stacking up behind it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, TypeVar
+
+from .env import env_float
+
+PROBE_TIMEOUT_ENV_VAR = "SYSTEM_MONITOR_PROBE_TIMEOUT_MS"
+COLLECTOR_TIMEOUT_ENV_VAR = "SYSTEM_MONITOR_COLLECTOR_TIMEOUT_MS"
+COLLECTION_TIMEOUT_ENV_VAR = "SYSTEM_MONITOR_COLLECTION_TIMEOUT_MS"
+DEFAULT_PROBE_TIMEOUT_MS = 500
+DEFAULT_COLLECTOR_TIMEOUT_MS = 1500
+DEFAULT_COLLECTION_TIMEOUT_MS = 2000
+
+_T = TypeVar("_T")
+
+
+def _timeout_seconds(env_var: str, default_ms: int) -> float:
+  """Return a positive millisecond env var as seconds."""
+  return env_float(env_var, default_ms) / 1000
+
+
+def probe_timeout() -> float:
+  """Return the per-probe deadline in seconds."""
+  return _timeout_seconds(PROBE_TIMEOUT_ENV_VAR, DEFAULT_PROBE_TIMEOUT_MS)
+
+
+def collector_timeout() -> float:
+  """Return the per-collector deadline in seconds."""
+  return _timeout_seconds(
+    COLLECTOR_TIMEOUT_ENV_VAR,
+    DEFAULT_COLLECTOR_TIMEOUT_MS,
+  )
+
+
+def collection_timeout() -> float:
+  """Return the hard cap on one full collection in seconds."""
+  return _timeout_seconds(
+    COLLECTION_TIMEOUT_ENV_VAR,
+    DEFAULT_COLLECTION_TIMEOUT_MS,
+  )
+
+
+def timeout_reason(timeout: float) -> str:
+  """Return the *_reason text for a probe that ran over timeout."""
+  return f"timed out after {round(timeout * 1000)} ms"
+
+
+def timed_out_stats(reason: str) -> dict[str, Any]:
+  """Return the *_stats payload stored for a collector that ran over.
+
+  Consumers treat a payload with stats_reason as unavailable data.
+  """
+  return {"stats_reason": reason}
+
+
+async def within_deadline(
+  awaitable: Awaitable[_T],
+  default: Any,
+  timeout: float | None = None,
+) -> tuple[Any, str | None]:
+  """Await a probe, returning (result, None) or (default, reason).
+
+  Args:
+    awaitable: Probe to await; it is cancelled on timeout.
+    default: Value returned in place of the probe's result on timeout.
+    timeout: Deadline in seconds; defaults to probe_timeout().
+  """
+  if timeout is None:
+    timeout = probe_timeout()
+  try:
+    return await asyncio.wait_for(awaitable, timeout), None
+  except asyncio.TimeoutError:
+    return default, timeout_reason(timeout)
@@ -6,30 +6,37 @@ from typing import Any
 import psutil
 from google.adk.tools import ToolContext
 
-from .units import bytes_to_gb, bytes_to_mb
+from .backends import select_backend
+from .deadlines import probe_timeout, timeout_reason, within_deadline
+from .executor import run_blocking
+from .history import DISK_GROUP, METRIC_HISTORY, disk_history_values
+from .mounts import MOUNT_TABLE, query_usage
+from .pressure import IO_RESOURCE, read_pressure
+from .sampler import get_latest_snapshot
+from .sampling_window import shared_sampling_window
+from .units import bytes_to_gb
 from deployment.observability import trace_chain, trace_tool
 
-THROUGHPUT_SAMPLE_INTERVAL = 0.1
 THROUGHPUT_UNAVAILABLE_REASON = "Disk throughput not supported."
 FRAGMENTATION_UNAVAILABLE_REASON = "Disk fragmentation not available."
-PARTITION_SKIP_FS_TYPES = {"", "tmpfs", "devtmpfs"}
 
 
 @trace_chain()
-def _get_drive_usage() -> list[dict[str, Any]]:
-  """Collect drive usage details per partition."""
+def _get_drive_usage(
+  timeout: float | None = None,
+) -> tuple[list[dict[str, Any]], str | None]:
+  """Collect drive usage per partition and a reason for missing mounts.
+
+  Args:
+    timeout: Seconds to wait for usage reads before reporting the
+      remaining mounts as timed out.
+  """
+  backend = select_backend(psutil)
+  partitions = MOUNT_TABLE.partitions(backend)
+  usages, timed_out = query_usage(backend, partitions, timeout)
   drives = []
-  seen_mounts = set()
-  for partition in psutil.disk_partitions(all=False):
-    if partition.fstype in PARTITION_SKIP_FS_TYPES:
-      continue
-    if partition.mountpoint in seen_mounts:
-      continue
-    seen_mounts.add(partition.mountpoint)
-
-    try:
-      usage = psutil.disk_usage(partition.mountpoint)
-    except (PermissionError, OSError):
+  for partition, usage in zip(partitions, usages):
+    if usage is None:
       continue
 
     drives.append(
@@ -41,45 +48,52 @@ def _get_drive_usage() -> list[dict[str, Any]]:
       }
     )
 
-  return drives
+  drives_reason = None
+  if timed_out:
+    drives_reason = f"{timeout_reason(timeout)}: {', '.join(timed_out)}"
+  return drives, drives_reason
 
 
 @trace_chain()
 async def _get_throughput() -> tuple[float | None, float | None, str | None]:
-  """Sample disk throughput using io counters."""
-  try:
-    first = psutil.disk_io_counters()
-    if first is None:
-      return None, None, THROUGHPUT_UNAVAILABLE_REASON
-    await asyncio.sleep(THROUGHPUT_SAMPLE_INTERVAL)
-    second = psutil.disk_io_counters()
-    if second is None:
-      return None, None, THROUGHPUT_UNAVAILABLE_REASON
-  except (AttributeError, OSError):
-    return None, None, THROUGHPUT_UNAVAILABLE_REASON
+  """Return disk throughput from the sampler or the shared window."""
+  snapshot = get_latest_snapshot()
+  if snapshot is not None and snapshot.read_mb_s is not None:
+    return snapshot.read_mb_s, snapshot.write_mb_s, None
 
-  interval = THROUGHPUT_SAMPLE_INTERVAL
-  read_mb_s = bytes_to_mb(max(second.read_bytes - first.read_bytes, 0))
-  write_mb_s = bytes_to_mb(max(second.write_bytes - first.write_bytes, 0))
-  return round(read_mb_s / interval, 2), round(write_mb_s / interval, 2), None
+  window = await shared_sampling_window()
+  if window.read_mb_s is None:
+    return None, None, THROUGHPUT_UNAVAILABLE_REASON
+  return window.read_mb_s, window.write_mb_s, None
 
 
 @trace_tool()
 async def collect_disk_stats(tool_context: ToolContext) -> dict[str, Any]:
   """Collect disk statistics using psutil."""
-  drives = _get_drive_usage()
-  read_mb_s, write_mb_s, throughput_reason = await _get_throughput()
+  timeout = probe_timeout()
+  (drives, drives_reason), (throughput, throughput_timeout) = (
+    await asyncio.gather(
+      run_blocking(_get_drive_usage, timeout),
+      within_deadline(_get_throughput(), (None, None, None), timeout),
+    )
+  )
+  read_mb_s, write_mb_s, throughput_reason = throughput
+  pressure, pressure_reason = read_pressure(IO_RESOURCE)
 
   data = {
     "drives": drives,
+    "drives_reason": drives_reason,
     "read_mb_s": read_mb_s,
     "write_mb_s": write_mb_s,
-    "throughput_reason": throughput_reason,
+    "throughput_reason": throughput_timeout or throughput_reason,
     "fragmentation_percent": None,
     "fragmentation_reason": FRAGMENTATION_UNAVAILABLE_REASON,
+    "pressure": pressure,
+    "pressure_reason": pressure_reason,
   }
 
   tool_context.state["disk_stats"] = data
+  METRIC_HISTORY.record(DISK_GROUP, disk_history_values(data))
 
   return {
     "status": "ok",
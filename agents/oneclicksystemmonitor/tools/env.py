@@ -0,0 +1,29 @@
+"""Environment variable parsing shared by the collectors and services."""
+
+from __future__ import annotations
+
+import os
+
+
+def env_int(name: str, default: int, minimum: int = 1) -> int:
+  """Return an integer env var, or default when unset, invalid, or small.
+
+  Args:
+    name: Environment variable to read.
+    default: Value used when the variable is missing or unusable.
+    minimum: Smallest accepted value; smaller values fall back to default.
+  """
+  try:
+    value = int(os.getenv(name, default))
+  except ValueError:
+    return default
+  return value if value >= minimum else default
+
+
+def env_float(name: str, default: float) -> float:
+  """Return a positive float env var, or default when unset or invalid."""
+  try:
+    value = float(os.getenv(name, default))
+  except ValueError:
+    return default
+  return value if value > 0 else default
@@ -0,0 +1,86 @@
+"""Bounded thread pool for blocking collector work."""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+import contextvars
+import functools
+import threading
+from typing import Any, Callable, Hashable, TypeVar
+
+from .env import env_int
+
+COLLECTOR_THREADS_ENV_VAR = "SYSTEM_MONITOR_COLLECTOR_THREADS"
+DEFAULT_COLLECTOR_THREADS = 4
+
+_T = TypeVar("_T")
+_POOL: ThreadPoolExecutor | None = None
+_POOL_LOCK = threading.Lock()
+# Probe calls that are still running, including ones abandoned at their
+# deadline. Repeat calls join them, so a hung probe holds one thread.
+_IN_FLIGHT: dict[Hashable, Future] = {}
+_IN_FLIGHT_LOCK = threading.Lock()
+
+
+def _collector_threads() -> int:
+  """Return the configured pool size."""
+  return env_int(COLLECTOR_THREADS_ENV_VAR, DEFAULT_COLLECTOR_THREADS)
+
+
+def get_collector_pool() -> ThreadPoolExecutor:
+  """Return the process-wide collector pool, creating it on first use."""
+  global _POOL
+  if _POOL is None:
+    with _POOL_LOCK:
+      if _POOL is None:
+        _POOL = ThreadPoolExecutor(
+          max_workers=_collector_threads(),
+          thread_name_prefix="collector",
+        )
+  return _POOL
+
+
+async def run_blocking(
+  func: Callable[..., _T],
+  *args: Any,
+  **kwargs: Any,
+) -> _T:
+  """Run func on the collector pool and await its result.
+
+  The caller's context variables, such as the active trace span, are
+  copied into the worker thread like asyncio.to_thread does.
+  """
+  loop = asyncio.get_running_loop()
+  context = contextvars.copy_context()
+  call = functools.partial(context.run, func, *args, **kwargs)
+  return await loop.run_in_executor(get_collector_pool(), call)
+
+
+def _forget(key: Hashable, future: Future) -> None:
+  """Drop a finished probe call from the in-flight table."""
+  with _IN_FLIGHT_LOCK:
+    if _IN_FLIGHT.get(key) is future:
+      del _IN_FLIGHT[key]
+
+
+async def run_probe(func: Callable[..., _T], *args: Hashable) -> _T:
+  """Run a probe on the collector pool, joining an identical call.
+
+  A probe abandoned at its deadline keeps its pool thread until the
+  underlying syscall returns. Calls with the same func and args await
+  that call instead of submitting another, so a stuck sensor or /proc
+  read ties up at most one worker however often it is retried.
+  """
+  key = (func, args)
+  with _IN_FLIGHT_LOCK:
+    future = _IN_FLIGHT.get(key)
+    submitted = future is None
+    if submitted:
+      context = contextvars.copy_context()
+      future = get_collector_pool().submit(context.run, func, *args)
+      _IN_FLIGHT[key] = future
+  if submitted:
+    future.add_done_callback(functools.partial(_forget, key))
+  # Shielded so a caller's deadline does not cancel the shared call.
+  return await asyncio.shield(asyncio.wrap_future(future))
@@ -0,0 +1,335 @@
+"""Columnar in-memory history of collected metrics."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+import math
+import operator
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from .env import env_int
+
+HISTORY_CAPACITY_ENV_VAR = "SYSTEM_MONITOR_HISTORY_CAPACITY"
+DEFAULT_HISTORY_CAPACITY = 3600
+CPU_GROUP = "cpu"
+MEMORY_GROUP = "memory"
+DISK_GROUP = "disk"
+CORE_SERIES_PREFIX = "core:"
+MOUNT_SERIES_PREFIX = "mount:"
+_NAN = math.nan
+
+HistorySink = Callable[[str, dict[str, "float | None"], float], None]
+
+
+class _TimestampView:
+  """Sequence view over ring-buffer timestamps in logical order."""
+
+  def __init__(self, table: "_RingTable") -> None:
+    self._table = table
+
+  def __len__(self) -> int:
+    return self._table.size
+
+  def __getitem__(self, index: int) -> float:
+    return self._table.timestamps[self._table.physical_index(index)]
+
+
+class _RingTable:
+  """Fixed-capacity table of float columns sharing one timestamp column.
+
+  A column is dropped once every row it has a value in was overwritten,
+  so series that stop reporting, such as unmounted drives, free their
+  memory after one full pass of the ring.
+  """
+
+  def __init__(self, capacity: int) -> None:
+    self.capacity = capacity
+    self.timestamps = array("d", bytes(8 * capacity))
+    self.columns: dict[str, array] = {}
+    self.size = 0
+    self._next = 0
+    self._rows = 0
+    self._last_value_row: dict[str, int] = {}
+
+  def physical_index(self, logical_index: int) -> int:
+    """Map an oldest-first logical index to a buffer slot."""
+    start = (self._next - self.size) % self.capacity
+    return (start + logical_index) % self.capacity
+
+  def append(self, timestamp: float, values: dict[str, float | None]) -> None:
+    """Write one row in O(1) per column; missing values become NaN.
+
+    Timestamps earlier than the newest row are raised to it so the
+    timestamp column stays sorted for bisection.
+    """
+    slot = self._next
+    row = self._rows
+    if self.size:
+      newest = self.timestamps[(slot - 1) % self.capacity]
+      timestamp = max(timestamp, newest)
+    self.timestamps[slot] = timestamp
+    for name, value in values.items():
+      column = self.columns.get(name)
+      if column is None:
+        column = array("d", [_NAN]) * self.capacity
+        self.columns[name] = column
+        self._last_value_row[name] = row
+      if value is None:
+        column[slot] = _NAN
+      else:
+        column[slot] = value
+        self._last_value_row[name] = row
+    stale = []
+    for name, column in self.columns.items():
+      if name not in values:
+        column[slot] = _NAN
+        if row - self._last_value_row[name] >= self.capacity:
+          stale.append(name)
+    for name in stale:
+      del self.columns[name]
+      del self._last_value_row[name]
+    self._next = (slot + 1) % self.capacity
+    self.size = min(self.size + 1, self.capacity)
+    self._rows = row + 1
+
+  def _slices(self, source: array, first: int) -> array:
+    """Return logical rows [first, size) of a column as one array."""
+    count = self.size - first
+    if count <= 0:
+      return array("d")
+    start = self.physical_index(first)
+    end = start + count
+    if end <= self.capacity:
+      return source[start:end]
+    return source[start:] + source[:end - self.capacity]
+
+  def window(
+    self,
+    name: str,
+    since: float,
+  ) -> tuple[array, array]:
+    """Return (timestamps, values) for rows at or after since."""
+    column = self.columns.get(name)
+    if column is None or self.size == 0:
+      return array("d"), array("d")
+    first = bisect_left(_TimestampView(self), since)
+    return self._slices(self.timestamps, first), self._slices(column, first)
+
+
+class WindowSummary:
+  """Aggregates over one series within a time window."""
+
+  def __init__(
+    self,
+    count: int,
+    latest: float,
+    mean: float,
+    maximum: float,
+    p95: float,
+    slope_per_minute: float | None,
+  ) -> None:
+    self.count = count
+    self.latest = latest
+    self.mean = mean
+    self.maximum = maximum
+    self.p95 = p95
+    self.slope_per_minute = slope_per_minute
+
+  def to_dict(self) -> dict[str, Any]:
+    """Return the summary as JSON-friendly rounded values."""
+    return {
+      "count": self.count,
+      "latest": round(self.latest, 2),
+      "mean": round(self.mean, 2),
+      "max": round(self.maximum, 2),
+      "p95": round(self.p95, 2),
+      "slope_per_minute": (
+        None
+        if self.slope_per_minute is None
+        else round(self.slope_per_minute, 3)
+      ),
+    }
+
+
+def _slope(timestamps: Iterable[float], values: Iterable[float]) -> float:
+  """Return the least-squares slope of values over timestamps."""
+  xs = array("d", timestamps)
+  ys = array("d", values)
+  count = len(xs)
+  x_origin = xs[0]
+  xs = array("d", map(operator.sub, xs, [x_origin] * count))
+  sum_x = math.fsum(xs)
+  sum_y = math.fsum(ys)
+  sum_xx = math.fsum(map(operator.mul, xs, xs))
+  sum_xy = math.fsum(map(operator.mul, xs, ys))
+  denominator = count * sum_xx - sum_x * sum_x
+  if denominator == 0:
+    return 0.0
+  return (count * sum_xy - sum_x * sum_y) / denominator
+
+
+def summarize_window(
+  timestamps: array,
+  values: array,
+) -> WindowSummary | None:
+  """Return mean, max, p95, and slope for finite samples."""
+  pairs = [
+    (timestamp, value)
+    for timestamp, value in zip(timestamps, values)
+    if value == value
+  ]
+  if not pairs:
+    return None
+  finite_times = [timestamp for timestamp, _ in pairs]
+  finite_values = array("d", [value for _, value in pairs])
+  ordered = sorted(finite_values)
+  p95_index = max(math.ceil(0.95 * len(ordered)) - 1, 0)
+  slope = None
+  if len(finite_values) > 1:
+    slope = _slope(finite_times, finite_values) * 60
+  return WindowSummary(
+    count=len(finite_values),
+    latest=finite_values[-1],
+    mean=math.fsum(finite_values) / len(finite_values),
+    maximum=ordered[-1],
+    p95=ordered[p95_index],
+    slope_per_minute=slope,
+  )
+
+
+class MetricHistory:
+  """Per-group ring tables of CPU, memory, and disk samples.
+
+  Default timestamps come from time.monotonic() anchored to the wall
+  clock once at construction, so rows stay ordered when the system clock
+  is stepped while still reading as epoch seconds in sinks.
+  """
+
+  def __init__(self, capacity: int = DEFAULT_HISTORY_CAPACITY) -> None:
+    if capacity <= 0:
+      raise ValueError("History capacity must be positive.")
+    self.capacity = capacity
+    self._epoch = time.time() - time.monotonic()
+    self._tables: dict[str, _RingTable] = {}
+    self._sinks: list[HistorySink] = []
+    self._lock = threading.Lock()
+
+  def add_sink(self, sink: HistorySink) -> None:
+    """Forward every recorded row to sink(group, values, timestamp)."""
+    with self._lock:
+      self._sinks.append(sink)
+
+  def remove_sink(self, sink: HistorySink) -> None:
+    """Stop forwarding rows to a previously added sink."""
+    with self._lock:
+      if sink in self._sinks:
+        self._sinks.remove(sink)
+
+  def record(
+    self,
+    group: str,
+    values: dict[str, float | None],
+    timestamp: float | None = None,
+  ) -> None:
+    """Append one sample row to a group."""
+    if timestamp is None:
+      timestamp = self.now()
+    with self._lock:
+      table = self._tables.get(group)
+      if table is None:
+        table = _RingTable(self.capacity)
+        self._tables[group] = table
+      table.append(timestamp, values)
+      sinks = tuple(self._sinks)
+    for sink in sinks:
+      sink(group, values, timestamp)
+
+  def now(self) -> float:
+    """Return the current time on the history's monotonic clock."""
+    return self._epoch + time.monotonic()
+
+  def series_names(self, group: str) -> list[str]:
+    """Return the series recorded for a group."""
+    with self._lock:
+      table = self._tables.get(group)
+      return list(table.columns) if table else []
+
+  def window(
+    self,
+    group: str,
+    series: str,
+    window_seconds: float,
+    now: float | None = None,
+  ) -> tuple[array, array]:
+    """Return (timestamps, values) recorded in the last window_seconds."""
+    if now is None:
+      now = self.now()
+    with self._lock:
+      table = self._tables.get(group)
+      if table is None:
+        return array("d"), array("d")
+      return table.window(series, now - window_seconds)
+
+  def summarize(
+    self,
+    group: str,
+    series: str,
+    window_seconds: float,
+    now: float | None = None,
+  ) -> WindowSummary | None:
+    """Return window aggregates for one series, or None when empty."""
+    timestamps, values = self.window(group, series, window_seconds, now)
+    return summarize_window(timestamps, values)
+
+  def clear(self) -> None:
+    """Drop all recorded samples."""
+    with self._lock:
+      self._tables.clear()
+
+
+def cpu_history_values(cpu_stats: dict[str, Any]) -> dict[str, float | None]:
+  """Flatten a cpu_stats payload into history series."""
+  values: dict[str, float | None] = {
+    "usage_percent": cpu_stats.get("usage_percent"),
+  }
+  for index, core in enumerate(cpu_stats.get("per_core_percent") or []):
+    values[f"{CORE_SERIES_PREFIX}{index}"] = core
+  return values
+
+
+def memory_history_values(
+  memory_stats: dict[str, Any],
+) -> dict[str, float | None]:
+  """Flatten a memory_stats payload into history series."""
+  return {
+    "used_percent": memory_stats.get("used_percent"),
+    "available_percent": memory_stats.get("available_percent"),
+    "swap_used_percent": memory_stats.get("swap_used_percent"),
+  }
+
+
+def disk_history_values(disk_stats: dict[str, Any]) -> dict[str, float | None]:
+  """Flatten a disk_stats payload into history series."""
+  drives = disk_stats.get("drives") or []
+  values: dict[str, float | None] = {
+    "read_mb_s": disk_stats.get("read_mb_s"),
+    "write_mb_s": disk_stats.get("write_mb_s"),
+    "max_used_percent": max(
+      (drive.get("used_percent", 0) for drive in drives),
+      default=None,
+    ),
+  }
+  for drive in drives:
+    values[f"{MOUNT_SERIES_PREFIX}{drive['mount']}"] = drive.get("used_percent")
+  return values
+
+
+def _history_capacity() -> int:
+  """Return the configured per-group capacity."""
+  return env_int(HISTORY_CAPACITY_ENV_VAR, DEFAULT_HISTORY_CAPACITY)
+
+
+METRIC_HISTORY = MetricHistory(_history_capacity())
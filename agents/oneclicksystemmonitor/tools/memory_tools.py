@@ -7,17 +7,32 @@ from google.adk.tools import ToolContext
 
 from deployment.observability import trace_tool
 
+from .backends import select_backend
+from .deadlines import collector_timeout, timed_out_stats, within_deadline
+from .executor import run_probe
+from .history import MEMORY_GROUP, METRIC_HISTORY, memory_history_values
+from .pressure import MEMORY_RESOURCE, read_pressure
+from .sampler import get_latest_snapshot
 from .units import bytes_to_gb
 
 CACHE_UNAVAILABLE_REASON = "Cache metric not available on this platform."
 
 
-@trace_tool()
-def collect_memory_stats(tool_context: ToolContext) -> dict[str, Any]:
-  """Collect memory statistics using psutil."""
-  memory = psutil.virtual_memory()
-  swap = psutil.swap_memory()
+def _read_memory() -> tuple[Any, Any]:
+  """Return (virtual memory, swap) from the sampler or the backend."""
+  snapshot = get_latest_snapshot()
+  if snapshot is not None:
+    return snapshot.memory, snapshot.swap
+  backend = select_backend(psutil)
+  return backend.virtual_memory(), backend.swap_memory()
+
 
+def _publish(
+  tool_context: ToolContext,
+  memory: Any,
+  swap: Any,
+) -> dict[str, Any]:
+  """Build memory_stats, store it, and wrap the tool response."""
   cache_gb = None
   cache_reason = CACHE_UNAVAILABLE_REASON
   cached_value = getattr(memory, "cached", None)
@@ -36,11 +51,46 @@ def collect_memory_stats(tool_context: ToolContext) -> dict[str, Any]:
     "swap_used_gb": bytes_to_gb(swap.used),
     "swap_used_percent": round(swap.percent, 2),
   }
+  data["pressure"], data["pressure_reason"] = read_pressure(MEMORY_RESOURCE)
 
   tool_context.state["memory_stats"] = data
+  METRIC_HISTORY.record(MEMORY_GROUP, memory_history_values(data))
 
   return {
     "status": "ok",
     "data": data,
     "error": None,
   }
+
+
+@trace_tool()
+def collect_memory_stats(tool_context: ToolContext) -> dict[str, Any]:
+  """Collect memory statistics using psutil."""
+  memory, swap = _read_memory()
+  return _publish(tool_context, memory, swap)
+
+
+@trace_tool()
+async def collect_memory_stats_async(
+  tool_context: ToolContext,
+) -> dict[str, Any]:
+  """Collect memory statistics with backend reads on the collector pool.
+
+  A read that overruns the collector deadline stores a payload whose
+  stats_reason says so.
+  """
+  readings, reason = await within_deadline(
+    run_probe(_read_memory),
+    None,
+    collector_timeout(),
+  )
+  if reason is not None:
+    data = timed_out_stats(reason)
+    tool_context.state["memory_stats"] = data
+    return {
+      "status": "ok",
+      "data": data,
+      "error": None,
+    }
+  memory, swap = readings
+  return _publish(tool_context, memory, swap)
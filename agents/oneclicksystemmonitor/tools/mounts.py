@@ -0,0 +1,291 @@
+"""Cached, filtered mount table and concurrent per-mount usage queries.
+
+The partition list is re-enumerated only when the mount table changes.
+On Linux the kernel flags /proc/self/mounts as readable-with-priority
+after every mount or unmount, so a zero-timeout poll() is enough to
+detect changes; elsewhere the list expires after a TTL.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, wait
+import select
+import threading
+import time
+from typing import Any, Iterable
+
+from .env import env_float, env_int
+
+MOUNT_CACHE_TTL_ENV_VAR = "SYSTEM_MONITOR_MOUNT_CACHE_TTL"
+MOUNT_USAGE_THREADS_ENV_VAR = "SYSTEM_MONITOR_MOUNT_USAGE_THREADS"
+DEFAULT_MOUNT_CACHE_TTL = 60.0
+DEFAULT_MOUNT_USAGE_THREADS = 8
+# Below this many mounts, thread hand-off costs more than it saves.
+PARALLEL_USAGE_MIN_MOUNTS = 8
+MOUNTS_PATH = "/proc/self/mounts"
+PARTITION_SKIP_FS_TYPES = frozenset(
+  {
+    "",
+    "tmpfs",
+    "devtmpfs",
+    "overlay",
+    "squashfs",
+    "proc",
+    "sysfs",
+    "devpts",
+    "cgroup",
+    "cgroup2",
+    "mqueue",
+    "debugfs",
+    "tracefs",
+    "securityfs",
+    "pstore",
+    "bpf",
+    "configfs",
+    "fusectl",
+    "autofs",
+    "binfmt_misc",
+    "hugetlbfs",
+    "nsfs",
+    "ramfs",
+    "rpc_pipefs",
+    "efivarfs",
+  }
+)
+# Container roots are overlay mounts; only other overlays are image layers.
+ROOT_MOUNTPOINT = "/"
+ROOT_FS_TYPES = frozenset({"overlay"})
+
+
+def filter_partitions(partitions: Iterable[Any]) -> list[Any]:
+  """Drop pseudo filesystems and repeated mountpoints or block devices.
+
+  A block device mounted in several places (bind mounts, WSL's
+  /mnt/wslg/distro) is reported once, at its first mountpoint. An
+  overlay mounted at / is kept, since it is a container's root disk.
+  """
+  kept = []
+  seen_mounts: set[str] = set()
+  seen_devices: set[str] = set()
+  for partition in partitions:
+    if partition.fstype in PARTITION_SKIP_FS_TYPES and not (
+      partition.mountpoint == ROOT_MOUNTPOINT
+      and partition.fstype in ROOT_FS_TYPES
+    ):
+      continue
+    if partition.mountpoint in seen_mounts:
+      continue
+    seen_mounts.add(partition.mountpoint)
+    device = partition.device
+    if device.startswith("/dev/"):
+      if device in seen_devices:
+        continue
+      seen_devices.add(device)
+    kept.append(partition)
+  return kept
+
+
+class _MountTableWatcher:
+  """Report whether the mount table changed since the last check."""
+
+  def __init__(self, path: str = MOUNTS_PATH) -> None:
+    self._poller: Any = None
+    self._handle: Any = None
+    try:
+      # Kept open for the cache's lifetime; poll() needs the descriptor.
+      self._handle = open(path, "rb")  # noqa: SIM115
+      self._poller = select.poll()
+      self._poller.register(
+        self._handle.fileno(),
+        select.POLLPRI | select.POLLERR,
+      )
+    except (OSError, AttributeError):
+      self.close()
+
+  @property
+  def available(self) -> bool:
+    """Return True when kernel change notification is usable."""
+    return self._poller is not None
+
+  def changed(self) -> bool:
+    """Return True once per mount-table change."""
+    return bool(self._poller.poll(0))
+
+  def close(self) -> None:
+    """Release the polled file handle."""
+    if self._handle is not None:
+      self._handle.close()
+    self._handle = None
+    self._poller = None
+
+
+class MountTableCache:
+  """Filtered partitions, refreshed only when the mount table changes."""
+
+  def __init__(self, ttl: float | None = None, watch: bool = True) -> None:
+    self.ttl = ttl if ttl is not None else env_float(
+      MOUNT_CACHE_TTL_ENV_VAR,
+      DEFAULT_MOUNT_CACHE_TTL,
+    )
+    self.refreshes = 0
+    self._watcher = _MountTableWatcher() if watch else None
+    self._backend: Any = None
+    self._partitions: list[Any] | None = None
+    self._loaded_at = 0.0
+    self._lock = threading.Lock()
+
+  def _is_stale(self, backend: Any) -> bool:
+    """Return whether the cached list must be re-enumerated."""
+    if self._partitions is None or backend is not self._backend:
+      return True
+    if self._watcher is not None and self._watcher.available:
+      return self._watcher.changed()
+    return time.monotonic() - self._loaded_at >= self.ttl
+
+  def partitions(self, backend: Any) -> list[Any]:
+    """Return filtered partitions for backend, re-reading on change."""
+    with self._lock:
+      if self._is_stale(backend):
+        if self._watcher is not None and self._watcher.available:
+          # Consume any pending event so this read counts as current.
+          self._watcher.changed()
+        self._partitions = filter_partitions(
+          backend.disk_partitions(all=False)
+        )
+        self._backend = backend
+        self._loaded_at = time.monotonic()
+        self.refreshes += 1
+      return self._partitions
+
+  def invalidate(self) -> None:
+    """Force the next partitions() call to re-enumerate."""
+    with self._lock:
+      self._partitions = None
+
+
+MOUNT_TABLE = MountTableCache()
+_USAGE_POOL: ThreadPoolExecutor | None = None
+_USAGE_THREADS = 1
+_USAGE_POOL_LOCK = threading.Lock()
+
+
+def _usage_pool() -> ThreadPoolExecutor:
+  """Return the statvfs pool, kept apart from the collector pool.
+
+  Usage queries are issued from collector-pool threads, so sharing that
+  pool could leave them waiting on work queued behind themselves.
+  """
+  global _USAGE_POOL, _USAGE_THREADS
+  if _USAGE_POOL is None:
+    with _USAGE_POOL_LOCK:
+      if _USAGE_POOL is None:
+        _USAGE_THREADS = env_int(
+          MOUNT_USAGE_THREADS_ENV_VAR,
+          DEFAULT_MOUNT_USAGE_THREADS,
+        )
+        _USAGE_POOL = ThreadPoolExecutor(
+          max_workers=_USAGE_THREADS,
+          thread_name_prefix="mount-usage",
+        )
+  return _USAGE_POOL
+
+
+def _usage_or_none(backend: Any, mountpoint: str) -> Any:
+  """Return disk usage for a mountpoint, or None when it cannot be read."""
+  try:
+    return backend.disk_usage(mountpoint)
+  except (PermissionError, OSError):
+    return None
+
+
+def _usage_chunk(backend: Any, mountpoints: list[str]) -> list[Any]:
+  """Return usage for several mountpoints serially."""
+  return [_usage_or_none(backend, mount) for mount in mountpoints]
+
+
+class _UsageQuery:
+  """One batch of usage reads that may be abandoned at a deadline."""
+
+  def __init__(
+    self,
+    backend: Any,
+    mountpoints: list[str],
+    deadline: float | None,
+  ) -> None:
+    self.backend = backend
+    self.mountpoints = mountpoints
+    self.deadline = deadline
+    self.results: list[Any] = [None] * len(mountpoints)
+    self.done = [False] * len(mountpoints)
+    self.started: set[int] = set()
+
+  def run_stripe(self, offset: int, step: int) -> None:
+    """Read every step-th mount from offset until the deadline passes."""
+    for index in range(offset, len(self.mountpoints), step):
+      if self.deadline is not None and time.monotonic() >= self.deadline:
+        return
+      mount = self.mountpoints[index]
+      with _HUNG_LOCK:
+        if mount in _HUNG_MOUNTS:
+          continue
+        self.started.add(index)
+      usage = _usage_or_none(self.backend, mount)
+      with _HUNG_LOCK:
+        self.results[index] = usage
+        self.done[index] = True
+        _HUNG_MOUNTS.discard(mount)
+
+  def finish(self) -> tuple[list[Any], list[str]]:
+    """Return results so far and quarantine reads still in progress."""
+    with _HUNG_LOCK:
+      for index in self.started:
+        if not self.done[index]:
+          _HUNG_MOUNTS.add(self.mountpoints[index])
+      timed_out = [
+        mount
+        for mount, done in zip(self.mountpoints, self.done)
+        if not done
+      ]
+      return list(self.results), timed_out
+
+
+# Mounts whose statvfs outlived a deadline and has not returned yet. They
+# are skipped, so a hung NFS server ties up at most one pool thread.
+_HUNG_MOUNTS: set[str] = set()
+_HUNG_LOCK = threading.Lock()
+
+
+def query_usage(
+  backend: Any,
+  partitions: list[Any],
+  timeout: float | None = None,
+) -> tuple[list[Any], list[str]]:
+  """Return per-partition disk usage and the mounts that timed out.
+
+  Mounts are striped across the usage pool so a single slow or hung
+  filesystem (NFS, FUSE) delays only its own stripe. Usage is None for
+  unreadable and timed-out mounts.
+
+  Args:
+    backend: psutil-compatible backend.
+    partitions: Partitions to query, usually from MOUNT_TABLE.
+    timeout: Seconds to wait before abandoning unfinished reads.
+  """
+  mountpoints = [partition.mountpoint for partition in partitions]
+  if timeout is None and len(mountpoints) < PARALLEL_USAGE_MIN_MOUNTS:
+    return _usage_chunk(backend, mountpoints), []
+  if not mountpoints:
+    return [], []
+  pool = _usage_pool()
+  stripes = min(_USAGE_THREADS, len(mountpoints))
+  query = _UsageQuery(
+    backend,
+    mountpoints,
+    None if timeout is None else time.monotonic() + timeout,
+  )
+  futures = [
+    pool.submit(query.run_stripe, offset, stripes)
+    for offset in range(stripes)
+  ]
+  wait(futures, timeout=timeout)
+  return query.finish()
@@ -0,0 +1,116 @@
+"""Pressure Stall Information (PSI) readers.
+
+/proc/pressure/{cpu,memory,io} report the share of wall time in which
+some (or all) runnable tasks were stalled waiting on that resource, as
+10 s, 60 s, and 300 s averages plus a cumulative microsecond total.
+Inside a cgroup v2 container the cgroup's own <resource>.pressure files
+are read instead. Each read is one pread on a cached descriptor.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+from .backends import PROCFS_ROOT, _ProcFile, get_cgroup
+
+CPU_RESOURCE = "cpu"
+MEMORY_RESOURCE = "memory"
+IO_RESOURCE = "io"
+PRESSURE_UNAVAILABLE_REASON = "Pressure stall information not available."
+PRESSURE_AVERAGES = (b"avg10", b"avg60", b"avg300")
+
+
+class PressureReader:
+  """Parse PSI files and track total stall time between reads.
+
+  Args:
+    pressure_root: Directory holding cpu, memory, and io PSI files.
+    suffix: File name suffix, ".pressure" for cgroup directories.
+  """
+
+  def __init__(self, pressure_root: str, suffix: str = "") -> None:
+    self.pressure_root = pressure_root
+    self.suffix = suffix
+    self._files: dict[str, _ProcFile] = {}
+    self._last_totals: dict[tuple[str, str], tuple[float, int]] = {}
+    self._lock = threading.Lock()
+
+  def read(self, resource: str) -> dict[str, Any] | None:
+    """Return {"some": {...}, "full": {...}} for resource, or None.
+
+    Each line holds avg10, avg60, and avg300 percentages plus
+    total_delta_us, the stall time since the previous read (None on
+    the first read), and interval_s, the time that delta covers.
+    """
+    with self._lock:
+      proc_file = self._files.get(resource)
+      if proc_file is None:
+        proc_file = _ProcFile(f"{self.pressure_root}/{resource}{self.suffix}")
+        self._files[resource] = proc_file
+      try:
+        raw = proc_file.read()
+      except OSError:
+        return None
+      now = time.monotonic()
+
+      pressure: dict[str, Any] = {}
+      for line in raw.split(b"\n"):
+        fields = line.split()
+        if not fields:
+          continue
+        kind = fields[0].decode("ascii", "replace")
+        values = dict(field.split(b"=", 1) for field in fields[1:])
+        total = int(values.get(b"total", 0))
+        entry: dict[str, Any] = {
+          average.decode(): float(values.get(average, 0.0))
+          for average in PRESSURE_AVERAGES
+        }
+        entry["total_delta_us"] = None
+        entry["interval_s"] = None
+        previous = self._last_totals.get((resource, kind))
+        if previous is not None:
+          entry["total_delta_us"] = max(total - previous[1], 0)
+          entry["interval_s"] = round(now - previous[0], 3)
+        self._last_totals[(resource, kind)] = (now, total)
+        pressure[kind] = entry
+      return pressure or None
+
+  def close(self) -> None:
+    """Release every cached descriptor."""
+    with self._lock:
+      for proc_file in self._files.values():
+        proc_file.close()
+
+
+_READER: PressureReader | None = None
+_READER_LOCK = threading.Lock()
+
+
+def get_pressure_reader() -> PressureReader:
+  """Return the shared reader, scoped to the container when limited."""
+  global _READER
+  if _READER is None:
+    with _READER_LOCK:
+      if _READER is None:
+        cgroup = get_cgroup()
+        if cgroup is not None:
+          _READER = PressureReader(cgroup.path, ".pressure")
+        else:
+          _READER = PressureReader(f"{PROCFS_ROOT}/pressure")
+  return _READER
+
+
+def read_pressure(resource: str) -> tuple[dict[str, Any] | None, str | None]:
+  """Return (pressure, pressure_reason) fields for a collector payload."""
+  pressure = get_pressure_reader().read(resource)
+  if pressure is None:
+    return None, PRESSURE_UNAVAILABLE_REASON
+  return pressure, None
+
+
+def some_avg10(stats: dict[str, Any] | None) -> float | None:
+  """Return the "some" avg10 stall percentage from a collector payload."""
+  pressure = (stats or {}).get("pressure") or {}
+  return (pressure.get("some") or {}).get("avg10")
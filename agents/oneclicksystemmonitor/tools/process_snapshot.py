@@ -0,0 +1,478 @@
+"""Incremental /proc process table with per-name and per-user rollups.
+
+ProcessScanner keeps one row per live process between walks and keeps
+per-name and per-user totals current as rows change, so a report never
+loops over every process. Each walk reads every process's stat line and
+compares its hash with the last one; only changed lines are parsed, so a
+process that starts using CPU is noticed on the next walk. The costly
+fd-table listing, when enabled, is done only for:
+
+- processes that are new since the previous walk;
+- processes that were using CPU when last read;
+- one of idle_refresh_walks rotating shards of the idle rest.
+
+The pid listing itself is skipped when /proc/loadavg shows that no task
+was created or exited since the previous walk.
+"""
+
+from __future__ import annotations
+
+import os
+import pwd
+import threading
+import time
+from typing import Any
+
+from .backends import PROCFS_ROOT
+from .env import env_int
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+STAT_READ_SIZE = 4096
+IDLE_REFRESH_WALKS_ENV_VAR = "SYSTEM_MONITOR_PROCESS_IDLE_REFRESH_WALKS"
+DEFAULT_IDLE_REFRESH_WALKS = 16
+# Processes below this CPU share are idle; their fd tables are listed
+# only in their shard's walk.
+ACTIVE_CPU_PERCENT = 0.01
+# Field offsets in /proc/<pid>/stat counted after the "(comm)" field.
+_UTIME_FIELD = 11
+_STIME_FIELD = 12
+_THREADS_FIELD = 17
+_START_FIELD = 19
+_RSS_FIELD = 21
+
+
+class _ProcessRow:
+  """Last reading of one process."""
+
+  __slots__ = (
+    "name_id",
+    "user_id",
+    "start",
+    "ticks",
+    "read_at",
+    "cpu_percent",
+    "rss_bytes",
+    "threads",
+    "open_files",
+    "stat_hash",
+  )
+
+  def __init__(
+    self,
+    name_id: int,
+    user_id: int,
+    start: int,
+    ticks: int,
+    read_at: float,
+    cpu_percent: float,
+    rss_bytes: int,
+    threads: int,
+    open_files: int,
+    stat_hash: int,
+  ) -> None:
+    self.name_id = name_id
+    self.user_id = user_id
+    self.start = start
+    self.ticks = ticks
+    self.read_at = read_at
+    self.cpu_percent = cpu_percent
+    self.rss_bytes = rss_bytes
+    self.threads = threads
+    # -1 when the fd table was not read.
+    self.open_files = open_files
+    # Hash of the whole stat line; unchanged means nothing to update.
+    self.stat_hash = stat_hash
+
+
+class _GroupTotals:
+  """Running integer sums per interned name or user id."""
+
+  def __init__(self) -> None:
+    self.processes: list[int] = []
+    self.rss_bytes: list[int] = []
+    self.threads: list[int] = []
+    self.open_files: list[int] = []
+
+  def grow(self) -> None:
+    """Add a zeroed group for a newly interned label."""
+    self.processes.append(0)
+    self.rss_bytes.append(0)
+    self.threads.append(0)
+    self.open_files.append(0)
+
+  def add(self, key: int, row: _ProcessRow, sign: int) -> None:
+    """Add (sign 1) or remove (sign -1) one row's contribution."""
+    self.processes[key] += sign
+    self.rss_bytes[key] += sign * row.rss_bytes
+    self.threads[key] += sign * row.threads
+    if row.open_files > 0:
+      self.open_files[key] += sign * row.open_files
+
+  def copy(self) -> _GroupTotals:
+    """Return an independent copy for a snapshot."""
+    totals = _GroupTotals()
+    totals.processes = list(self.processes)
+    totals.rss_bytes = list(self.rss_bytes)
+    totals.threads = list(self.threads)
+    totals.open_files = list(self.open_files)
+    return totals
+
+
+class ProcessSnapshot:
+  """Process-table totals as of one walk.
+
+  cpu_measured is False after the first walk, whose CPU percentages are
+  lifetime averages (0 when /proc/uptime is unreadable). open_files is 0
+  for processes whose fd table was not read; open_files_unknown counts
+  them.
+  """
+
+  def __init__(
+    self,
+    taken_at: float,
+    names: list[str],
+    users: list[str],
+    by_name: tuple[_GroupTotals, list[float]],
+    by_user: tuple[_GroupTotals, list[float]],
+  ) -> None:
+    self.taken_at = taken_at
+    self.names = names
+    self.users = users
+    self.process_count = 0
+    self.thread_count = 0
+    self.rss_bytes = 0
+    self.open_files_unknown = 0
+    self.counts_open_files = False
+    self.cpu_measured = False
+    self._by_name = by_name
+    self._by_user = by_user
+
+  def __len__(self) -> int:
+    return self.process_count
+
+  def group_totals(self, by_user: bool = False) -> list[dict[str, Any]]:
+    """Return per-name (or per-user) totals, busiest CPU first."""
+    labels = self.users if by_user else self.names
+    totals, cpu = self._by_user if by_user else self._by_name
+    rows = [
+      {
+        "label": labels[key],
+        "processes": count,
+        "cpu_percent": cpu[key],
+        "rss_bytes": totals.rss_bytes[key],
+        "threads": totals.threads[key],
+        "open_files": totals.open_files[key],
+      }
+      for key, count in enumerate(totals.processes)
+      if count
+    ]
+    rows.sort(
+      key=lambda row: (row["cpu_percent"], row["rss_bytes"]),
+      reverse=True,
+    )
+    return rows
+
+
+def _idle_refresh_walks() -> int:
+  """Return SYSTEM_MONITOR_PROCESS_IDLE_REFRESH_WALKS or the default."""
+  return env_int(IDLE_REFRESH_WALKS_ENV_VAR, DEFAULT_IDLE_REFRESH_WALKS)
+
+
+class ProcessScanner:
+  """Keep an incrementally refreshed process table and its rollups.
+
+  Args:
+    procfs_root: Root of the proc filesystem, overridable for tests.
+    count_open_files: List each /proc/<pid>/fd when a row is read; the
+      costliest read, so off by default.
+    idle_refresh_walks: Walks between fd-table reads of an idle process;
+      defaults to SYSTEM_MONITOR_PROCESS_IDLE_REFRESH_WALKS.
+  """
+
+  def __init__(
+    self,
+    procfs_root: str = PROCFS_ROOT,
+    count_open_files: bool = False,
+    idle_refresh_walks: int | None = None,
+  ) -> None:
+    self.procfs_root = procfs_root
+    self.count_open_files = count_open_files
+    self.idle_refresh_walks = idle_refresh_walks or _idle_refresh_walks()
+    self._names: list[str] = []
+    self._name_ids: dict[bytes, int] = {}
+    self._users: list[str] = []
+    self._user_ids: dict[int, int] = {}
+    self._by_name = _GroupTotals()
+    self._by_user = _GroupTotals()
+    self._rows: dict[str, _ProcessRow] = {}
+    self._active: set[str] = set()
+    self._shards: list[set[str]] = [
+      set() for _ in range(self.idle_refresh_walks)
+    ]
+    self._thread_count = 0
+    self._rss_bytes = 0
+    self._open_files_unknown = 0
+    self._tasks_marker: bytes | None = None
+    self._walks = 0
+    self._previous: ProcessSnapshot | None = None
+    self._lock = threading.Lock()
+
+  def _user_id(self, uid: int) -> int:
+    """Return the interned id for uid, resolving its login name once."""
+    user_id = self._user_ids.get(uid)
+    if user_id is not None:
+      return user_id
+    try:
+      user = pwd.getpwuid(uid).pw_name
+    except KeyError:
+      user = str(uid)
+    user_id = len(self._users)
+    self._users.append(user)
+    self._user_ids[uid] = user_id
+    self._by_user.grow()
+    return user_id
+
+  def _name_id(self, comm: bytes) -> int:
+    """Return the interned id for a process name."""
+    name_id = self._name_ids.get(comm)
+    if name_id is not None:
+      return name_id
+    name_id = len(self._names)
+    self._names.append(comm.decode("utf-8", "replace") or "Unknown")
+    self._name_ids[comm] = name_id
+    self._by_name.grow()
+    return name_id
+
+  @property
+  def latest(self) -> ProcessSnapshot | None:
+    """Return the most recent completed walk, if any."""
+    return self._previous
+
+  def scan(self, wait: bool = True) -> ProcessSnapshot | None:
+    """Refresh the process table and return its totals.
+
+    Args:
+      wait: When False, return None instead of queueing behind a walk
+        that is already running.
+
+    Raises:
+      OSError: If the proc filesystem cannot be listed.
+    """
+    if not self._lock.acquire(blocking=wait):
+      return None
+    try:
+      snapshot = self._walk()
+      self._previous = snapshot
+      return snapshot
+    finally:
+      self._lock.release()
+
+  def _read_small(self, name: str) -> bytes | None:
+    """Return a small procfs file's contents, or None if unreadable."""
+    try:
+      fd = os.open(f"{self.procfs_root}/{name}", os.O_RDONLY | os.O_CLOEXEC)
+    except OSError:
+      return None
+    try:
+      return os.read(fd, STAT_READ_SIZE)
+    except OSError:
+      return None
+    finally:
+      os.close(fd)
+
+  def _read_tasks_marker(self) -> bytes | None:
+    """Return loadavg's task-count and last-pid fields.
+
+    Every fork allocates a new pid and every exit lowers the task count,
+    so an unchanged marker means the pid set is unchanged.
+    """
+    raw = self._read_small("loadavg")
+    fields = raw.split() if raw else []
+    if len(fields) < 5:
+      return None
+    return fields[3].partition(b"/")[2] + b" " + fields[4]
+
+  def _read_uptime(self) -> float | None:
+    """Return seconds since boot, or None when unreadable."""
+    raw = self._read_small("uptime")
+    try:
+      return float(raw.split()[0]) if raw else None
+    except (IndexError, ValueError):
+      return None
+
+  def _account(self, row: _ProcessRow, sign: int) -> None:
+    """Add or remove one row from every running total."""
+    self._by_name.add(row.name_id, row, sign)
+    self._by_user.add(row.user_id, row, sign)
+    self._thread_count += sign * row.threads
+    self._rss_bytes += sign * row.rss_bytes
+    if row.open_files < 0:
+      self._open_files_unknown += sign
+
+  def _update(
+    self,
+    row: _ProcessRow,
+    rss_bytes: int,
+    threads: int,
+    open_files: int,
+  ) -> None:
+    """Move a re-read row's totals to its new values."""
+    rss_delta = rss_bytes - row.rss_bytes
+    threads_delta = threads - row.threads
+    if rss_delta or threads_delta:
+      self._by_name.rss_bytes[row.name_id] += rss_delta
+      self._by_user.rss_bytes[row.user_id] += rss_delta
+      self._by_name.threads[row.name_id] += threads_delta
+      self._by_user.threads[row.user_id] += threads_delta
+      self._rss_bytes += rss_delta
+      self._thread_count += threads_delta
+      row.rss_bytes = rss_bytes
+      row.threads = threads
+    if open_files != row.open_files:
+      self._account(row, -1)
+      row.open_files = open_files
+      self._account(row, 1)
+
+  def _remove(self, pid: str) -> None:
+    """Forget a process that exited or whose pid was reused."""
+    row = self._rows.pop(pid, None)
+    if row is None:
+      return
+    self._account(row, -1)
+    self._active.discard(pid)
+    self._shards[int(pid) % self.idle_refresh_walks].discard(pid)
+
+  def _walk(self) -> ProcessSnapshot:
+    """Re-read changed processes and list fds of new, active, one shard."""
+    root = self.procfs_root
+    rows = self._rows
+    marker = self._read_tasks_marker()
+    new: set[str] = set()
+    if marker is None or marker != self._tasks_marker or not self._walks:
+      listed = {name for name in os.listdir(root) if name.isdigit()}
+      for pid in rows.keys() - listed:
+        self._remove(pid)
+      new = listed - rows.keys()
+    self._tasks_marker = marker
+    uptime = self._read_uptime() if new else None
+    to_read = new.union(rows)
+    count_open_files = self.count_open_files
+    list_fds: set[str] = set()
+    if count_open_files:
+      shard = self._shards[self._walks % self.idle_refresh_walks]
+      list_fds = new.union(self._active, shard)
+
+    flags = os.O_RDONLY | os.O_CLOEXEC
+    tick_scale = 100 / CLOCK_TICKS
+    now = time.monotonic()
+    active = self._active
+    for pid in to_read:
+      base = f"{root}/{pid}"
+      row = rows.get(pid)
+      try:
+        fd = os.open(f"{base}/stat", flags)
+        try:
+          raw = os.read(fd, STAT_READ_SIZE)
+          stat_hash = hash(raw)
+          if (
+            row is not None
+            and row.stat_hash == stat_hash
+            and pid not in list_fds
+          ):
+            # No CPU ticks, memory, or thread change since the last read.
+            row.cpu_percent = 0.0
+            row.read_at = now
+            active.discard(pid)
+            continue
+          close = raw.rfind(b")")
+          fields = raw[close + 2:].split(None, _RSS_FIELD + 1)
+          start = int(fields[_START_FIELD])
+          ticks = int(fields[_UTIME_FIELD]) + int(fields[_STIME_FIELD])
+          threads = int(fields[_THREADS_FIELD])
+          rss_bytes = int(fields[_RSS_FIELD]) * PAGE_SIZE
+          if row is not None and row.start != start:
+            # The pid was reused by a new process.
+            self._remove(pid)
+            row = None
+          # /proc/<pid> files are owned by the process's effective uid.
+          uid = os.fstat(fd).st_uid if row is None else 0
+        finally:
+          os.close(fd)
+      except (OSError, IndexError, ValueError):
+        # Exited between listing and reading, or unparsable.
+        self._remove(pid)
+        continue
+
+      open_files = -1
+      if count_open_files and (row is None or pid in list_fds):
+        try:
+          open_files = len(os.listdir(f"{base}/fd"))
+        except OSError:
+          pass
+      elif row is not None:
+        open_files = row.open_files
+
+      if row is None:
+        measured = uptime is not None
+        cpu_percent = 0.0
+        if measured:
+          lifetime = uptime - start / CLOCK_TICKS
+          if lifetime > 0:
+            cpu_percent = ticks * tick_scale / lifetime
+        row = _ProcessRow(
+          self._name_id(raw[raw.find(b"(") + 1:close]),
+          self._user_id(uid),
+          start,
+          ticks,
+          now,
+          cpu_percent,
+          rss_bytes,
+          threads,
+          open_files,
+          stat_hash,
+        )
+        rows[pid] = row
+        self._shards[int(pid) % self.idle_refresh_walks].add(pid)
+        self._account(row, 1)
+      else:
+        elapsed = now - row.read_at
+        measured = True
+        if elapsed > 0:
+          row.cpu_percent = max(ticks - row.ticks, 0) * tick_scale / elapsed
+        row.ticks = ticks
+        row.read_at = now
+        row.stat_hash = stat_hash
+        self._update(row, rss_bytes, threads, open_files)
+      # Rows without a measured rate stay active until they have one.
+      if not measured or row.cpu_percent >= ACTIVE_CPU_PERCENT:
+        active.add(pid)
+      else:
+        active.discard(pid)
+
+    self._walks += 1
+    return self._snapshot()
+
+  def _snapshot(self) -> ProcessSnapshot:
+    """Copy the running totals and sum CPU over active processes."""
+    name_cpu = [0.0] * len(self._names)
+    user_cpu = [0.0] * len(self._users)
+    rows = self._rows
+    for pid in self._active:
+      row = rows[pid]
+      name_cpu[row.name_id] += row.cpu_percent
+      user_cpu[row.user_id] += row.cpu_percent
+    snapshot = ProcessSnapshot(
+      time.monotonic(),
+      self._names,
+      self._users,
+      (self._by_name.copy(), name_cpu),
+      (self._by_user.copy(), user_cpu),
+    )
+    snapshot.process_count = len(rows)
+    snapshot.thread_count = self._thread_count
+    snapshot.rss_bytes = self._rss_bytes
+    snapshot.open_files_unknown = self._open_files_unknown
+    snapshot.counts_open_files = self.count_open_files
+    snapshot.cpu_measured = self._walks > 1
+    return snapshot
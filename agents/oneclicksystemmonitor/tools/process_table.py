@@ -0,0 +1,103 @@
+"""Long-lived process table for ranking CPU consumers."""
+
+from __future__ import annotations
+
+import heapq
+import threading
+from typing import Any, Iterator
+
+import psutil
+
+
+class ProcessSummary:
+  """Lightweight process summary."""
+
+  def __init__(self, name: str, cpu_percent: float, pid: int | None = None):
+    self.name = name
+    self.cpu_percent = cpu_percent
+    self.pid = pid
+
+
+class ProcessTable:
+  """Cache psutil.Process handles so CPU deltas survive across calls.
+
+  psutil reports CPU usage as the delta since the previous cpu_percent()
+  call on the same Process object, so fresh objects always report 0.0.
+  Keeping handles alive between calls makes every reading after the first
+  one meaningful. Names are resolved lazily for the top-N winners only,
+  which keeps a refresh close to one stat read per process.
+  """
+
+  def __init__(self) -> None:
+    self._processes: dict[int, Any] = {}
+    self._names: dict[int, str] = {}
+    self._lock = threading.Lock()
+
+  def __len__(self) -> int:
+    return len(self._processes)
+
+  @property
+  def is_primed(self) -> bool:
+    """Return True once the table holds primed process handles."""
+    return bool(self._processes)
+
+  def prime(self) -> None:
+    """Start CPU deltas for every process unless already primed."""
+    with self._lock:
+      if self._processes:
+        return
+      for _ in self._sync():
+        pass
+
+  def top(self, count: int) -> list[ProcessSummary]:
+    """Return the top CPU consumers since the previous call."""
+    if count <= 0:
+      return []
+    with self._lock:
+      winners = heapq.nlargest(count, self._sync())
+      return [
+        ProcessSummary(self._resolve_name(pid), cpu_percent, pid)
+        for cpu_percent, pid in winners
+      ]
+
+  def clear(self) -> None:
+    """Drop every cached process handle."""
+    with self._lock:
+      self._processes.clear()
+      self._names.clear()
+
+  def _sync(self) -> Iterator[tuple[float, int]]:
+    """Refresh handles, evict dead PIDs, and yield (cpu_percent, pid)."""
+    current_pids = set(psutil.pids())
+    for pid in self._processes.keys() - current_pids:
+      self._evict(pid)
+
+    for pid in current_pids:
+      process = self._processes.get(pid)
+      is_new = process is None
+      try:
+        if is_new:
+          process = psutil.Process(pid)
+          self._processes[pid] = process
+        cpu_percent = process.cpu_percent(interval=None)
+      except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        self._evict(pid)
+        continue
+      yield cpu_percent, pid
+
+  def _resolve_name(self, pid: int) -> str:
+    """Return the cached process name, reading it on first use."""
+    name = self._names.get(pid)
+    if name is not None:
+      return name
+    try:
+      name = self._processes[pid].name() or "Unknown"
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+      name = "Unknown"
+    self._names[pid] = name
+    return name
+
+  def _evict(self, pid: int) -> None:
+    """Forget a process that no longer exists."""
+    self._processes.pop(pid, None)
+    self._names.pop(pid, None)
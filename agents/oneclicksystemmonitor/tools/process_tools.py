@@ -0,0 +1,140 @@
+"""Process table tool for OneClickSystemMonitor."""
+
+import os
+from typing import Any
+
+from google.adk.tools import ToolContext
+
+from deployment.observability import trace_chain, trace_tool
+
+from .deadlines import collector_timeout, within_deadline
+from .env import env_int
+from .executor import run_blocking
+from .process_snapshot import ProcessScanner, ProcessSnapshot
+from .units import bytes_to_mb
+
+PROCESS_GROUP_COUNT_ENV_VAR = "SYSTEM_MONITOR_PROCESS_GROUP_COUNT"
+PROCESS_OPEN_FILES_ENV_VAR = "SYSTEM_MONITOR_PROCESS_OPEN_FILES"
+DEFAULT_PROCESS_GROUP_COUNT = 5
+PROCESS_TABLE_UNAVAILABLE_REASON = "Process table not available."
+PROCESS_WALK_BUSY_REASON = "Process table walk still running"
+PROCESS_WALK_STALE_SUFFIX = "showing the previous walk."
+PROCESS_CPU_PENDING_REASON = (
+  "Process CPU usage is a lifetime average until the next collection."
+)
+OPEN_FILES_UNAVAILABLE_REASON = (
+  "Open file counts exclude processes whose fd table is not readable."
+)
+OPEN_FILES_DISABLED_REASON = (
+  f"Open file counts are off; set {PROCESS_OPEN_FILES_ENV_VAR}=1."
+)
+
+_SCANNER = ProcessScanner(
+  count_open_files=os.getenv(PROCESS_OPEN_FILES_ENV_VAR, "0") != "0",
+)
+
+
+def _process_group_count() -> int:
+  """Return how many name and user groups to report."""
+  return env_int(PROCESS_GROUP_COUNT_ENV_VAR, DEFAULT_PROCESS_GROUP_COUNT)
+
+
+def _group_rows(
+  totals: list[dict[str, Any]],
+  label_key: str,
+  count: int,
+  counts_open_files: bool,
+) -> list[dict[str, Any]]:
+  """Return the top groups in tool output units."""
+  return [
+    {
+      label_key: row["label"],
+      "processes": row["processes"],
+      "cpu_percent": round(row["cpu_percent"], 2),
+      "rss_mb": bytes_to_mb(row["rss_bytes"]),
+      "threads": row["threads"],
+      "open_files": row["open_files"] if counts_open_files else None,
+    }
+    for row in totals[:count]
+  ]
+
+
+@trace_chain()
+def _process_data(snapshot: ProcessSnapshot, count: int) -> dict[str, Any]:
+  """Build the process_stats payload from a snapshot."""
+  counts_open_files = snapshot.counts_open_files
+  open_files_reason = None
+  if not counts_open_files:
+    open_files_reason = OPEN_FILES_DISABLED_REASON
+  elif snapshot.open_files_unknown:
+    open_files_reason = OPEN_FILES_UNAVAILABLE_REASON
+  return {
+    "process_count": len(snapshot),
+    "thread_count": snapshot.thread_count,
+    "rss_mb": bytes_to_mb(snapshot.rss_bytes),
+    "by_name": _group_rows(
+      snapshot.group_totals(),
+      "name",
+      count,
+      counts_open_files,
+    ),
+    "by_user": _group_rows(
+      snapshot.group_totals(by_user=True),
+      "user",
+      count,
+      counts_open_files,
+    ),
+    "process_reason": None,
+    "cpu_reason": None if snapshot.cpu_measured else PROCESS_CPU_PENDING_REASON,
+    "open_files_reason": open_files_reason,
+  }
+
+
+@trace_tool()
+async def collect_process_stats(tool_context: ToolContext) -> dict[str, Any]:
+  """Collect per-process CPU, RSS, threads, and open files by name and user.
+
+  One incremental /proc walk runs on the collector pool under the probe
+  deadline. When it overruns, or another walk is still running, the
+  previous walk is reported instead and process_reason says so. The
+  first walk reads every process, so it has the collector deadline and
+  waits for a walk already in progress.
+  """
+  first_walk = _SCANNER.latest is None
+  try:
+    snapshot, reason = await within_deadline(
+      run_blocking(_SCANNER.scan, first_walk),
+      None,
+      collector_timeout() if first_walk else None,
+    )
+  except OSError:
+    snapshot, reason = None, PROCESS_TABLE_UNAVAILABLE_REASON
+  else:
+    if snapshot is None:
+      reason = reason or PROCESS_WALK_BUSY_REASON
+      snapshot = _SCANNER.latest
+      if snapshot is not None:
+        reason = f"{reason}; {PROCESS_WALK_STALE_SUFFIX}"
+
+  if snapshot is None:
+    data = {
+      "process_count": None,
+      "thread_count": None,
+      "rss_mb": None,
+      "by_name": [],
+      "by_user": [],
+      "process_reason": reason,
+      "cpu_reason": None,
+      "open_files_reason": None,
+    }
+  else:
+    data = _process_data(snapshot, _process_group_count())
+    data["process_reason"] = reason
+
+  tool_context.state["process_stats"] = data
+
+  return {
+    "status": "ok",
+    "data": data,
+    "error": None,
+  }
@@ -0,0 +1,238 @@
+"""Background sampler that keeps recent system snapshots in memory."""
+
+from __future__ import annotations
+
+from collections import deque
+import logging
+import os
+import threading
+import time
+from typing import Any
+
+import psutil
+
+from .backends import select_backend
+from .env import env_float, env_int
+from .units import bytes_to_mb
+
+SAMPLER_ENABLED_ENV_VAR = "SYSTEM_MONITOR_BACKGROUND_SAMPLER"
+SAMPLER_INTERVAL_ENV_VAR = "SYSTEM_MONITOR_SAMPLER_INTERVAL"
+SAMPLER_BUFFER_SIZE_ENV_VAR = "SYSTEM_MONITOR_SAMPLER_BUFFER_SIZE"
+DEFAULT_SAMPLER_INTERVAL = 1.0
+DEFAULT_SAMPLER_BUFFER_SIZE = 300
+SNAPSHOT_MAX_AGE_INTERVALS = 3
+_TRUTHY_VALUES = {"1", "true", "yes", "on"}
+_LOGGER = logging.getLogger(__name__)
+
+
+class SystemSnapshot:
+  """Point-in-time CPU, memory, and disk sample."""
+
+  def __init__(
+    self,
+    taken_at: float,
+    per_core_percent: list[float],
+    memory: Any,
+    swap: Any,
+    read_mb_s: float | None,
+    write_mb_s: float | None,
+  ) -> None:
+    self.taken_at = taken_at
+    self.per_core_percent = per_core_percent
+    self.memory = memory
+    self.swap = swap
+    self.read_mb_s = read_mb_s
+    self.write_mb_s = write_mb_s
+
+  def age(self, now: float | None = None) -> float:
+    """Return seconds elapsed since the snapshot was taken."""
+    if now is None:
+      now = time.monotonic()
+    return now - self.taken_at
+
+
+class BackgroundSampler:
+  """Sample CPU, memory, and disk deltas on a fixed cadence."""
+
+  def __init__(
+    self,
+    interval: float = DEFAULT_SAMPLER_INTERVAL,
+    buffer_size: int = DEFAULT_SAMPLER_BUFFER_SIZE,
+  ) -> None:
+    if interval <= 0:
+      raise ValueError("Sampler interval must be positive.")
+    if buffer_size <= 0:
+      raise ValueError("Sampler buffer size must be positive.")
+    self.interval = interval
+    self._snapshots: deque[SystemSnapshot] = deque(maxlen=buffer_size)
+    self._stop_event = threading.Event()
+    self._thread: threading.Thread | None = None
+    self._last_disk: Any = None
+    self._last_disk_at: float | None = None
+
+  @property
+  def is_running(self) -> bool:
+    """Return True while the sampling thread is alive."""
+    return self._thread is not None and self._thread.is_alive()
+
+  def start(self) -> None:
+    """Prime the delta counters and start the sampling thread."""
+    if self.is_running:
+      return
+    self._stop_event.clear()
+    self._prime()
+    self._thread = threading.Thread(
+      target=self._run,
+      name="system-monitor-sampler",
+      daemon=True,
+    )
+    self._thread.start()
+
+  def stop(self, timeout: float | None = None) -> None:
+    """Stop the sampling thread and wait for it to exit."""
+    self._stop_event.set()
+    if self._thread is not None:
+      self._thread.join(timeout)
+      self._thread = None
+
+  def latest(self, max_age: float | None = None) -> SystemSnapshot | None:
+    """Return the newest snapshot, or None when missing or stale."""
+    try:
+      snapshot = self._snapshots[-1]
+    except IndexError:
+      return None
+    if max_age is not None and snapshot.age() > max_age:
+      return None
+    return snapshot
+
+  def snapshots(self) -> list[SystemSnapshot]:
+    """Return buffered snapshots from oldest to newest."""
+    return list(self._snapshots)
+
+  def sample_once(self) -> SystemSnapshot:
+    """Take one snapshot and append it to the ring buffer."""
+    backend = select_backend(psutil)
+    per_core = backend.cpu_percent(interval=None, percpu=True)
+    memory = backend.virtual_memory()
+    swap = backend.swap_memory()
+    read_mb_s, write_mb_s = self._sample_throughput()
+
+    snapshot = SystemSnapshot(
+      taken_at=time.monotonic(),
+      per_core_percent=list(per_core),
+      memory=memory,
+      swap=swap,
+      read_mb_s=read_mb_s,
+      write_mb_s=write_mb_s,
+    )
+    self._snapshots.append(snapshot)
+    return snapshot
+
+  def _prime(self) -> None:
+    """Seed CPU and disk counters so the first snapshot has deltas."""
+    try:
+      select_backend(psutil).cpu_percent(interval=None, percpu=True)
+    except (AttributeError, OSError):
+      pass
+    self._read_disk_counters()
+
+  def _read_disk_counters(self) -> Any:
+    """Return current disk counters and remember them for the next delta."""
+    previous = self._last_disk
+    try:
+      current = select_backend(psutil).disk_io_counters()
+    except (AttributeError, OSError):
+      current = None
+    self._last_disk = current
+    self._last_disk_at = time.monotonic()
+    return previous
+
+  def _sample_throughput(self) -> tuple[float | None, float | None]:
+    """Return disk throughput in MB/s since the previous sample."""
+    previous_at = self._last_disk_at
+    previous = self._read_disk_counters()
+    current = self._last_disk
+    if previous is None or current is None or previous_at is None:
+      return None, None
+
+    elapsed = self._last_disk_at - previous_at
+    if elapsed <= 0:
+      return None, None
+
+    read_mb = bytes_to_mb(max(current.read_bytes - previous.read_bytes, 0))
+    write_mb = bytes_to_mb(max(current.write_bytes - previous.write_bytes, 0))
+    return round(read_mb / elapsed, 2), round(write_mb / elapsed, 2)
+
+  def _run(self) -> None:
+    """Sample on a drift-free cadence until stopped."""
+    next_tick = time.monotonic() + self.interval
+    while not self._stop_event.wait(max(next_tick - time.monotonic(), 0)):
+      try:
+        self.sample_once()
+      except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception("Background sample failed.")
+      next_tick += self.interval
+      now = time.monotonic()
+      if next_tick < now:
+        next_tick = now + self.interval
+
+
+_SAMPLER: BackgroundSampler | None = None
+_SAMPLER_LOCK = threading.Lock()
+
+
+def _sampler_enabled() -> bool:
+  """Return True when the background sampler is enabled via env var."""
+  value = os.getenv(SAMPLER_ENABLED_ENV_VAR, "")
+  return value.strip().lower() in _TRUTHY_VALUES
+
+
+def start_background_sampler(force: bool = False) -> bool:
+  """Start the process-wide sampler once when enabled.
+
+  Args:
+    force: Start even when the enabling env var is not set.
+
+  Returns:
+    True when the sampler is running; otherwise False.
+  """
+  global _SAMPLER
+  if not force and not _sampler_enabled():
+    return False
+
+  with _SAMPLER_LOCK:
+    if _SAMPLER is not None and _SAMPLER.is_running:
+      return True
+    interval = env_float(SAMPLER_INTERVAL_ENV_VAR, DEFAULT_SAMPLER_INTERVAL)
+    buffer_size = env_int(
+      SAMPLER_BUFFER_SIZE_ENV_VAR,
+      DEFAULT_SAMPLER_BUFFER_SIZE,
+    )
+    sampler = BackgroundSampler(interval=interval, buffer_size=buffer_size)
+    sampler.start()
+    _SAMPLER = sampler
+  return True
+
+
+def stop_background_sampler() -> None:
+  """Stop the process-wide sampler if it is running."""
+  global _SAMPLER
+  with _SAMPLER_LOCK:
+    if _SAMPLER is not None:
+      _SAMPLER.stop()
+    _SAMPLER = None
+
+
+def get_background_sampler() -> BackgroundSampler | None:
+  """Return the process-wide sampler when one was started."""
+  return _SAMPLER
+
+
+def get_latest_snapshot() -> SystemSnapshot | None:
+  """Return the newest fresh snapshot from the running sampler."""
+  sampler = _SAMPLER
+  if sampler is None or not sampler.is_running:
+    return None
+  return sampler.latest(
+    max_age=sampler.interval * SNAPSHOT_MAX_AGE_INTERVALS
+  )
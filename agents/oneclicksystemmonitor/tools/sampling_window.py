@@ -0,0 +1,116 @@
+"""One shared CPU and disk sampling window per collection.
+
+CPU utilization and disk throughput are both deltas over an interval.
+Collectors that run together await the same window instead of each
+sleeping through its own, so a full gather costs one interval.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+import weakref
+
+import psutil
+
+from deployment.observability import trace_chain
+
+from .backends import select_backend
+from .executor import run_probe
+from .units import bytes_to_mb
+
+SAMPLING_WINDOW_SECONDS = 0.1
+
+_IN_FLIGHT: "weakref.WeakKeyDictionary[Any, asyncio.Task]" = (
+  weakref.WeakKeyDictionary()
+)
+
+
+class WindowSample:
+  """CPU and disk deltas measured over one window."""
+
+  def __init__(
+    self,
+    ended_at: float,
+    per_core_percent: list[float],
+    read_mb_s: float | None,
+    write_mb_s: float | None,
+  ) -> None:
+    self.ended_at = ended_at
+    self.per_core_percent = per_core_percent
+    self.read_mb_s = read_mb_s
+    self.write_mb_s = write_mb_s
+
+
+_LATEST: WindowSample | None = None
+
+
+def _read_disk_counters(backend: Any) -> Any:
+  """Return disk counters, or None when unsupported."""
+  try:
+    return backend.disk_io_counters()
+  except (AttributeError, OSError):
+    return None
+
+
+def _open_window(backend: Any) -> Any:
+  """Reset the CPU baseline and return the starting disk counters."""
+  backend.cpu_percent(interval=None, percpu=True)
+  return _read_disk_counters(backend)
+
+
+def _close_window(backend: Any) -> tuple[list[float], Any]:
+  """Return per-core CPU since the baseline and the ending counters."""
+  per_core = backend.cpu_percent(interval=None, percpu=True)
+  return list(per_core), _read_disk_counters(backend)
+
+
+async def _measure(interval: float) -> WindowSample:
+  """Open a window, wait interval seconds, and read both deltas."""
+  global _LATEST
+  backend = select_backend(psutil)
+  first = await run_probe(_open_window, backend)
+  started = time.monotonic()
+  await asyncio.sleep(interval)
+  per_core, second = await run_probe(_close_window, backend)
+  ended = time.monotonic()
+
+  read_mb_s = write_mb_s = None
+  elapsed = ended - started
+  if first is not None and second is not None and elapsed > 0:
+    read_mb = bytes_to_mb(max(second.read_bytes - first.read_bytes, 0))
+    write_mb = bytes_to_mb(max(second.write_bytes - first.write_bytes, 0))
+    read_mb_s = round(read_mb / elapsed, 2)
+    write_mb_s = round(write_mb / elapsed, 2)
+
+  sample = WindowSample(ended, per_core, read_mb_s, write_mb_s)
+  _LATEST = sample
+  return sample
+
+
+@trace_chain()
+async def shared_sampling_window(
+  interval: float | None = None,
+) -> WindowSample:
+  """Return a window no older than interval, measuring one if needed.
+
+  Concurrent callers on the same event loop join the window already in
+  flight rather than starting their own.
+
+  Args:
+    interval: Window length; defaults to SAMPLING_WINDOW_SECONDS.
+  """
+  if interval is None:
+    interval = SAMPLING_WINDOW_SECONDS
+  latest = _LATEST
+  if latest is not None and time.monotonic() - latest.ended_at <= interval:
+    return latest
+
+  loop = asyncio.get_running_loop()
+  task = _IN_FLIGHT.get(loop)
+  if task is None:
+    task = loop.create_task(_measure(interval))
+    _IN_FLIGHT[loop] = task
+    task.add_done_callback(lambda _: _IN_FLIGHT.pop(loop, None))
+  return await asyncio.shield(task)
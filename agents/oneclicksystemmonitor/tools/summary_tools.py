@@ -7,6 +7,10 @@ from google.adk.tools import ToolContext
 
 from deployment.observability import trace_chain, trace_tool
 
+from .history import CPU_GROUP, DISK_GROUP, MEMORY_GROUP
+from .pressure import some_avg10
+from .trend_tools import DEFAULT_TREND_WINDOW_SECONDS, summarize_trends
+
 HIGH_LOAD_LABEL = "High load"
 MODERATE_LOAD_LABEL = "Moderate load"
 LOW_LOAD_LABEL = "Low load"
@@ -20,18 +24,51 @@ CPU_HIGH_THRESHOLD = 80
 CPU_MODERATE_THRESHOLD = 50
 DISK_HIGH_THRESHOLD = 85
 DISK_MODERATE_THRESHOLD = 70
-
-
-@trace_chain()
+# PSI "some avg10": percent of the last 10 s in which at least one task
+# was stalled waiting on the resource.
+CPU_PRESSURE_HIGH_THRESHOLD = 40
+CPU_PRESSURE_MODERATE_THRESHOLD = 10
+MEMORY_PRESSURE_HIGH_THRESHOLD = 20
+MEMORY_PRESSURE_MODERATE_THRESHOLD = 5
+IO_PRESSURE_HIGH_THRESHOLD = 30
+IO_PRESSURE_MODERATE_THRESHOLD = 10
+TREND_MIN_SAMPLES = 2
+PROCESS_GROUP_LABELS = (
+  ("by_name", "name", "By name"),
+  ("by_user", "user", "By user"),
+)
+TREND_LABELS = (
+  (CPU_GROUP, "usage_percent", "CPU usage"),
+  (MEMORY_GROUP, "used_percent", "Memory used"),
+  (DISK_GROUP, "max_used_percent", "Fullest disk"),
+)
+
+
+@trace_chain(aggregate=True)
 def _format_timestamp() -> str:
   """Return a timezone-aware timestamp string."""
   now = datetime.now(timezone.utc).astimezone()
   return now.strftime("%Y-%m-%d %H:%M %Z")
 
 
-@trace_chain()
-def _memory_status(available_percent: float) -> tuple[str, str]:
-  """Return memory status label and guidance."""
+@trace_chain(aggregate=True)
+def _memory_status(
+  available_percent: float,
+  stall_percent: float | None = None,
+) -> tuple[str, str]:
+  """Return memory status label and guidance.
+
+  With PSI available, severity follows stall time: low free memory with
+  no reclaim stalls is at most Moderate.
+  """
+  if stall_percent is not None:
+    if stall_percent >= MEMORY_PRESSURE_HIGH_THRESHOLD:
+      return "High contention", "tasks are stalling on memory reclaim."
+    if stall_percent >= MEMORY_PRESSURE_MODERATE_THRESHOLD:
+      return "Moderate contention", "some tasks are waiting on memory."
+    if available_percent <= MEMORY_MODERATE_THRESHOLD:
+      return "Moderate usage", "memory is full but nothing is stalling."
+    return "Low usage", "memory usage looks healthy."
   if available_percent <= MEMORY_HIGH_THRESHOLD:
     return "High usage", "consider closing unused applications."
   if available_percent <= MEMORY_MODERATE_THRESHOLD:
@@ -39,9 +76,24 @@ def _memory_status(available_percent: float) -> tuple[str, str]:
   return "Low usage", "memory usage looks healthy."
 
 
-@trace_chain()
-def _cpu_status(usage_percent: float) -> tuple[str, str]:
-  """Return CPU status label and guidance."""
+@trace_chain(aggregate=True)
+def _cpu_status(
+  usage_percent: float,
+  stall_percent: float | None = None,
+) -> tuple[str, str]:
+  """Return CPU status label and guidance.
+
+  With PSI available, severity follows run-queue stalls: a busy CPU
+  that no task is waiting for is at most Moderate.
+  """
+  if stall_percent is not None:
+    if stall_percent >= CPU_PRESSURE_HIGH_THRESHOLD:
+      return "High contention", "tasks are waiting for CPU time."
+    if stall_percent >= CPU_PRESSURE_MODERATE_THRESHOLD:
+      return "Moderate contention", "some tasks are waiting for CPU."
+    if usage_percent >= CPU_MODERATE_THRESHOLD:
+      return "Moderate usage", "busy, but no tasks are waiting for CPU."
+    return "Low usage", "CPU load looks healthy."
   if usage_percent >= CPU_HIGH_THRESHOLD:
     return "High usage", "consider closing heavy tasks."
   if usage_percent >= CPU_MODERATE_THRESHOLD:
@@ -49,34 +101,71 @@ def _cpu_status(usage_percent: float) -> tuple[str, str]:
   return "Low usage", "CPU load looks healthy."
 
 
-@trace_chain()
-def _disk_status(drives: list[dict[str, Any]]) -> tuple[str, str]:
-  """Return disk status label and guidance."""
+@trace_chain(aggregate=True)
+def _disk_status(
+  drives: list[dict[str, Any]],
+  stall_percent: float | None = None,
+) -> tuple[str, str]:
+  """Return disk status label and guidance.
+
+  Space and I/O stalls are independent, so I/O pressure can only raise
+  the status derived from the fullest drive.
+  """
   highest_usage = 0
   for drive in drives:
     highest_usage = max(highest_usage, drive.get("used_percent", 0))
 
   if highest_usage >= DISK_HIGH_THRESHOLD:
     return "High usage", "free up disk space soon."
+  if stall_percent is not None:
+    if stall_percent >= IO_PRESSURE_HIGH_THRESHOLD:
+      return "High contention", "tasks are stalling on disk I/O."
   if highest_usage >= DISK_MODERATE_THRESHOLD:
     return "Moderate usage", "consider cleaning up unused files."
+  if stall_percent is not None:
+    if stall_percent >= IO_PRESSURE_MODERATE_THRESHOLD:
+      return "Moderate contention", "some tasks are waiting on disk I/O."
   return "Low usage", "disk usage looks healthy."
 
 
-@trace_chain()
+@trace_chain(aggregate=True)
 def _overall_status(statuses: list[str]) -> str:
   """Return overall status based on section statuses."""
-  if "High" in statuses:
+  if any(status.startswith("High") for status in statuses):
     return HIGH_LOAD_LABEL
-  if "Moderate" in statuses:
+  if any(status.startswith("Moderate") for status in statuses):
     return MODERATE_LOAD_LABEL
   return LOW_LOAD_LABEL
 
 
+@trace_chain(aggregate=True)
+def _pressure_line(stats: dict[str, Any]) -> str:
+  """Render the PSI "some" averages for a section."""
+  some = (stats.get("pressure") or {}).get("some")
+  if not some:
+    return "- Stalled: Not available"
+  return (
+    f"- Stalled: {some['avg10']}% / {some['avg60']}% / "
+    f"{some['avg300']}% (10 s / 1 min / 5 min)"
+  )
+
+
+@trace_chain(aggregate=True)
+def _missing_note(label: str, stats: dict[str, Any] | None) -> str:
+  """Return the note for a section without usable stats."""
+  reason = (stats or {}).get("stats_reason")
+  if reason:
+    return f"{label} stats unavailable: {reason}."
+  return f"{label} stats unavailable."
+
+
 @trace_chain()
 def _format_memory_section(memory_stats: dict[str, Any]) -> SectionResult:
   """Render the memory section and return its status label."""
-  status_label, guidance = _memory_status(memory_stats["available_percent"])
+  status_label, guidance = _memory_status(
+    memory_stats["available_percent"],
+    some_avg10(memory_stats),
+  )
   lines = [
     "\U0001F9E0 Memory:",
     f"- Total RAM: {memory_stats['total_gb']} GB",
@@ -84,6 +173,7 @@ def _format_memory_section(memory_stats: dict[str, Any]) -> SectionResult:
       f"- Available: {memory_stats['available_gb']} GB "
       f"({memory_stats['available_percent']}%)"
     ),
+    _pressure_line(memory_stats),
     f"- Status: {status_label} – {guidance}",
   ]
   return "\n".join(lines), status_label
@@ -92,7 +182,10 @@ def _format_memory_section(memory_stats: dict[str, Any]) -> SectionResult:
 @trace_chain()
 def _format_cpu_section(cpu_stats: dict[str, Any]) -> SectionNotesResult:
   """Render the CPU section and return its status and notes."""
-  status_label, guidance = _cpu_status(cpu_stats["usage_percent"])
+  status_label, guidance = _cpu_status(
+    cpu_stats["usage_percent"],
+    some_avg10(cpu_stats),
+  )
   notes = []
 
   top_process_line = "- Top process: Not available"
@@ -122,6 +215,7 @@ def _format_cpu_section(cpu_stats: dict[str, Any]) -> SectionNotesResult:
     f"- Highest core: {round(highest_core, 2)}%",
     top_process_line,
     temperature_line,
+    _pressure_line(cpu_stats),
     f"- Status: {status_label} – {guidance}",
   ]
   return "\n".join(lines), status_label, notes
@@ -131,7 +225,7 @@ def _format_cpu_section(cpu_stats: dict[str, Any]) -> SectionNotesResult:
 def _format_disk_section(disk_stats: dict[str, Any]) -> SectionNotesResult:
   """Render the disk section and return its status and notes."""
   drives = disk_stats.get("drives", [])
-  status_label, guidance = _disk_status(drives)
+  status_label, guidance = _disk_status(drives, some_avg10(disk_stats))
   notes = []
 
   drive_lines = []
@@ -145,6 +239,8 @@ def _format_disk_section(disk_stats: dict[str, Any]) -> SectionNotesResult:
 
   if not drive_lines:
     drive_lines.append("- No drive usage data available.")
+  if disk_stats.get("drives_reason"):
+    notes.append(disk_stats["drives_reason"])
 
   throughput_line = "- Read/Write: Not available"
   if disk_stats.get("read_mb_s") is not None:
@@ -163,11 +259,75 @@ def _format_disk_section(disk_stats: dict[str, Any]) -> SectionNotesResult:
     "\U0001F4BE Disk:",
     *drive_lines,
     throughput_line,
+    _pressure_line(disk_stats),
     f"- Status: {status_label} – {guidance}",
   ]
   return "\n".join(lines), status_label, notes
 
 
+@trace_chain()
+def _format_process_section(
+  process_stats: dict[str, Any],
+) -> tuple[str, list[str]]:
+  """Render the busiest process names and users and return notes."""
+  notes = [
+    process_stats[key]
+    for key in (
+      "stats_reason",
+      "process_reason",
+      "cpu_reason",
+      "open_files_reason",
+    )
+    if process_stats.get(key)
+  ]
+  lines = ["\U0001F4CB Processes:"]
+  if process_stats.get("process_count") is None:
+    lines.append("- No process data available.")
+    return "\n".join(lines), notes
+
+  lines.append(
+    (
+      f"- Processes: {process_stats['process_count']} "
+      f"({process_stats['thread_count']} threads, "
+      f"{process_stats['rss_mb']} MB resident)"
+    )
+  )
+  for key, field, label in PROCESS_GROUP_LABELS:
+    for group in process_stats.get(key, []):
+      details = [
+        f"{group['processes']} procs",
+        f"{group['cpu_percent']}% CPU",
+        f"{group['rss_mb']} MB RSS",
+        f"{group['threads']} threads",
+      ]
+      if group.get("open_files") is not None:
+        details.append(f"{group['open_files']} open files")
+      lines.append(f"- {label}: {group[field]} ({', '.join(details)})")
+  return "\n".join(lines), notes
+
+
+@trace_chain()
+def _format_trend_section(window_seconds: float) -> str | None:
+  """Render history trends, or None when there are too few samples."""
+  trends = summarize_trends(window_seconds)
+  lines = []
+  for group, series, label in TREND_LABELS:
+    summary = trends.get(group, {}).get(series)
+    if not summary or summary["count"] < TREND_MIN_SAMPLES:
+      continue
+    lines.append(
+      (
+        f"- {label}: avg {summary['mean']}%, max {summary['max']}%, "
+        f"p95 {summary['p95']}%, {summary['slope_per_minute']:+} pts/min"
+      )
+    )
+
+  if not lines:
+    return None
+  minutes = round(window_seconds / 60, 1)
+  return "\n".join([f"\U0001F4C8 Trends (last {minutes:g} min):", *lines])
+
+
 @trace_tool()
 def generate_summary_report(tool_context: ToolContext) -> dict[str, Any]:
   """Generate a plain-text summary report using collected stats."""
@@ -180,28 +340,38 @@ def generate_summary_report(tool_context: ToolContext) -> dict[str, Any]:
   status_labels = []
 
   sections = []
-  if memory_stats:
+  if memory_stats and not memory_stats.get("stats_reason"):
     section, status_label = _format_memory_section(memory_stats)
     sections.append(section)
     status_labels.append(status_label)
   else:
-    missing_sections.append("Memory stats unavailable.")
+    missing_sections.append(_missing_note("Memory", memory_stats))
 
-  if cpu_stats:
+  if cpu_stats and not cpu_stats.get("stats_reason"):
     section, status_label, cpu_notes = _format_cpu_section(cpu_stats)
     sections.append(section)
     status_labels.append(status_label)
     notes.extend(cpu_notes)
   else:
-    missing_sections.append("CPU stats unavailable.")
+    missing_sections.append(_missing_note("CPU", cpu_stats))
 
-  if disk_stats:
+  if disk_stats and not disk_stats.get("stats_reason"):
     section, status_label, disk_notes = _format_disk_section(disk_stats)
     sections.append(section)
     status_labels.append(status_label)
     notes.extend(disk_notes)
   else:
-    missing_sections.append("Disk stats unavailable.")
+    missing_sections.append(_missing_note("Disk", disk_stats))
+
+  process_stats = tool_context.state.get("process_stats")
+  if process_stats:
+    section, process_notes = _format_process_section(process_stats)
+    sections.append(section)
+    notes.extend(process_notes)
+
+  trend_section = _format_trend_section(DEFAULT_TREND_WINDOW_SECONDS)
+  if trend_section:
+    sections.append(trend_section)
 
   notes.extend(missing_sections)
 
@@ -0,0 +1,55 @@
+"""Metric trend summaries for the OneClickSystemMonitor report."""
+
+from typing import Any
+
+from deployment.observability import trace_chain
+
+from .history import (
+  CORE_SERIES_PREFIX,
+  CPU_GROUP,
+  DISK_GROUP,
+  MEMORY_GROUP,
+  METRIC_HISTORY,
+  MOUNT_SERIES_PREFIX,
+)
+
+DEFAULT_TREND_WINDOW_SECONDS = 300
+TREND_SERIES = (
+  (CPU_GROUP, "usage_percent"),
+  (MEMORY_GROUP, "used_percent"),
+  (MEMORY_GROUP, "swap_used_percent"),
+  (DISK_GROUP, "max_used_percent"),
+  (DISK_GROUP, "read_mb_s"),
+  (DISK_GROUP, "write_mb_s"),
+)
+BREAKDOWN_PREFIXES = {
+  CPU_GROUP: CORE_SERIES_PREFIX,
+  DISK_GROUP: MOUNT_SERIES_PREFIX,
+}
+
+
+@trace_chain()
+def summarize_trends(
+  window_seconds: float,
+  include_breakdown: bool = False,
+) -> dict[str, dict[str, dict[str, Any]]]:
+  """Return window aggregates per group and series."""
+  series_by_group: dict[str, list[str]] = {}
+  for group, series in TREND_SERIES:
+    series_by_group.setdefault(group, []).append(series)
+  if include_breakdown:
+    for group, prefix in BREAKDOWN_PREFIXES.items():
+      series_by_group.setdefault(group, []).extend(
+        name
+        for name in METRIC_HISTORY.series_names(group)
+        if name.startswith(prefix)
+      )
+
+  trends: dict[str, dict[str, dict[str, Any]]] = {}
+  for group, series_names in series_by_group.items():
+    for series in series_names:
+      summary = METRIC_HISTORY.summarize(group, series, window_seconds)
+      if summary is not None:
+        trends.setdefault(group, {})[series] = summary.to_dict()
+  return trends
+
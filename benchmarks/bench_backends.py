@@ -0,0 +1,90 @@
+"""Compare psutil and procfs collector backends per collection.
+
+Usage:
+  python benchmarks/bench_backends.py --iterations 500
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import time
+from typing import Any, Callable
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+sys.path.append(str(ROOT_DIR / "agents"))
+
+import psutil  # noqa: E402
+
+from agents.oneclicksystemmonitor.tools.backends import (  # noqa: E402
+  ProcfsBackend,
+)
+
+
+def _collect_once(backend: Any) -> None:
+  """Run every backend call one tool collection performs."""
+  backend.cpu_percent(interval=None, percpu=True)
+  backend.virtual_memory()
+  backend.swap_memory()
+  backend.disk_io_counters()
+  for partition in backend.disk_partitions(all=False):
+    try:
+      backend.disk_usage(partition.mountpoint)
+    except OSError:
+      continue
+
+
+def _time_per_call(func: Callable[[], Any], iterations: int) -> float:
+  """Return mean microseconds per call."""
+  func()
+  start = time.perf_counter()
+  for _ in range(iterations):
+    func()
+  return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def run(iterations: int) -> dict[str, dict[str, float]]:
+  """Benchmark both backends and return microseconds per operation."""
+  backends = {"psutil": psutil, "procfs": ProcfsBackend()}
+  results: dict[str, dict[str, float]] = {}
+  for name, backend in backends.items():
+    results[name] = {
+      "cpu_percent": _time_per_call(
+        lambda backend=backend: backend.cpu_percent(interval=None, percpu=True),
+        iterations,
+      ),
+      "virtual_memory": _time_per_call(backend.virtual_memory, iterations),
+      "swap_memory": _time_per_call(backend.swap_memory, iterations),
+      "disk_io_counters": _time_per_call(backend.disk_io_counters, iterations),
+      "disk_partitions": _time_per_call(
+        lambda backend=backend: backend.disk_partitions(all=False),
+        iterations,
+      ),
+      "collection": _time_per_call(
+        lambda backend=backend: _collect_once(backend),
+        iterations,
+      ),
+    }
+  return results
+
+
+def main() -> None:
+  """Print a per-operation comparison table."""
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--iterations", type=int, default=500)
+  args = parser.parse_args()
+
+  results = run(args.iterations)
+  operations = list(results["psutil"])
+  print(f"{'operation':<18}{'psutil us':>12}{'procfs us':>12}{'speedup':>10}")
+  for operation in operations:
+    baseline = results["psutil"][operation]
+    fast = results["procfs"][operation]
+    speedup = baseline / fast if fast else float("inf")
+    print(f"{operation:<18}{baseline:>12.1f}{fast:>12.1f}{speedup:>9.1f}x")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,114 @@
+"""Compare the legacy recursive redaction with the iterative Redactor.
+
+Usage:
+  python benchmarks/bench_redaction.py --iterations 20
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+import time
+from typing import Any, Callable
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+sys.path.append(str(ROOT_DIR / "agents"))
+
+from agents.oneclicksystemmonitor.redaction import (  # noqa: E402
+  REDACTED_VALUE,
+  SENSITIVE_KEY_FRAGMENTS,
+  Redactor,
+)
+
+
+def legacy_redact(value: Any, path: list[str], redacted: list[str]) -> Any:
+  """The recursive implementation callbacks.py used before Redactor."""
+  if isinstance(value, dict):
+    sanitized: dict[str, Any] = {}
+    for key, item in value.items():
+      key_text = str(key)
+      lowered = key_text.lower()
+      if any(fragment in lowered for fragment in SENSITIVE_KEY_FRAGMENTS):
+        redacted.append(".".join(path + [key_text]))
+        sanitized[key_text] = REDACTED_VALUE
+      else:
+        sanitized[key_text] = legacy_redact(item, path + [key_text], redacted)
+    return sanitized
+  if isinstance(value, list):
+    return [
+      legacy_redact(item, path + [str(index)], redacted)
+      for index, item in enumerate(value)
+    ]
+  return value
+
+
+def wide_state(width: int) -> dict[str, Any]:
+  """Return a session state with many repeated-shape records."""
+  return {
+    "cpu_stats": {"per_core_percent": [12.5] * 256},
+    "processes": [
+      {
+        "pid": index,
+        "name": f"proc-{index}",
+        "cpu_percent": 0.5,
+        "env": {"PATH": "/usr/bin", "API_TOKEN": "secret", "HOME": "/root"},
+      }
+      for index in range(width)
+    ],
+  }
+
+
+def deep_state(depth: int) -> dict[str, Any]:
+  """Return a state nested depth levels deep."""
+  node: dict[str, Any] = {"password": "x", "value": 1}
+  for level in range(depth):
+    node = {f"level_{level}": node, "sibling": [level] * 4}
+  return node
+
+
+def _mean_ms(func: Callable[[], Any], iterations: int) -> float:
+  """Return mean milliseconds per call."""
+  func()
+  start = time.perf_counter()
+  for _ in range(iterations):
+    func()
+  return (time.perf_counter() - start) / iterations * 1000
+
+
+def run(iterations: int) -> dict[str, dict[str, float]]:
+  """Benchmark both implementations on wide and deep states."""
+  redactor = Redactor()
+  states = {
+    "wide_20k": wide_state(20_000),
+    "deep_800": deep_state(800),
+  }
+  results: dict[str, dict[str, float]] = {}
+  for name, state in states.items():
+    results[name] = {
+      "legacy": _mean_ms(lambda: legacy_redact(state, [], []), iterations),
+      "iterative": _mean_ms(lambda: redactor.redact(state), iterations),
+    }
+  return results
+
+
+def main() -> None:
+  """Print a comparison table."""
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--iterations", type=int, default=20)
+  args = parser.parse_args()
+
+  sys.setrecursionlimit(10_000)
+  results = run(args.iterations)
+  print(f"{'state':<10}{'legacy ms':>12}{'iterative ms':>14}{'speedup':>10}")
+  for name, timings in results.items():
+    speedup = timings["legacy"] / timings["iterative"]
+    print(
+      f"{name:<10}{timings['legacy']:>12.2f}"
+      f"{timings['iterative']:>14.2f}{speedup:>9.1f}x"
+    )
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,295 @@
+"""Check that collectors and summary rendering scale linearly with host size.
+
+Each case runs against benchmarks/fakes.FakePsutil at increasing sizes,
+up to 256 cores, 50k processes, hundreds of mounts, and hundreds of
+in-process fleet hosts. The growth
+exponent between consecutive sizes is log(time ratio) / log(size ratio);
+1.0 is linear. The gate uses the least-squares log-log slope over all
+sizes, which is far less noisy than any single step, and exits 1 when
+it exceeds --max-exponent.
+
+Usage:
+  python benchmarks/bench_scaling.py
+  python benchmarks/bench_scaling.py --only top_process --max-exponent 1.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import math
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+sys.path.append(str(ROOT_DIR / "agents"))
+
+os.environ["SYSTEM_MONITOR_COLLECTOR_BACKEND"] = "psutil"
+os.environ["SYSTEM_MONITOR_BACKGROUND_SAMPLER"] = "0"
+os.environ.pop("SYSTEM_MONITOR_HISTORY_DB", None)
+
+from agents.oneclicksystemmonitor.fleet import (  # noqa: E402
+  FleetCollector,
+  serve_stats,
+)
+from agents.oneclicksystemmonitor.tools import (  # noqa: E402
+  collect_cpu_stats,
+  collect_disk_stats,
+  collect_memory_stats,
+  cpu_tools,
+  disk_tools,
+  sampling_window,
+  generate_summary_report,
+)
+from agents.oneclicksystemmonitor.tools.history import (  # noqa: E402
+  CPU_GROUP,
+  DISK_GROUP,
+  MEMORY_GROUP,
+  METRIC_HISTORY,
+  cpu_history_values,
+  disk_history_values,
+  memory_history_values,
+)
+from agents.oneclicksystemmonitor.tools.process_snapshot import (  # noqa: E402
+  ProcessScanner,
+)
+from benchmarks.fakes import (  # noqa: E402
+  FakePsutil,
+  install_fake_psutil,
+  write_fake_proc_tree,
+)
+
+DEFAULT_MAX_EXPONENT = 1.3
+TARGET_SECONDS_PER_SIZE = 0.3
+HISTORY_SAMPLES = 300
+BENCH_SAMPLING_WINDOW = 0.0001
+FLEET_CONCURRENCY = 32
+# Synthetic /proc trees and fake fleet hosts live until the run exits.
+_PROC_TREES: list[tempfile.TemporaryDirectory] = []
+_FLEET_SERVERS: list[Any] = []
+
+# Setup takes a size and returns the zero-argument callable to time.
+ScalingCase = tuple[str, tuple[int, ...], Callable[[int], Callable[[], Any]]]
+
+
+class _Context:
+  """ToolContext stand-in."""
+
+  def __init__(self) -> None:
+    self.state: dict[str, Any] = {}
+
+
+def _top_process(processes: int) -> Callable[[], Any]:
+  """Rank processes on a host with 1% PID churn per refresh."""
+  install_fake_psutil(FakePsutil(processes=processes, churn=0.01))
+  cpu_tools._PROCESS_TABLE.prime()
+  return cpu_tools._get_top_process
+
+
+def _drive_usage(mounts: int) -> Callable[[], Any]:
+  """Walk real, pseudo, bind, and unreadable mounts."""
+  install_fake_psutil(
+    FakePsutil(
+      mounts=mounts,
+      pseudo_mounts=mounts // 2,
+      bind_mounts=mounts // 4,
+      unreadable_mounts=mounts // 10,
+    )
+  )
+  return disk_tools._get_drive_usage
+
+
+def _process_snapshot(
+  processes: int,
+  churn: bool = False,
+) -> Callable[[], Any]:
+  """Refresh a synthetic /proc table and aggregate by name and by user.
+
+  The first, full walk runs during setup. With churn, loadavg changes
+  before every walk, as on a host that forks between collections, so
+  each walk also lists every pid.
+  """
+  tree = tempfile.TemporaryDirectory(prefix="bench-proc-")
+  _PROC_TREES.append(tree)
+  write_fake_proc_tree(tree.name, processes)
+  scanner = ProcessScanner(tree.name)
+  scanner.scan()
+  loadavg = Path(tree.name) / "loadavg"
+  forks = [processes]
+
+  def walk_and_aggregate() -> Any:
+    if churn:
+      forks[0] += 1
+      loadavg.write_text(f"0.50 0.40 0.30 1/{processes} {forks[0]}\n")
+    snapshot = scanner.scan()
+    return snapshot.group_totals(), snapshot.group_totals(by_user=True)
+
+  return walk_and_aggregate
+
+
+def _process_snapshot_churn(processes: int) -> Callable[[], Any]:
+  """Refresh the process table when the pid set may have changed."""
+  return _process_snapshot(processes, churn=True)
+
+
+class _FleetHost:
+  """Stats source that serves one fixed collection."""
+
+  def __init__(self, state: dict[str, Any]) -> None:
+    self.state = state
+
+  def snapshot(self) -> tuple[dict[str, Any], float]:
+    return self.state, 1.0
+
+
+def _fleet_poll(hosts: int) -> Callable[[], Any]:
+  """Poll that many in-process stats endpoints over reused connections."""
+  install_fake_psutil(FakePsutil(cores=8, mounts=8))
+  context = _Context()
+  collect_cpu_stats(context)
+  collect_memory_stats(context)
+  asyncio.run(collect_disk_stats(context))
+  source = _FleetHost(context.state)
+  addresses = []
+  for index in range(hosts):
+    server = serve_stats(0, source=source, host_name=f"host-{index}")
+    _FLEET_SERVERS.append(server)
+    addresses.append(f"127.0.0.1:{server.server_address[1]}")
+  poller = FleetCollector(addresses, concurrency=FLEET_CONCURRENCY)
+  loop = asyncio.new_event_loop()
+  loop.run_until_complete(poller.poll())
+  return lambda: loop.run_until_complete(poller.poll())
+
+
+def _cpu_stats(cores: int) -> Callable[[], Any]:
+  """Run the full CPU collector, which also records per-core history."""
+  install_fake_psutil(FakePsutil(cores=cores, processes=1000))
+  cpu_tools._PROCESS_TABLE.prime()
+  METRIC_HISTORY.clear()
+  context = _Context()
+  return lambda: collect_cpu_stats(context)
+
+
+def _summary_report(size: int) -> Callable[[], Any]:
+  """Render a summary for size cores and size mounts with full history."""
+  install_fake_psutil(FakePsutil(cores=size, mounts=size))
+  context = _Context()
+  collect_cpu_stats(context)
+  collect_memory_stats(context)
+  asyncio.run(collect_disk_stats(context))
+  state = context.state
+  METRIC_HISTORY.clear()
+  now = METRIC_HISTORY.now()
+  rows = (
+    (CPU_GROUP, cpu_history_values(state["cpu_stats"])),
+    (MEMORY_GROUP, memory_history_values(state["memory_stats"])),
+    (DISK_GROUP, disk_history_values(state["disk_stats"])),
+  )
+  for offset in range(HISTORY_SAMPLES, 0, -1):
+    for group, values in rows:
+      METRIC_HISTORY.record(group, values, now - offset)
+  return lambda: generate_summary_report(context)
+
+
+CASES: tuple[ScalingCase, ...] = (
+  ("top_process", (1_000, 5_000, 20_000, 50_000), _top_process),
+  ("drive_usage", (10, 50, 200, 500), _drive_usage),
+  ("process_snapshot", (1_000, 5_000, 20_000, 50_000), _process_snapshot),
+  (
+    "process_snapshot_churn",
+    (1_000, 5_000, 20_000, 50_000),
+    _process_snapshot_churn,
+  ),
+  ("collect_cpu_stats", (8, 32, 128, 256), _cpu_stats),
+  ("fleet_poll", (25, 50, 100, 200), _fleet_poll),
+  ("summary_report", (8, 64, 256, 512), _summary_report),
+)
+
+
+def _seconds_per_call(func: Callable[[], Any], repeats: int) -> float:
+  """Return the best mean seconds per call across repeats."""
+  start = time.perf_counter()
+  func()
+  first = max(time.perf_counter() - start, 1e-7)
+  iterations = max(int(TARGET_SECONDS_PER_SIZE / repeats / first), 1)
+  best = math.inf
+  for _ in range(repeats):
+    gc.collect()
+    gc.disable()
+    try:
+      start = time.perf_counter()
+      for _ in range(iterations):
+        func()
+      elapsed = time.perf_counter() - start
+    finally:
+      gc.enable()
+    best = min(best, elapsed / iterations)
+  return best
+
+
+def growth_exponents(
+  sizes: tuple[int, ...],
+  timings: list[float],
+) -> list[float]:
+  """Return the log-log slope between each pair of consecutive sizes."""
+  return [
+    math.log(timings[index + 1] / timings[index])
+    / math.log(sizes[index + 1] / sizes[index])
+    for index in range(len(sizes) - 1)
+  ]
+
+
+def fitted_exponent(sizes: tuple[int, ...], timings: list[float]) -> float:
+  """Return the least-squares slope of log(time) against log(size)."""
+  xs = [math.log(size) for size in sizes]
+  ys = [math.log(seconds) for seconds in timings]
+  mean_x = sum(xs) / len(xs)
+  mean_y = sum(ys) / len(ys)
+  numerator = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys))
+  denominator = sum((x - mean_x) ** 2 for x in xs)
+  return numerator / denominator
+
+
+def main() -> int:
+  """Print timings and exponents per case; fail on super-linear growth."""
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--repeats", type=int, default=3)
+  parser.add_argument(
+    "--max-exponent",
+    type=float,
+    default=DEFAULT_MAX_EXPONENT,
+  )
+  parser.add_argument("--only", action="append")
+  args = parser.parse_args()
+
+  sampling_window.SAMPLING_WINDOW_SECONDS = BENCH_SAMPLING_WINDOW
+  failures = []
+  for name, sizes, setup in CASES:
+    if args.only and not any(pattern in name for pattern in args.only):
+      continue
+    timings = [_seconds_per_call(setup(size), args.repeats) for size in sizes]
+    exponents = growth_exponents(sizes, timings)
+    fitted = fitted_exponent(sizes, timings)
+    print(f"{name} (fitted exponent {fitted:.2f})")
+    for index, (size, seconds) in enumerate(zip(sizes, timings)):
+      exponent = f"{exponents[index - 1]:>8.2f}" if index else f"{'':>8}"
+      print(f"  {size:>8}{seconds * 1_000_000:>14.1f} us{exponent}")
+    if fitted > args.max_exponent:
+      failures.append(f"{name}: fitted growth exponent {fitted:.2f}")
+
+  if failures:
+    print(f"Super-linear beyond {args.max_exponent}:")
+    for failure in failures:
+      print(f"  {failure}")
+    return 1
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,86 @@
+"""Measure cold import time of the agent package with tracing on and off.
+
+Each sample is a fresh interpreter that imports oneclicksystemmonitor.
+The "on" mode sets placeholder Arize credentials; nothing is exported
+because no span is produced during import.
+
+Usage:
+  python benchmarks/bench_startup.py --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ("arize.otel", "openinference.instrumentation.google_adk")
+TRACING_ENV = {
+  "ARIZE_SPACE_ID": "bench-space",
+  "ARIZE_API_KEY": "bench-key",
+  "ARIZE_PROJECT_NAME": "bench-project",
+}
+_CHILD_SCRIPT = f"""
+import json, sys, time
+start = time.perf_counter()
+import oneclicksystemmonitor
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+  "ms": elapsed * 1000,
+  "heavy": [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+
+def _sample(tracing: bool) -> dict:
+  """Import the package once in a fresh interpreter."""
+  env = {
+    key: value
+    for key, value in os.environ.items()
+    if not key.startswith("ARIZE_")
+  }
+  if tracing:
+    env.update(TRACING_ENV)
+  output = subprocess.run(
+    [sys.executable, "-c", _CHILD_SCRIPT],
+    check=True,
+    capture_output=True,
+    cwd=ROOT_DIR / "agents",
+    env=env,
+    text=True,
+  ).stdout
+  return json.loads(output.strip().splitlines()[-1])
+
+
+def run(runs: int) -> dict[str, dict]:
+  """Return median import time and heavy modules per mode."""
+  results = {}
+  for mode, tracing in (("off", False), ("on", True)):
+    samples = [_sample(tracing) for _ in range(runs)]
+    results[mode] = {
+      "median_ms": statistics.median(sample["ms"] for sample in samples),
+      "heavy_modules": samples[-1]["heavy"],
+    }
+  return results
+
+
+def main() -> None:
+  """Print import time per tracing mode."""
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--runs", type=int, default=5)
+  args = parser.parse_args()
+
+  results = run(args.runs)
+  print(f"{'tracing':<9}{'median ms':>11}  heavy modules imported")
+  for mode, stats in results.items():
+    heavy = ", ".join(stats["heavy_modules"]) or "none"
+    print(f"{mode:<9}{stats['median_ms']:>11.1f}  {heavy}")
+
+
+if __name__ == "__main__":
+  main()
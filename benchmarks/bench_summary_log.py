@@ -0,0 +1,91 @@
+"""Compare per-call latency of synchronous and batched JSONL logging.
+
+Usage:
+  python benchmarks/bench_summary_log.py --iterations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+sys.path.append(str(ROOT_DIR / "agents"))
+
+from agents.oneclicksystemmonitor.log_writer import (  # noqa: E402
+  BatchedJsonlWriter,
+)
+
+PAYLOAD: dict[str, Any] = {
+  "schema_version": "summary-input-v1",
+  "metrics": {
+    "cpu_stats": {"usage_percent": 42.0, "per_core_percent": [40.0] * 16},
+    "memory_stats": {"used_percent": 61.0, "available_percent": 39.0},
+    "disk_stats": {
+      "drives": [
+        {"mount": f"/mnt/{index}", "used_percent": 50.0}
+        for index in range(8)
+      ],
+    },
+  },
+}
+
+
+def _write_sync(path: Path, payload: dict[str, Any]) -> None:
+  """Write one record the way the callback used to."""
+  path.parent.mkdir(parents=True, exist_ok=True)
+  with path.open("a", encoding="utf-8") as handle:
+    handle.write(json.dumps(payload, ensure_ascii=True, default=str) + "\n")
+
+
+def _latencies(func: Callable[[], Any], iterations: int) -> list[float]:
+  """Return per-call latencies in microseconds."""
+  samples = []
+  for _ in range(iterations):
+    start = time.perf_counter()
+    func()
+    samples.append((time.perf_counter() - start) * 1_000_000)
+  return samples
+
+
+def run(iterations: int) -> dict[str, dict[str, float]]:
+  """Return p50/p99 latency per logging strategy."""
+  results: dict[str, dict[str, float]] = {}
+  with tempfile.TemporaryDirectory() as tmp_dir:
+    sync_path = Path(tmp_dir) / "sync.jsonl"
+    writer = BatchedJsonlWriter(Path(tmp_dir) / "batched.jsonl")
+    strategies = {
+      "sync": lambda: _write_sync(sync_path, PAYLOAD),
+      "batched": lambda: writer.write(PAYLOAD),
+    }
+    for name, func in strategies.items():
+      samples = sorted(_latencies(func, iterations))
+      results[name] = {
+        "p50_us": statistics.median(samples),
+        "p99_us": samples[int(len(samples) * 0.99) - 1],
+      }
+    writer.close()
+  return results
+
+
+def main() -> None:
+  """Print latency percentiles for both strategies."""
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--iterations", type=int, default=2000)
+  args = parser.parse_args()
+
+  results = run(args.iterations)
+  print(f"{'strategy':<10}{'p50 us':>10}{'p99 us':>10}")
+  for name, stats in results.items():
+    print(f"{name:<10}{stats['p50_us']:>10.1f}{stats['p99_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+  main()
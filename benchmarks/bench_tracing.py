@@ -0,0 +1,162 @@
+"""Measure tracing overhead on a full generate_summary_report run.
+
+All modes run in one interpreter: span decorators bind their tracing
+policy lazily, so each mode sets its environment and calls
+rebind_tracing(). Spans go to an in-memory exporter, so no Arize
+credentials or network access are needed.
+
+Usage:
+  python benchmarks/bench_tracing.py --iterations 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+import sys
+import time
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+sys.path.append(str(ROOT_DIR / "agents"))
+
+MODES: dict[str, dict[str, str] | None] = {
+  "off": None,
+  "full_spans": {"OBSERVABILITY_TRACE_AGGREGATION": "0"},
+  "aggregated": {},
+  "sampled_10pct": {"OBSERVABILITY_TRACE_SAMPLE_RATE": "0.1"},
+}
+
+STATE: dict[str, Any] = {
+  "memory_stats": {
+    "total_gb": 32.0,
+    "available_gb": 12.0,
+    "available_percent": 37.5,
+    "used_percent": 62.5,
+    "cache_gb": 2.0,
+    "cache_reason": None,
+    "swap_total_gb": 8.0,
+    "swap_used_gb": 1.0,
+    "swap_used_percent": 12.5,
+  },
+  "cpu_stats": {
+    "usage_percent": 55.0,
+    "per_core_percent": [55.0] * 16,
+    "top_process": {"name": "python", "cpu_percent": 20.0},
+    "top_process_reason": None,
+    "temperature_c": 60.0,
+    "temperature_reason": None,
+  },
+  "disk_stats": {
+    "drives": [
+      {
+        "mount": f"/mnt/{index}",
+        "total_gb": 500.0,
+        "free_gb": 100.0,
+        "used_percent": 80.0,
+      }
+      for index in range(8)
+    ],
+    "read_mb_s": 10.0,
+    "write_mb_s": 5.0,
+    "throughput_reason": None,
+    "fragmentation_percent": None,
+    "fragmentation_reason": "Disk fragmentation not available.",
+  },
+}
+
+
+class _Context:
+  """Minimal ToolContext stand-in."""
+
+  def __init__(self) -> None:
+    self.state = dict(STATE)
+
+
+def _install_tracer() -> Any:
+  """Point observability at an in-memory OpenInference tracer."""
+  from openinference.instrumentation import TracerProvider
+  from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+  from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+    InMemorySpanExporter,
+  )
+
+  from deployment import observability
+
+  exporter = InMemorySpanExporter()
+  provider = TracerProvider()
+  provider.add_span_processor(SimpleSpanProcessor(exporter))
+  observability._TRACER_PROVIDER = provider
+  return exporter
+
+
+def _apply_mode(mode: str) -> Any:
+  """Set one mode's environment and tracer, then rebind decorators."""
+  from deployment import observability
+
+  for key in list(os.environ):
+    if key.startswith(("ARIZE_", "OBSERVABILITY_TRACE_")):
+      del os.environ[key]
+  os.environ.update(MODES[mode] or {})
+  exporter = None
+  observability._TRACER_PROVIDER = None
+  if MODES[mode] is not None:
+    exporter = _install_tracer()
+  observability._ARIZE_CONFIGURED = True
+  observability.rebind_tracing()
+  return exporter
+
+
+def run_mode(mode: str, iterations: int) -> dict[str, float]:
+  """Time generate_summary_report under one tracing mode."""
+  exporter = _apply_mode(mode)
+
+  from agents.oneclicksystemmonitor.tools.summary_tools import (
+    generate_summary_report,
+  )
+
+  generate_summary_report(_Context())
+  if exporter is not None:
+    exporter.clear()
+  start = time.perf_counter()
+  for _ in range(iterations):
+    generate_summary_report(_Context())
+  elapsed = time.perf_counter() - start
+  spans = len(exporter.get_finished_spans()) if exporter else 0
+  return {
+    "us_per_report": elapsed / iterations * 1_000_000,
+    "spans_per_report": spans / iterations,
+  }
+
+
+def run(iterations: int) -> dict[str, dict[str, float]]:
+  """Run every mode and restore the environment afterwards."""
+  saved = dict(os.environ)
+  try:
+    return {mode: run_mode(mode, iterations) for mode in MODES}
+  finally:
+    os.environ.clear()
+    os.environ.update(saved)
+
+
+def main() -> None:
+  """Print per-report latency and span counts for each tracing mode."""
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--iterations", type=int, default=2000)
+  args = parser.parse_args()
+
+  results = run(args.iterations)
+  baseline = results["off"]["us_per_report"]
+  print(f"{'mode':<15}{'us/report':>12}{'spans':>8}{'overhead':>11}")
+  for mode, stats in results.items():
+    overhead = stats["us_per_report"] - baseline
+    print(
+      f"{mode:<15}{stats['us_per_report']:>12.1f}"
+      f"{stats['spans_per_report']:>8.1f}{overhead:>10.1f}us"
+    )
+
+
+if __name__ == "__main__":
+  main()
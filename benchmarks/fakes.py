@@ -0,0 +1,310 @@
+"""Deterministic, scalable psutil stand-in for offline benchmarks.
+
+FakePsutil answers every call the collectors make from seeded synthetic
+data, so timings measure the tool code rather than the host. It scales
+to very large hosts (hundreds of cores and mounts, tens of thousands of
+processes) and models what such hosts look like: heavy-tailed process
+CPU usage, PID churn between refreshes, pseudo filesystems, overlay and
+bind mounts of the same device, and mounts that refuse statvfs.
+write_fake_proc_tree lays out the same kind of host as a /proc tree for
+collectors that bypass psutil.
+"""
+
+from __future__ import annotations
+
+import os
+import random
+from typing import Any
+
+from agents.oneclicksystemmonitor.tools import (
+  cpu_tools,
+  disk_tools,
+  memory_tools,
+  process_table,
+  sampler,
+  sampling_window,
+)
+from agents.oneclicksystemmonitor.tools.backends import CollectorRecord
+
+GIB = 1024**3
+PATCHED_MODULES = (
+  cpu_tools,
+  disk_tools,
+  memory_tools,
+  process_table,
+  sampler,
+  sampling_window,
+)
+PROCESS_NAMES = (
+  "systemd",
+  "sshd",
+  "python3",
+  "java",
+  "postgres",
+  "nginx",
+  "containerd-shim",
+  "node",
+  "kworker",
+  "bash",
+)
+PSEUDO_FS_TYPES = ("tmpfs", "proc", "sysfs", "cgroup2", "overlay", "squashfs")
+# Share of processes that are busy; the rest idle near 0% like real hosts.
+BUSY_PROCESS_FRACTION = 0.02
+FAKE_UPTIME_SECONDS = 30 * 86_400
+
+
+class Error(Exception):
+  """Mirror of psutil.Error."""
+
+
+class NoSuchProcess(Error):
+  """Mirror of psutil.NoSuchProcess."""
+
+
+class AccessDenied(Error):
+  """Mirror of psutil.AccessDenied."""
+
+
+class ZombieProcess(NoSuchProcess):
+  """Mirror of psutil.ZombieProcess."""
+
+
+class FakeProcess:
+  """Process handle with a fixed name and CPU reading."""
+
+  def __init__(self, pid: int, name: str, cpu_percent: float) -> None:
+    self.pid = pid
+    self._name = name
+    self._cpu_percent = cpu_percent
+
+  def cpu_percent(self, interval: float | None = None) -> float:
+    return self._cpu_percent
+
+  def name(self) -> str:
+    return self._name
+
+
+class FakePsutil:
+  """Seeded synthetic host.
+
+  Args:
+    cores: Logical CPUs reported by cpu_percent(percpu=True).
+    processes: Live PIDs at any time.
+    mounts: Real block-device filesystems.
+    pseudo_mounts: Extra tmpfs/overlay/squashfs-style mounts.
+    bind_mounts: Extra mounts that reuse an existing device.
+    unreadable_mounts: Mounts whose disk_usage raises PermissionError.
+    churn: Fraction of PIDs replaced on every pids() call.
+    seed: Random seed; equal arguments always produce equal hosts.
+  """
+
+  Error = Error
+  NoSuchProcess = NoSuchProcess
+  AccessDenied = AccessDenied
+  ZombieProcess = ZombieProcess
+
+  def __init__(
+    self,
+    cores: int = 8,
+    processes: int = 200,
+    mounts: int = 4,
+    pseudo_mounts: int = 0,
+    bind_mounts: int = 0,
+    unreadable_mounts: int = 0,
+    churn: float = 0.0,
+    seed: int = 0,
+  ) -> None:
+    self._rng = random.Random(seed)
+    self._per_core = [
+      round(self._rng.uniform(5, 95), 1) for _ in range(cores)
+    ]
+    self._cpu_calls = 0
+    self._churn = churn
+    self._next_pid = 1
+    self._processes: dict[int, FakeProcess] = {}
+    for _ in range(processes):
+      self._spawn()
+    self._pids = list(self._processes)
+    self._partitions: list[CollectorRecord] = []
+    self._usage: dict[str, CollectorRecord] = {}
+    self._unreadable: set[str] = set()
+    self._build_mounts(mounts, pseudo_mounts, bind_mounts, unreadable_mounts)
+    self._disk_reads = 0
+
+  def _spawn(self) -> None:
+    """Add one process with a heavy-tailed CPU reading."""
+    rng = self._rng
+    pid = self._next_pid
+    self._next_pid += 1
+    if rng.random() < BUSY_PROCESS_FRACTION:
+      cpu_percent = round(rng.uniform(5, 100), 2)
+    else:
+      cpu_percent = round(rng.expovariate(10), 2)
+    name = PROCESS_NAMES[rng.randrange(len(PROCESS_NAMES))]
+    self._processes[pid] = FakeProcess(pid, name, cpu_percent)
+
+  def _add_mount(
+    self,
+    device: str,
+    mountpoint: str,
+    fstype: str,
+    total: int,
+  ) -> None:
+    """Register one partition and its usage."""
+    used = int(self._rng.uniform(0.05, 0.97) * total)
+    self._partitions.append(
+      CollectorRecord(
+        device=device,
+        mountpoint=mountpoint,
+        fstype=fstype,
+        opts="rw",
+      )
+    )
+    self._usage[mountpoint] = CollectorRecord(
+      total=total,
+      used=used,
+      free=total - used,
+      percent=round(used / total * 100, 1) if total else 0.0,
+    )
+
+  def _build_mounts(
+    self,
+    mounts: int,
+    pseudo_mounts: int,
+    bind_mounts: int,
+    unreadable_mounts: int,
+  ) -> None:
+    """Lay out real, pseudo, bind, and unreadable mounts."""
+    rng = self._rng
+    for index in range(mounts):
+      mountpoint = "/" if index == 0 else f"/mnt/data{index}"
+      size = rng.choice((100, 500, 2000, 8000)) * GIB
+      fstype = "ext4" if index % 3 else "xfs"
+      self._add_mount(f"/dev/sd{index}", mountpoint, fstype, size)
+    for index in range(pseudo_mounts):
+      fstype = PSEUDO_FS_TYPES[index % len(PSEUDO_FS_TYPES)]
+      self._add_mount(
+        fstype,
+        f"/run/{fstype}/{index}",
+        fstype,
+        rng.choice((0, 64, 512)) * 1024**2,
+      )
+    for index in range(bind_mounts):
+      source = self._partitions[index % max(mounts, 1)]
+      mountpoint = f"/var/lib/bind{index}"
+      self._partitions.append(
+        CollectorRecord(
+          device=source.device,
+          mountpoint=mountpoint,
+          fstype=source.fstype,
+          opts="rw,bind",
+        )
+      )
+      self._usage[mountpoint] = self._usage[source.mountpoint]
+    for index in range(unreadable_mounts):
+      mountpoint = f"/srv/locked{index}"
+      self._add_mount(f"/dev/nvme{index}n1", mountpoint, "ext4", 100 * GIB)
+      self._unreadable.add(mountpoint)
+
+  def cpu_percent(
+    self,
+    interval: float | None = None,
+    percpu: bool = False,
+  ) -> Any:
+    # Rotate readings so consecutive calls differ but stay reproducible.
+    self._cpu_calls += 1
+    shift = self._cpu_calls % len(self._per_core)
+    per_core = self._per_core[shift:] + self._per_core[:shift]
+    if percpu:
+      return per_core
+    return sum(per_core) / len(per_core)
+
+  def virtual_memory(self) -> CollectorRecord:
+    return CollectorRecord(
+      total=64 * GIB,
+      available=24 * GIB,
+      percent=62.5,
+      used=40 * GIB,
+      free=8 * GIB,
+      cached=10 * GIB,
+    )
+
+  def swap_memory(self) -> CollectorRecord:
+    return CollectorRecord(total=8 * GIB, used=GIB, free=7 * GIB, percent=12.5)
+
+  def disk_partitions(
+    self,
+    all: bool = False,  # noqa: A002
+  ) -> list[CollectorRecord]:
+    return list(self._partitions)
+
+  def disk_usage(self, path: str) -> CollectorRecord:
+    if path in self._unreadable:
+      raise PermissionError(path)
+    return self._usage[path]
+
+  def disk_io_counters(self) -> CollectorRecord:
+    self._disk_reads += 1
+    return CollectorRecord(
+      read_bytes=self._disk_reads * 4 * 1024**2,
+      write_bytes=self._disk_reads * 2 * 1024**2,
+    )
+
+  def sensors_temperatures(self, fahrenheit: bool = False) -> dict[str, Any]:
+    return {"coretemp": [CollectorRecord(label="Package", current=61.0)]}
+
+  def pids(self) -> list[int]:
+    replaced = int(len(self._pids) * self._churn)
+    if replaced:
+      for pid in self._rng.sample(self._pids, replaced):
+        del self._processes[pid]
+      for _ in range(replaced):
+        self._spawn()
+      self._pids = list(self._processes)
+    return self._pids
+
+  def Process(self, pid: int) -> FakeProcess:  # noqa: N802
+    try:
+      return self._processes[pid]
+    except KeyError:
+      raise NoSuchProcess(pid) from None
+
+
+def write_fake_proc_tree(root: str, processes: int, seed: int = 0) -> None:
+  """Write a /proc-shaped tree of stat files and fd directories.
+
+  The tree also has loadavg and uptime files, as a 30-day-old host with
+  an unchanging process set would.
+
+  Args:
+    root: Empty directory to populate, used as ProcessScanner's root.
+    processes: Number of /proc/<pid> directories.
+    seed: Random seed for names, CPU times, threads, and RSS.
+  """
+  rng = random.Random(seed)
+  with open(os.path.join(root, "loadavg"), "w", encoding="ascii") as handle:
+    handle.write(f"0.50 0.40 0.30 1/{processes} {processes}\n")
+  with open(os.path.join(root, "uptime"), "w", encoding="ascii") as handle:
+    handle.write(f"{FAKE_UPTIME_SECONDS:.2f} 0.00\n")
+  for pid in range(1, processes + 1):
+    name = PROCESS_NAMES[rng.randrange(len(PROCESS_NAMES))]
+    utime = rng.randrange(10_000)
+    threads = rng.choice((1, 1, 2, 4, 16))
+    rss_pages = rng.randrange(100, 100_000)
+    base = os.path.join(root, str(pid))
+    os.makedirs(os.path.join(base, "fd"))
+    with open(os.path.join(base, "stat"), "w", encoding="ascii") as handle:
+      handle.write(
+        f"{pid} ({name}) S 1 {pid} {pid} 0 -1 4194560 100 0 0 0 "
+        f"{utime} {utime // 4} 0 0 20 0 {threads} 0 {pid * 10} "
+        f"{rss_pages * 8192} {rss_pages} 18446744073709551615 0 0\n"
+      )
+    for fd in range(rng.randrange(4)):
+      open(os.path.join(base, "fd", str(fd)), "w").close()
+
+
+def install_fake_psutil(fake: FakePsutil) -> None:
+  """Route every collector module's psutil calls to fake."""
+  for module in PATCHED_MODULES:
+    module.psutil = fake
+  cpu_tools._PROCESS_TABLE = process_table.ProcessTable()
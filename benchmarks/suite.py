@@ -0,0 +1,272 @@
+"""Offline micro-benchmarks for collectors, summary rendering, and callbacks.
+
+Collectors run against benchmarks/fakes.FakePsutil, so results depend on
+the code under test rather than on the host. Results are written as JSON;
+with --baseline, the run fails when any case is slower than the baseline
+by more than --threshold.
+
+Usage:
+  python benchmarks/suite.py --output results.json
+  python benchmarks/suite.py --baseline results.json --threshold 0.25
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+from pathlib import Path
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+sys.path.append(str(ROOT_DIR / "agents"))
+
+_LOG_DIR = tempfile.TemporaryDirectory(prefix="bench-suite-")
+os.environ["SYSTEM_MONITOR_COLLECTOR_BACKEND"] = "psutil"
+os.environ["SYSTEM_MONITOR_BACKGROUND_SAMPLER"] = "0"
+os.environ.pop("SYSTEM_MONITOR_HISTORY_DB", None)
+
+from google.genai import types  # noqa: E402
+
+from agents.oneclicksystemmonitor import callbacks  # noqa: E402
+from agents.oneclicksystemmonitor.log_writer import (  # noqa: E402
+  close_jsonl_writers,
+  flush_jsonl_writers,
+)
+from agents.oneclicksystemmonitor.tools import (  # noqa: E402
+  collect_cpu_stats,
+  collect_disk_stats,
+  collect_memory_stats,
+  generate_summary_report,
+  sampling_window,
+)
+from agents.oneclicksystemmonitor.tools.history import (  # noqa: E402
+  CPU_GROUP,
+  DISK_GROUP,
+  MEMORY_GROUP,
+  METRIC_HISTORY,
+  cpu_history_values,
+  disk_history_values,
+  memory_history_values,
+)
+from benchmarks.fakes import FakePsutil, install_fake_psutil  # noqa: E402
+
+SCHEMA_VERSION = 1
+DEFAULT_THRESHOLD = 0.25
+# Shortens the CPU/disk sampling window so it does not swamp collector cost.
+BENCH_SAMPLING_WINDOW = 0.0001
+# One sample per second for 15 minutes, as a long-running agent would hold.
+HISTORY_FILL_SAMPLES = 900
+
+Case = tuple[Callable[[], None] | None, Callable[[], Any]]
+
+
+class _Context:
+  """ToolContext/CallbackContext stand-in."""
+
+  def __init__(self, state: dict[str, Any] | None = None) -> None:
+    self.state = state if state is not None else {}
+    self.user_content = types.Content(
+      role="user",
+      parts=[types.Part(text="Check system health, api_key=abc")],
+    )
+
+
+def _collected_state() -> dict[str, Any]:
+  """Return a state populated by one pass over the fake host."""
+  context = _Context()
+  collect_cpu_stats(context)
+  collect_memory_stats(context)
+  asyncio.run(collect_disk_stats(context))
+  context.state["session_token"] = "do-not-log"
+  return context.state
+
+
+def _fill_history(state: dict[str, Any]) -> None:
+  """Reset METRIC_HISTORY to a fixed number of recent samples of state."""
+  METRIC_HISTORY.clear()
+  now = METRIC_HISTORY.now()
+  rows = (
+    (CPU_GROUP, cpu_history_values(state["cpu_stats"])),
+    (MEMORY_GROUP, memory_history_values(state["memory_stats"])),
+    (DISK_GROUP, disk_history_values(state["disk_stats"])),
+  )
+  for offset in range(HISTORY_FILL_SAMPLES, 0, -1):
+    for group, values in rows:
+      METRIC_HISTORY.record(group, values, now - offset)
+
+
+def build_cases() -> dict[str, Case]:
+  """Return benchmark name -> (setup or None, zero-argument callable).
+
+  Setup runs once before a case is timed so that state left behind by
+  earlier cases, such as metric history, does not change its cost.
+  """
+  install_fake_psutil(FakePsutil())
+  # Keep capture writes out of the repo while timing the real writer.
+  log_path = Path(_LOG_DIR.name) / "summary_inputs.jsonl"
+  callbacks._resolve_summary_log_path = lambda: log_path
+  sampling_window.SAMPLING_WINDOW_SECONDS = BENCH_SAMPLING_WINDOW
+  loop = asyncio.new_event_loop()
+  state = _collected_state()
+  context = _Context(state)
+  tool_context = _Context()
+
+  def _log_summary_input() -> None:
+    callbacks.log_summary_input_payload(context)
+
+  return {
+    "collect_cpu_stats": (
+      METRIC_HISTORY.clear,
+      lambda: collect_cpu_stats(tool_context),
+    ),
+    "collect_memory_stats": (
+      METRIC_HISTORY.clear,
+      lambda: collect_memory_stats(tool_context),
+    ),
+    "collect_disk_stats": (
+      METRIC_HISTORY.clear,
+      lambda: loop.run_until_complete(collect_disk_stats(tool_context)),
+    ),
+    "generate_summary_report": (
+      lambda: _fill_history(state),
+      lambda: generate_summary_report(context),
+    ),
+    "redact_sensitive": (None, lambda: callbacks._redact_sensitive(state)),
+    "log_summary_input_payload": (None, _log_summary_input),
+  }
+
+
+def measure(
+  func: Callable[[], Any],
+  iterations: int,
+  repeats: int,
+) -> dict[str, float]:
+  """Return per-call microseconds: min and median across repeats.
+
+  The cyclic GC is paused while timing so collections triggered by one
+  case are not billed to another.
+  """
+  for _ in range(max(iterations // 10, 1)):
+    func()
+  samples = []
+  for _ in range(repeats):
+    gc.collect()
+    gc.disable()
+    try:
+      start = time.perf_counter()
+      for _ in range(iterations):
+        func()
+      elapsed = time.perf_counter() - start
+    finally:
+      gc.enable()
+    samples.append(elapsed / iterations * 1_000_000)
+  return {
+    "min_us": round(min(samples), 3),
+    "median_us": round(statistics.median(samples), 3),
+  }
+
+
+def run(
+  iterations: int,
+  repeats: int,
+  selected: list[str] | None = None,
+) -> dict[str, Any]:
+  """Run the suite and return a JSON-friendly result document."""
+  cases = build_cases()
+  results = {}
+  for name, (setup, func) in cases.items():
+    if selected and not any(pattern in name for pattern in selected):
+      continue
+    if setup is not None:
+      setup()
+    results[name] = measure(func, iterations, repeats)
+  flush_jsonl_writers(timeout=10)
+  return {
+    "schema_version": SCHEMA_VERSION,
+    "python": platform.python_version(),
+    "platform": platform.platform(),
+    "iterations": iterations,
+    "repeats": repeats,
+    "results": results,
+  }
+
+
+def find_regressions(
+  current: dict[str, Any],
+  baseline: dict[str, Any],
+  threshold: float,
+) -> list[str]:
+  """Return messages for cases slower than baseline by over threshold.
+
+  Cases are compared on min_us, the least noisy statistic; cases missing
+  from either side are ignored.
+  """
+  messages = []
+  for name, timing in current["results"].items():
+    reference = baseline.get("results", {}).get(name)
+    if not reference or not reference.get("min_us"):
+      continue
+    ratio = timing["min_us"] / reference["min_us"]
+    if ratio > 1 + threshold:
+      messages.append(
+        f"{name}: {timing['min_us']:.1f} us vs {reference['min_us']:.1f} us "
+        f"baseline ({ratio - 1:+.0%})"
+      )
+  return messages
+
+
+def main() -> int:
+  """Run the suite, write JSON, and compare with a baseline."""
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--iterations", type=int, default=200)
+  parser.add_argument("--repeats", type=int, default=5)
+  parser.add_argument("--output", type=Path)
+  parser.add_argument("--baseline", type=Path)
+  parser.add_argument(
+    "--threshold",
+    type=float,
+    default=DEFAULT_THRESHOLD,
+    help="Allowed slowdown as a fraction of the baseline (0.25 = 25%%).",
+  )
+  parser.add_argument(
+    "--only",
+    action="append",
+    help="Run only cases whose name contains this text; repeatable.",
+  )
+  args = parser.parse_args()
+
+  try:
+    document = run(args.iterations, args.repeats, args.only)
+  finally:
+    close_jsonl_writers()
+    _LOG_DIR.cleanup()
+
+  print(f"{'case':<28}{'min us':>12}{'median us':>12}")
+  for name, timing in document["results"].items():
+    print(f"{name:<28}{timing['min_us']:>12.1f}{timing['median_us']:>12.1f}")
+  if args.output:
+    args.output.write_text(json.dumps(document, indent=2) + "\n")
+
+  if args.baseline:
+    baseline = json.loads(args.baseline.read_text())
+    regressions = find_regressions(document, baseline, args.threshold)
+    if regressions:
+      print(f"Regressions beyond {args.threshold:.0%}:")
+      for message in regressions:
+        print(f"  {message}")
+      return 1
+    print(f"No regressions beyond {args.threshold:.0%}.")
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
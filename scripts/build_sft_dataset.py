@@ -0,0 +1,48 @@
+"""Build sharded, labeled SFT files from summary-input capture logs.
+
+Usage:
+  python scripts/build_sft_dataset.py agents/summary_agent_inputs.jsonl \
+    --output-dir build/sft --workers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import sys
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+sys.path.append(str(ROOT_DIR / "agents"))
+
+from agents.oneclicksystemmonitor.sft_dataset import (  # noqa: E402
+  DEFAULT_CHUNK_SIZE,
+  DEFAULT_SHARD_SIZE,
+  build_sft_dataset,
+)
+
+
+def main() -> None:
+  """Run the builder and print its counters as JSON."""
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("sources", nargs="+", type=Path)
+  parser.add_argument("--output-dir", type=Path, required=True)
+  parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+  parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+  parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE)
+  args = parser.parse_args()
+
+  stats = build_sft_dataset(
+    args.sources,
+    args.output_dir,
+    workers=args.workers,
+    chunk_size=args.chunk_size,
+    shard_size=args.shard_size,
+  )
+  print(json.dumps(stats.to_dict(), indent=2))
+
+
+if __name__ == "__main__":
+  main()
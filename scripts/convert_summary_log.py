@@ -0,0 +1,35 @@
+"""Stream-convert a summary-input log to the summary-input-v2 schema.
+
+Usage:
+  python scripts/convert_summary_log.py IN.jsonl OUT.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+import sys
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+sys.path.append(str(ROOT_DIR / "agents"))
+
+from agents.oneclicksystemmonitor.summary_log import (  # noqa: E402
+  SUMMARY_INPUT_SCHEMA_V2,
+  convert_summary_log,
+)
+
+
+def main() -> None:
+  """Convert a v1 (or mixed) summary log to v2."""
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("source", type=Path)
+  parser.add_argument("destination", type=Path)
+  args = parser.parse_args()
+
+  count = convert_summary_log(args.source, args.destination)
+  print(f"Converted {count} records to {SUMMARY_INPUT_SCHEMA_V2}.")
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,86 @@
+"""Poll many hosts' stats endpoints and print a fleet summary.
+
+Usage:
+  python scripts/poll_fleet.py web-1:9109 web-2:9109 db-1:9109
+  python scripts/poll_fleet.py --hosts-file hosts.txt --interval 30
+
+Each host runs scripts/serve_host_metrics.py --stats-port 9109.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+sys.path.append(str(ROOT_DIR / "agents"))
+
+from agents.oneclicksystemmonitor.fleet import (  # noqa: E402
+  DEFAULT_FLEET_TOP_HOSTS,
+  FleetCollector,
+  format_fleet_report,
+  summarize_fleet,
+)
+
+
+async def _run(poller: FleetCollector, interval: float, top: int) -> None:
+  """Poll once, or every interval seconds when interval is positive."""
+  while True:
+    results = await poller.poll()
+    print(format_fleet_report(summarize_fleet(results, top)), flush=True)
+    if interval <= 0:
+      return
+    print()
+    await asyncio.sleep(interval)
+
+
+def main() -> None:
+  """Poll the listed hosts until done or interrupted."""
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("hosts", nargs="*", help="host:port stats endpoints.")
+  parser.add_argument(
+    "--hosts-file",
+    type=Path,
+    help="File with one host:port per line.",
+  )
+  parser.add_argument("--concurrency", type=int, default=None)
+  parser.add_argument(
+    "--timeout-ms",
+    type=float,
+    default=None,
+    help="Per-host deadline, including connecting.",
+  )
+  parser.add_argument(
+    "--interval",
+    type=float,
+    default=0.0,
+    help="Seconds between polls; 0 polls once.",
+  )
+  parser.add_argument("--top", type=int, default=DEFAULT_FLEET_TOP_HOSTS)
+  args = parser.parse_args()
+
+  hosts = list(args.hosts)
+  if args.hosts_file:
+    lines = args.hosts_file.read_text(encoding="utf-8").splitlines()
+    hosts.extend(line.strip() for line in lines if line.strip())
+  if not hosts:
+    parser.error("no hosts given")
+
+  poller = FleetCollector(
+    hosts,
+    concurrency=args.concurrency,
+    timeout=None if args.timeout_ms is None else args.timeout_ms / 1000,
+  )
+  try:
+    asyncio.run(_run(poller, args.interval, args.top))
+  except KeyboardInterrupt:
+    pass
+  finally:
+    poller.close()
+
+
+if __name__ == "__main__":
+  main()
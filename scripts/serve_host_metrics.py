@@ -0,0 +1,66 @@
+"""Serve host CPU, memory, and disk gauges for Prometheus to scrape.
+
+Usage:
+  python scripts/serve_host_metrics.py --port 9108 --interval 15
+  python scripts/serve_host_metrics.py --stats-port 9109
+
+--stats-port also serves the raw collector payloads as JSON at /stats
+for scripts/poll_fleet.py.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+import sys
+import threading
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT_DIR))
+sys.path.append(str(ROOT_DIR / "agents"))
+
+from deployment.metrics import DEFAULT_METRICS_HOST, serve_metrics  # noqa: E402
+from agents.oneclicksystemmonitor.exporter import (  # noqa: E402
+  DEFAULT_EXPORTER_INTERVAL,
+  EXPORTER_INTERVAL_ENV_VAR,
+  start_host_exporter,
+)
+from agents.oneclicksystemmonitor.fleet import serve_stats  # noqa: E402
+
+
+def main() -> None:
+  """Run the exporter until interrupted."""
+  parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+  parser.add_argument("--host", default=DEFAULT_METRICS_HOST)
+  parser.add_argument("--port", type=int, default=9108)
+  parser.add_argument(
+    "--interval",
+    type=float,
+    default=DEFAULT_EXPORTER_INTERVAL,
+    help="Seconds a collected sample is reused across scrapes.",
+  )
+  parser.add_argument(
+    "--stats-port",
+    type=int,
+    default=None,
+    help="Also serve collector payloads as JSON for fleet polling.",
+  )
+  args = parser.parse_args()
+
+  os.environ[EXPORTER_INTERVAL_ENV_VAR] = str(args.interval)
+  host_exporter = start_host_exporter(force=True)
+  servers = [serve_metrics(args.port, args.host)]
+  print(f"Serving http://{args.host}:{servers[0].server_address[1]}/metrics")
+  if args.stats_port is not None:
+    servers.append(serve_stats(args.stats_port, args.host, host_exporter))
+    print(f"Serving http://{args.host}:{servers[1].server_address[1]}/stats")
+  try:
+    threading.Event().wait()
+  except KeyboardInterrupt:
+    for server in servers:
+      server.shutdown()
+
+
+if __name__ == "__main__":
+  main()
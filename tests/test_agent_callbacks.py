@@ -1,8 +1,10 @@
 """Tests for OneClickSystemMonitor agent callbacks."""
 
+import gzip
 import json
 from pathlib import Path
 import sys
+import time
 import types
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -24,8 +26,9 @@ def _install_genai_stubs() -> None:
       self.text = text
 
   class Content:
-    def __init__(self, parts=None) -> None:
+    def __init__(self, parts=None, role: str | None = None) -> None:
       self.parts = parts or []
+      self.role = role
 
   genai_types_module.Part = Part
   genai_types_module.Content = Content
@@ -37,14 +40,84 @@ def _install_genai_stubs() -> None:
   sys.modules["google.genai.types"] = genai_types_module
 
 
+def _install_google_adk_stubs() -> None:
+  """Install minimal google.adk stubs for agent package imports."""
+  google_module = sys.modules["google"]
+  adk_module = types.ModuleType("google.adk")
+  agents_module = types.ModuleType("google.adk.agents")
+  run_config_module = types.ModuleType("google.adk.agents.run_config")
+  models_module = types.ModuleType("google.adk.models")
+  lite_llm_module = types.ModuleType("google.adk.models.lite_llm")
+  tools_module = types.ModuleType("google.adk.tools")
+  events_module = types.ModuleType("google.adk.events")
+
+  class _Stub:
+    def __init__(self, *args, **kwargs) -> None:
+      self.args = args
+      self.kwargs = kwargs
+      self.name = kwargs.get("name")
+
+  class StreamingMode:
+    NONE = "none"
+
+  class LlmResponse:
+    def __init__(self, content=None) -> None:
+      self.content = content
+
+  class EventActions:
+    def __init__(self, state_delta=None) -> None:
+      self.state_delta = state_delta or {}
+
+  agents_module.BaseAgent = _Stub
+  agents_module.LlmAgent = _Stub
+  agents_module.ParallelAgent = _Stub
+  agents_module.SequentialAgent = _Stub
+  run_config_module.RunConfig = _Stub
+  run_config_module.StreamingMode = StreamingMode
+  lite_llm_module.LiteLlm = _Stub
+  models_module.LlmResponse = LlmResponse
+  tools_module.FunctionTool = _Stub
+  tools_module.ToolContext = _Stub
+  events_module.Event = _Stub
+  events_module.EventActions = EventActions
+
+  models_module.lite_llm = lite_llm_module
+  adk_module.agents = agents_module
+  adk_module.models = models_module
+  adk_module.tools = tools_module
+  adk_module.events = events_module
+  google_module.adk = adk_module
+
+  sys.modules["google.adk"] = adk_module
+  sys.modules["google.adk.agents"] = agents_module
+  sys.modules["google.adk.agents.run_config"] = run_config_module
+  sys.modules["google.adk.models"] = models_module
+  sys.modules["google.adk.models.lite_llm"] = lite_llm_module
+  sys.modules["google.adk.tools"] = tools_module
+  sys.modules["google.adk.events"] = events_module
+
+
 _install_genai_stubs()
+_install_google_adk_stubs()
 
 from google.genai import types as genai_types  # noqa: E402
 from agents.oneclicksystemmonitor.callbacks import (  # noqa: E402
+  SEVERITY_DECISIONS,
   log_summary_input_payload,
   only_ram_after_agent_callback,
+  severity_cache_after_model_callback,
+  severity_cache_before_model_callback,
+  severity_fast_path_before_model_callback,
   skip_agent_if_requested,
 )
+from agents.oneclicksystemmonitor import log_writer  # noqa: E402
+from agents.oneclicksystemmonitor import redaction  # noqa: E402
+from agents.oneclicksystemmonitor import severity_cache  # noqa: E402
+from agents.oneclicksystemmonitor import sft_dataset  # noqa: E402
+from agents.oneclicksystemmonitor import summary_log  # noqa: E402
+from agents.oneclicksystemmonitor.severity import (  # noqa: E402
+  calibrate_severity,
+)
 
 
 class DummyCallbackContext:
@@ -125,12 +198,319 @@ def test_log_summary_input_payload_writes_jsonl(monkeypatch):
     result = log_summary_input_payload(context)
 
     assert result is None
+    assert log_writer.flush_jsonl_writers(timeout=5)
     assert log_path.exists()
     payload = json.loads(log_path.read_text(encoding="utf-8").strip())
-    assert payload["schema_version"] == "summary-input-v1"
+    assert payload["schema_version"] == "summary-input-v2"
     assert payload["user_request"] == "Full report please"
     assert payload["metrics"]["cpu_stats"]["usage_percent"] == 12.5
-    assert payload["state"]["api_key"] == "[REDACTED]"
+    assert payload["state"] == {"api_key": "[REDACTED]"}
+    decoded = summary_log.decode_summary_record(payload)
+    assert decoded["state"]["cpu_stats"] == {"usage_percent": 12.5}
   finally:
     if log_path.exists():
       log_path.unlink()
+
+
+def test_redactor_masks_nested_keys_and_caps_sizes():
+  deep: dict = {"leaf": 1}
+  for _ in range(5000):
+    deep = {"child": deep}
+  state = {
+    "config": {"DB_Password": "hunter2", "hosts": [{"apiKey": "k"}]},
+    "notes": "x" * 50,
+    "samples": list(range(10)),
+    "deep": deep,
+  }
+
+  plain, plain_paths = redaction.Redactor().redact(state)
+  capped, _ = redaction.Redactor(max_string_length=8, max_items=3).redact(
+    state
+  )
+
+  assert plain_paths == ["config.DB_Password", "config.hosts.0.apiKey"]
+  assert plain["config"]["hosts"] == [{"apiKey": "[REDACTED]"}]
+  assert plain["samples"] == list(range(10))
+  node, depth = plain["deep"], 0
+  while "child" in node:
+    node, depth = node["child"], depth + 1
+  assert (depth, node) == (5000, {"leaf": 1})
+  assert capped["notes"] == "xxxxxxxx...[TRUNCATED 42 chars]"
+  assert capped["samples"] == [0, 1, 2, "[TRUNCATED 7 items]"]
+  assert capped["__truncated__"] == 1
+  assert state["config"]["DB_Password"] == "hunter2"
+
+
+def test_batched_jsonl_writer_rotates_and_compresses(tmp_path):
+  log_path = tmp_path / "inputs.jsonl"
+  writer = log_writer.BatchedJsonlWriter(
+    log_path,
+    batch_size=1,
+    max_bytes=40,
+    backup_count=2,
+    compress=True,
+  )
+  for index in range(4):
+    writer.write({"index": index, "padding": "x" * 10})
+  writer.close()
+
+  live = [json.loads(line) for line in log_path.read_text().splitlines()]
+  newest = gzip.decompress((tmp_path / "inputs.jsonl.1.gz").read_bytes())
+  oldest = gzip.decompress((tmp_path / "inputs.jsonl.2.gz").read_bytes())
+
+  assert [record["index"] for record in live] == [3]
+  assert json.loads(newest)["index"] == 2
+  assert json.loads(oldest)["index"] == 1
+  assert not (tmp_path / "inputs.jsonl.3.gz").exists()
+
+
+def test_batched_jsonl_writer_waits_for_full_batches(tmp_path):
+  log_path = tmp_path / "inputs.jsonl"
+  writer = log_writer.BatchedJsonlWriter(
+    log_path,
+    batch_size=3,
+    flush_interval=60,
+  )
+  batches = []
+  write = writer._write
+
+  def counting_write(records):
+    batches.append(len(records))
+    write(records)
+
+  writer._write = counting_write
+  writer.write({"index": 0})
+  writer.write({"index": 1})
+  time.sleep(0.1)
+  assert batches == []
+
+  writer.write({"index": 2})
+  deadline = time.monotonic() + 5
+  while not batches and time.monotonic() < deadline:
+    time.sleep(0.01)
+  writer.write({"index": 3})
+  started = time.monotonic()
+  assert writer.flush(timeout=5)
+  flushed_in = time.monotonic() - started
+  writer.close()
+
+  assert batches == [3, 1]
+  assert flushed_in < 1
+  assert len(log_path.read_text().splitlines()) == 4
+
+
+def test_batched_jsonl_writer_survives_errors_and_flush_fails_fast(
+  tmp_path,
+):
+  log_path = tmp_path / "inputs.jsonl"
+  writer = log_writer.BatchedJsonlWriter(log_path, batch_size=1)
+  write = writer._write
+  failures = [RuntimeError("boom")]
+
+  def flaky_write(records):
+    if failures:
+      raise failures.pop()
+    write(records)
+
+  writer._write = flaky_write
+  writer.write({"index": 0})
+  writer.write({"index": 1})
+
+  assert writer.flush(timeout=5)
+  assert writer.dropped == 1
+  assert json.loads(log_path.read_text())["index"] == 1
+
+  writer.close()
+  writer.write({"index": 2})
+  # The thread is gone, so nothing will ever drain the record.
+  assert writer.flush() is False
+
+
+def test_convert_summary_log_dedupes_state_and_round_trips(tmp_path):
+  source = ROOT_DIR / "summary_agent_inputs.jsonl"
+  destination = tmp_path / "inputs_v2.jsonl"
+
+  count = summary_log.convert_summary_log(source, destination)
+
+  original = json.loads(source.read_text(encoding="utf-8").splitlines()[0])
+  converted = json.loads(destination.read_text(encoding="utf-8"))
+  drives = converted["metrics"]["disk_stats"]["drives"]
+  assert count == 1
+  assert converted["schema_version"] == "summary-input-v2"
+  assert converted["state"] == {}
+  assert drives["mount"] == ["/", "/mnt/wslg/distro"]
+  assert destination.stat().st_size < source.stat().st_size / 1.5
+  (decoded,) = summary_log.iter_summary_records(destination)
+  assert decoded.pop("schema_version") == "summary-input-v2"
+  original.pop("schema_version")
+  assert decoded == original
+
+
+def _metrics_state(cpu: float, available: float, disk: float) -> dict:
+  """Return session state with the three collector payloads."""
+  return {
+    "cpu_stats": {"usage_percent": cpu},
+    "memory_stats": {"available_percent": available},
+    "disk_stats": {"drives": [{"mount": "/", "used_percent": disk}]},
+  }
+
+
+def _decisions(source: str) -> float:
+  """Return the severity decision count for one source."""
+  return SEVERITY_DECISIONS.labels(source).value()
+
+
+def test_severity_fast_path_answers_clear_snapshots_locally():
+  local_before = _decisions("local")
+  green = DummyCallbackContext(state=_metrics_state(5, 80, 10))
+  red = DummyCallbackContext(state=_metrics_state(97, 60, 10))
+
+  green_result = severity_fast_path_before_model_callback(green, None)
+  red_result = severity_fast_path_before_model_callback(red, None)
+
+  assert json.loads(green_result.content.parts[0].text)["severity"] == "green"
+  red_payload = json.loads(red_result.content.parts[0].text)
+  assert red_payload["severity"] == "red"
+  assert "CPU usage" in red_payload["reason"]
+  assert _decisions("local") - local_before == 2
+
+
+def test_severity_fast_path_escalates_borderline_snapshots():
+  before = _decisions("local"), _decisions("model")
+  borderline = DummyCallbackContext(state=_metrics_state(78, 80, 10))
+  incomplete = DummyCallbackContext(state={"cpu_stats": {"usage_percent": 5}})
+
+  assert severity_fast_path_before_model_callback(borderline, None) is None
+  assert severity_fast_path_before_model_callback(incomplete, None) is None
+  # Escalating is not a model decision; the after-model callback counts
+  # those once the model has answered.
+  assert (_decisions("local"), _decisions("model")) == before
+
+
+def test_severity_follows_stall_time_when_pressure_is_reported():
+  busy = _metrics_state(97, 10, 10)
+  for key in ("cpu_stats", "memory_stats"):
+    busy[key]["pressure"] = {"some": {"avg10": 0.0}}
+  stalled = _metrics_state(30, 60, 10)
+  stalled["disk_stats"]["pressure"] = {"some": {"avg10": 55.0}}
+
+  busy_decision = calibrate_severity(busy)
+  stalled_decision = calibrate_severity(stalled)
+
+  assert busy_decision.severity == "yellow"
+  assert stalled_decision.severity == "red"
+  assert "I/O stall time" in stalled_decision.reason
+
+
+def test_severity_cache_round_trips_model_verdicts(monkeypatch):
+  cache = severity_cache.SeverityResponseCache(max_entries=4)
+  monkeypatch.setattr(severity_cache, "_SEVERITY_CACHE", cache)
+  first = DummyCallbackContext(state=_metrics_state(78.1, 80, 10))
+  similar = DummyCallbackContext(state=_metrics_state(78.9, 81, 11))
+  response = genai_types.Content(
+    parts=[genai_types.Part(text='```json\n{"severity": "yellow"}\n```')]
+  )
+
+  model_before = _decisions("model")
+  assert severity_cache_before_model_callback(first, None) is None
+  severity_cache_after_model_callback(
+    first,
+    type("Response", (), {"content": response})(),
+  )
+  cached = severity_cache_before_model_callback(similar, None)
+  assert _decisions("model") - model_before == 1
+
+  assert json.loads(cached.content.parts[0].text)["severity"] == "yellow"
+  assert cache.stats()["hits"] == 1
+  assert cache.stats()["misses"] == 1
+
+
+def test_severity_cache_expires_evicts_and_persists(tmp_path, monkeypatch):
+  store_path = tmp_path / "severity_cache.sqlite"
+  cache = severity_cache.SeverityResponseCache(
+    max_entries=2,
+    ttl_seconds=60,
+    store_path=store_path,
+  )
+  cache.put("a", "A")
+  cache.put("b", "B")
+  cache.get("a")
+  cache.put("c", "C")
+
+  assert cache.get("b") is None
+  assert cache.get("a") == "A"
+  cache.close()
+
+  reloaded = severity_cache.SeverityResponseCache(
+    max_entries=2,
+    store_path=store_path,
+  )
+  assert reloaded.get("c") == "C"
+  monkeypatch.setattr(severity_cache.time, "time", lambda: 10**12)
+  assert reloaded.get("c") is None
+  reloaded.close()
+
+
+def test_severity_cache_ignores_malformed_env_settings(monkeypatch):
+  monkeypatch.setattr(severity_cache, "_SEVERITY_CACHE", None)
+  monkeypatch.setenv(severity_cache.CACHE_MAX_ENTRIES_ENV_VAR, "lots")
+  monkeypatch.setenv(severity_cache.CACHE_TTL_ENV_VAR, "5m")
+  monkeypatch.delenv(severity_cache.CACHE_PATH_ENV_VAR, raising=False)
+
+  cache = severity_cache.get_severity_cache()
+
+  assert cache.max_entries == severity_cache.DEFAULT_CACHE_MAX_ENTRIES
+  assert cache.ttl_seconds == severity_cache.DEFAULT_CACHE_TTL_SECONDS
+
+
+def test_build_sft_dataset_labels_dedupes_and_shards(tmp_path):
+  source = tmp_path / "inputs.jsonl"
+  rows = [
+    _metrics_state(10.0, 70.0, 20.0),
+    _metrics_state(11.0, 71.0, 21.0),
+    _metrics_state(95.0, 10.0, 20.0),
+    _metrics_state(60.0, 30.0, 75.0),
+    {"cpu_stats": {"usage_percent": 5.0}},
+  ]
+  lines = [
+    json.dumps(
+      summary_log.encode_summary_record(
+        {
+          "schema_version": "summary-input-v1",
+          "metrics": state,
+          "context": {},
+          "state": state,
+        }
+      )
+    )
+    for state in rows
+  ]
+  source.write_text("\n".join(lines + ["not json"]) + "\n", encoding="utf-8")
+
+  stats = sft_dataset.build_sft_dataset(
+    [source],
+    tmp_path / "out",
+    workers=2,
+    chunk_size=2,
+    shard_size=2,
+  )
+
+  examples = [
+    json.loads(line)
+    for shard in stats.shards
+    for line in shard.read_text(encoding="utf-8").splitlines()
+  ]
+  labels = [
+    json.loads(example["contents"][1]["parts"][0]["text"])["severity"]
+    for example in examples
+  ]
+  sample = examples[0]["contents"][0]["parts"][0]["text"]
+  assert stats.to_dict()["read"] == 6
+  assert (stats.malformed, stats.unlabeled, stats.duplicates) == (1, 1, 1)
+  assert [path.name for path in stats.shards] == [
+    "sft-00000.jsonl",
+    "sft-00001.jsonl",
+  ]
+  assert labels == ["green", "red", "yellow"]
+  assert sample.startswith("Input sample:\n")
+  assert json.loads(sample.split("\n", 1)[1])["state"] == {}
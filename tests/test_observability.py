@@ -1,16 +1,19 @@
 """Tests for Arize AX observability configuration."""
 
 from pathlib import Path
+import gc
 import importlib
 import sys
+import threading
 import types
+import urllib.request
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT_DIR))
 sys.path.append(str(ROOT_DIR / "agents"))
 
 
-def _install_arize_stubs():
+def _install_arize_stubs(monkeypatch):
   """Install minimal stubs for Arize and OpenInference."""
   register_calls = []
   instrument_calls = []
@@ -39,11 +42,19 @@ def _install_arize_stubs():
   instrumentation_module.google_adk = google_adk_module
   openinference_module.instrumentation = instrumentation_module
 
-  sys.modules["arize"] = arize_module
-  sys.modules["arize.otel"] = arize_otel_module
-  sys.modules["openinference"] = openinference_module
-  sys.modules["openinference.instrumentation"] = instrumentation_module
-  sys.modules["openinference.instrumentation.google_adk"] = google_adk_module
+  monkeypatch.setitem(sys.modules, "arize", arize_module)
+  monkeypatch.setitem(sys.modules, "arize.otel", arize_otel_module)
+  monkeypatch.setitem(sys.modules, "openinference", openinference_module)
+  monkeypatch.setitem(
+    sys.modules,
+    "openinference.instrumentation",
+    instrumentation_module,
+  )
+  monkeypatch.setitem(
+    sys.modules,
+    "openinference.instrumentation.google_adk",
+    google_adk_module,
+  )
 
   return register_calls, instrument_calls
 
@@ -53,20 +64,22 @@ def test_configure_arize_ax_skips_without_env(monkeypatch):
   monkeypatch.delenv("ARIZE_API_KEY", raising=False)
 
   observability = importlib.import_module("deployment.observability")
-  observability._ARIZE_CONFIGURED = False
+  monkeypatch.setattr(observability, "_ARIZE_CONFIGURED", False)
 
   assert observability.configure_arize_ax() is False
 
 
 def test_configure_arize_ax_registers_when_env_set(monkeypatch):
-  register_calls, instrument_calls = _install_arize_stubs()
+  register_calls, instrument_calls = _install_arize_stubs(monkeypatch)
 
   monkeypatch.setenv("ARIZE_SPACE_ID", "space-id")
   monkeypatch.setenv("ARIZE_API_KEY", "api-key")
   monkeypatch.setenv("ARIZE_PROJECT_NAME", "monitoring-project")
 
   observability = importlib.import_module("deployment.observability")
-  observability._ARIZE_CONFIGURED = False
+  monkeypatch.setattr(observability, "_ARIZE_CONFIGURED", False)
+  monkeypatch.setattr(observability, "_TRACER_PROVIDER", None)
+  monkeypatch.setattr(observability, "_TRACER", None)
 
   assert observability.configure_arize_ax() is True
 
@@ -78,3 +91,191 @@ def test_configure_arize_ax_registers_when_env_set(monkeypatch):
     }
   ]
   assert instrument_calls == ["tracer-provider"]
+
+
+class _FakeTracer:
+  """Tracer whose chain decorator counts wrapped calls."""
+
+  def __init__(self):
+    self.calls = []
+
+  def chain(self, *args, **kwargs):
+    def _decorator(func):
+      def _wrapper(*call_args, **call_kwargs):
+        self.calls.append(func.__name__)
+        return func(*call_args, **call_kwargs)
+
+      return _wrapper
+
+    return _decorator
+
+
+def test_trace_chain_honours_exclusion_and_sample_rates(monkeypatch):
+  observability = importlib.import_module("deployment.observability")
+  tracer = _FakeTracer()
+  monkeypatch.setattr(observability, "_get_tracer", lambda: tracer)
+  monkeypatch.setenv("OBSERVABILITY_TRACE_EXCLUDE", "excluded")
+  monkeypatch.setenv("OBSERVABILITY_TRACE_SAMPLE_RATES", "never=0,half=0.5")
+
+  def excluded():
+    return "excluded"
+
+  def never():
+    return "never"
+
+  def half():
+    return "half"
+
+  def always():
+    return "always"
+
+  wrapped = {
+    func.__name__: observability.trace_chain()(func)
+    for func in (excluded, never, half, always)
+  }
+  monkeypatch.setattr(observability.random, "random", lambda: 0.25)
+  first = [func() for func in wrapped.values()]
+  monkeypatch.setattr(observability.random, "random", lambda: 0.75)
+  wrapped["half"]()
+
+  assert first == ["excluded", "never", "half", "always"]
+  assert tracer.calls == ["half", "always"]
+
+
+def test_trace_chain_binds_lazily_and_rebinds(monkeypatch):
+  observability = importlib.import_module("deployment.observability")
+  tracer = _FakeTracer()
+  lookups = []
+
+  def _no_tracer():
+    lookups.append("lookup")
+    return None
+
+  monkeypatch.setattr(observability, "_get_tracer", _no_tracer)
+
+  @observability.trace_chain()
+  def helper():
+    return "ok"
+
+  assert lookups == []
+  assert helper() == "ok"
+  assert helper() == "ok"
+  assert lookups == ["lookup"]
+  assert tracer.calls == []
+
+  monkeypatch.setattr(observability, "_get_tracer", lambda: tracer)
+  observability.rebind_tracing()
+
+  assert helper() == "ok"
+  assert tracer.calls == ["helper"]
+
+
+def test_trace_chain_aggregates_onto_parent_span(monkeypatch):
+  from opentelemetry.sdk.trace import TracerProvider
+
+  observability = importlib.import_module("deployment.observability")
+  tracer = _FakeTracer()
+  monkeypatch.setattr(observability, "_get_tracer", lambda: tracer)
+
+  @observability.trace_chain(aggregate=True)
+  def helper(value):
+    return value * 2
+
+  otel_tracer = TracerProvider().get_tracer(__name__)
+  with otel_tracer.start_as_current_span("parent") as span:
+    results = [helper(value) for value in range(3)]
+
+  assert results == [0, 2, 4]
+  assert tracer.calls == []
+  assert span.attributes["aggregated.helper.calls"] == 3
+  assert span.attributes["aggregated.helper.max_ms"] >= 0
+  assert helper(5) == 10
+
+
+def test_metrics_registry_renders_prometheus_text():
+  metrics = importlib.import_module("deployment.metrics")
+  registry = metrics.MetricsRegistry()
+  calls = registry.counter("demo_calls_total", "Demo calls.", ("name",))
+  latency = registry.histogram(
+    "demo_seconds",
+    "Demo latency.",
+    buckets=(0.1, 1.0),
+  )
+
+  def _record():
+    calls.labels('a"b').inc()
+    latency.observe(0.05)
+    latency.observe(0.5)
+
+  threads = [threading.Thread(target=_record) for _ in range(4)]
+  for thread in threads:
+    thread.start()
+  for thread in threads:
+    thread.join()
+
+  text = registry.render()
+
+  assert "# TYPE demo_calls_total counter" in text
+  assert 'demo_calls_total{name="a\\"b"} 4' in text
+  assert 'demo_seconds_bucket{le="0.1"} 4' in text
+  assert 'demo_seconds_bucket{le="+Inf"} 8' in text
+  assert "demo_seconds_count 8" in text
+
+
+def test_metric_cells_of_exited_threads_are_folded():
+  metrics = importlib.import_module("deployment.metrics")
+  registry = metrics.MetricsRegistry()
+  child = registry.counter("demo_total", "Demo.").labels()
+
+  for _ in range(200):
+    thread = threading.Thread(target=child.inc)
+    thread.start()
+    thread.join()
+  del thread
+  gc.collect()
+
+  assert child.value() == 200
+  assert len(child._cells) <= 1
+
+
+def test_decorated_calls_are_served_on_metrics_endpoint(monkeypatch):
+  observability = importlib.import_module("deployment.observability")
+  metrics = importlib.import_module("deployment.metrics")
+  monkeypatch.setattr(observability, "_get_tracer", lambda: None)
+
+  @observability.trace_tool()
+  def metered_tool():
+    return "ok"
+
+  @observability.trace_chain()
+  def failing_chain():
+    raise RuntimeError("boom")
+
+  assert metered_tool() == "ok"
+  try:
+    failing_chain()
+  except RuntimeError:
+    pass
+
+  server = metrics.serve_metrics(0)
+  try:
+    port = server.server_address[1]
+    url = f"http://127.0.0.1:{port}/metrics"
+    with urllib.request.urlopen(url, timeout=5) as response:
+      body = response.read().decode("utf-8")
+  finally:
+    server.shutdown()
+    server.server_close()
+
+  assert (
+    'system_monitor_calls_total{kind="tool",function="metered_tool",'
+    'outcome="ok"} 1'
+  ) in body
+  assert (
+    'system_monitor_calls_total{kind="chain",function="failing_chain",'
+    'outcome="error"} 1'
+  ) in body
+  assert (
+    'system_monitor_call_duration_seconds_count{kind="tool",'
+    'function="metered_tool"} 1'
+  ) in body
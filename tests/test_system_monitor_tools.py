@@ -1,8 +1,11 @@
 """Tests for OneClickSystemMonitor tools."""
 
+import asyncio
 from enum import Enum
 from pathlib import Path
 import sys
+import threading
+import time
 import types
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
@@ -16,7 +19,10 @@ def _install_google_adk_stubs() -> None:
   adk_module = types.ModuleType("google.adk")
   agents_module = types.ModuleType("google.adk.agents")
   run_config_module = types.ModuleType("google.adk.agents.run_config")
+  models_module = types.ModuleType("google.adk.models")
+  lite_llm_module = types.ModuleType("google.adk.models.lite_llm")
   tools_module = types.ModuleType("google.adk.tools")
+  events_module = types.ModuleType("google.adk.events")
   genai_module = types.ModuleType("google.genai")
   genai_types_module = types.ModuleType("google.genai.types")
   psutil_module = types.ModuleType("psutil")
@@ -39,6 +45,19 @@ def _install_google_adk_stubs() -> None:
     def __init__(self, **kwargs) -> None:
       self.kwargs = kwargs
 
+  class BaseAgent:
+    def __init__(self, **kwargs) -> None:
+      self.kwargs = kwargs
+      self.name = kwargs.get("name")
+
+  class Event:
+    def __init__(self, **kwargs) -> None:
+      self.kwargs = kwargs
+
+  class EventActions:
+    def __init__(self, state_delta=None) -> None:
+      self.state_delta = state_delta or {}
+
   class ParallelAgent:
     def __init__(self, **kwargs) -> None:
       self.kwargs = kwargs
@@ -47,22 +66,37 @@ def _install_google_adk_stubs() -> None:
     def __init__(self, **kwargs) -> None:
       self.kwargs = kwargs
 
+  class LiteLlm:
+    def __init__(self, **kwargs) -> None:
+      self.kwargs = kwargs
+
+  class LlmResponse:
+    def __init__(self, content=None) -> None:
+      self.content = content
+
   class Part:
     def __init__(self, text: str | None = None) -> None:
       self.text = text
 
   class Content:
-    def __init__(self, parts=None) -> None:
+    def __init__(self, parts=None, role: str | None = None) -> None:
       self.parts = parts or []
+      self.role = role
 
   class Error(Exception):
     """Stub psutil.Error."""
 
   run_config_module.RunConfig = RunConfig
   run_config_module.StreamingMode = StreamingMode
+  agents_module.BaseAgent = BaseAgent
   agents_module.LlmAgent = LlmAgent
   agents_module.ParallelAgent = ParallelAgent
   agents_module.SequentialAgent = SequentialAgent
+  lite_llm_module.LiteLlm = LiteLlm
+  events_module.Event = Event
+  events_module.EventActions = EventActions
+  models_module.lite_llm = lite_llm_module
+  models_module.LlmResponse = LlmResponse
   tools_module.ToolContext = ToolContext
   tools_module.FunctionTool = FunctionTool
   genai_types_module.Part = Part
@@ -71,6 +105,8 @@ def _install_google_adk_stubs() -> None:
   psutil_module.Error = Error
 
   adk_module.agents = agents_module
+  adk_module.events = events_module
+  adk_module.models = models_module
   adk_module.tools = tools_module
   google_module.adk = adk_module
   google_module.genai = genai_module
@@ -79,7 +115,10 @@ def _install_google_adk_stubs() -> None:
   sys.modules["google.adk"] = adk_module
   sys.modules["google.adk.agents"] = agents_module
   sys.modules["google.adk.agents.run_config"] = run_config_module
+  sys.modules["google.adk.models"] = models_module
+  sys.modules["google.adk.models.lite_llm"] = lite_llm_module
   sys.modules["google.adk.tools"] = tools_module
+  sys.modules["google.adk.events"] = events_module
   sys.modules["google.genai"] = genai_module
   sys.modules["google.genai.types"] = genai_types_module
   sys.modules["psutil"] = psutil_module
@@ -92,9 +131,30 @@ from agents.oneclicksystemmonitor.tools import (  # noqa: E402
   collect_memory_stats,
   generate_summary_report,
 )
+from agents.oneclicksystemmonitor import exporter  # noqa: E402
+from agents.oneclicksystemmonitor import fleet  # noqa: E402
+from agents.oneclicksystemmonitor import metric_store  # noqa: E402
+from agents.oneclicksystemmonitor.sub_agents import collector  # noqa: E402
+from agents.oneclicksystemmonitor.tools import backends  # noqa: E402
+from agents.oneclicksystemmonitor.tools import collection  # noqa: E402
 from agents.oneclicksystemmonitor.tools import cpu_tools  # noqa: E402
+from agents.oneclicksystemmonitor.tools import deadlines  # noqa: E402
+from agents.oneclicksystemmonitor.tools import disk_tools  # noqa: E402
+from agents.oneclicksystemmonitor.tools import history  # noqa: E402
 from agents.oneclicksystemmonitor.tools import memory_tools  # noqa: E402
-from agents.oneclicksystemmonitor.tools.units import bytes_to_gb  # noqa: E402
+from agents.oneclicksystemmonitor.tools import mounts  # noqa: E402
+from agents.oneclicksystemmonitor.tools import process_snapshot  # noqa: E402
+from agents.oneclicksystemmonitor.tools import process_table  # noqa: E402
+from agents.oneclicksystemmonitor.tools import pressure  # noqa: E402
+from agents.oneclicksystemmonitor.tools import process_tools  # noqa: E402
+from agents.oneclicksystemmonitor.tools import sampler  # noqa: E402
+from agents.oneclicksystemmonitor.tools import sampling_window  # noqa: E402
+from agents.oneclicksystemmonitor.tools import summary_tools  # noqa: E402
+from agents.oneclicksystemmonitor.tools import trend_tools  # noqa: E402
+from agents.oneclicksystemmonitor.tools.units import (  # noqa: E402
+  bytes_to_gb,
+  bytes_to_mb,
+)
 
 
 class DummyContext:
@@ -126,13 +186,17 @@ class DummySwapMemory:
 class DummyProcess:
   """Stub for psutil.Process."""
 
-  def __init__(self, name: str, cpu_percent: float) -> None:
+  def __init__(self, name: str, cpu_percent: float, pid: int = 0) -> None:
     self.info = {"name": name}
+    self.pid = pid
     self._cpu_percent = cpu_percent
 
   def cpu_percent(self, interval: float | None = None) -> float:
     return self._cpu_percent
 
+  def name(self) -> str:
+    return self.info["name"]
+
 
 class DummyPsutilCpu:
   """Stubbed psutil module for CPU tests."""
@@ -154,8 +218,20 @@ class DummyPsutilCpu:
       return [10.0, 20.0]
     return 15.0
 
+  processes = {
+    1: ("alpha", 5.0),
+    2: ("beta", 12.5),
+  }
+
   def process_iter(self, attrs):
-    return [DummyProcess("alpha", 5.0), DummyProcess("beta", 12.5)]
+    return [self.Process(pid) for pid in self.pids()]
+
+  def pids(self):
+    return list(self.processes)
+
+  def Process(self, pid: int):  # noqa: N802 - mirrors psutil.Process
+    name, cpu_percent = self.processes[pid]
+    return DummyProcess(name, cpu_percent, pid)
 
   def sensors_temperatures(self, fahrenheit: bool = False):
     return {}
@@ -171,6 +247,34 @@ class DummyPsutilMemory:
     return DummySwapMemory()
 
 
+class DummyDiskCounters:
+  """Stub for psutil.disk_io_counters."""
+
+  def __init__(self, read_bytes: int, write_bytes: int) -> None:
+    self.read_bytes = read_bytes
+    self.write_bytes = write_bytes
+
+
+class DummyPsutilSampler(DummyPsutilCpu, DummyPsutilMemory):
+  """Stubbed psutil module for background sampler tests."""
+
+  def __init__(self) -> None:
+    self.disk_reads = 0
+
+  def cpu_percent(self, interval: float | None = None, percpu: bool = False):
+    if interval:
+      raise AssertionError("Sampler must not block on cpu_percent.")
+    return [30.0, 50.0]
+
+  def disk_io_counters(self):
+    self.disk_reads += 1
+    megabyte = 1024**2
+    return DummyDiskCounters(
+      self.disk_reads * megabyte,
+      self.disk_reads * 2 * megabyte,
+    )
+
+
 def test_collect_memory_stats_sets_state(monkeypatch):
   context = DummyContext()
   monkeypatch.setattr(memory_tools, "psutil", DummyPsutilMemory())
@@ -186,9 +290,44 @@ def test_collect_memory_stats_sets_state(monkeypatch):
   )
 
 
+class DummyPsutilMemoryHung(DummyPsutilMemory):
+  """Memory stub whose reads block until released."""
+
+  def __init__(self, release: threading.Event) -> None:
+    self.release = release
+
+  def virtual_memory(self):
+    self.release.wait()
+    return super().virtual_memory()
+
+
+def test_async_memory_collector_stores_timeout_payload(monkeypatch):
+  release = threading.Event()
+  context = DummyContext()
+  monkeypatch.setattr(memory_tools, "psutil", DummyPsutilMemoryHung(release))
+  monkeypatch.setenv(deadlines.COLLECTOR_TIMEOUT_ENV_VAR, "100")
+
+  try:
+    result = asyncio.run(memory_tools.collect_memory_stats_async(context))
+  finally:
+    release.set()
+
+  assert result["status"] == "ok"
+  assert context.state["memory_stats"] == {
+    "stats_reason": "timed out after 100 ms"
+  }
+
+
+def _use_cpu_stub(monkeypatch, stub) -> None:
+  """Route CPU and process-table psutil calls to a stub."""
+  monkeypatch.setattr(cpu_tools, "psutil", stub)
+  monkeypatch.setattr(process_table, "psutil", stub)
+  monkeypatch.setattr(cpu_tools, "_PROCESS_TABLE", process_table.ProcessTable())
+
+
 def test_collect_cpu_stats_handles_missing_temperature(monkeypatch):
   context = DummyContext()
-  monkeypatch.setattr(cpu_tools, "psutil", DummyPsutilCpu())
+  _use_cpu_stub(monkeypatch, DummyPsutilCpu())
 
   result = collect_cpu_stats(context)
 
@@ -196,6 +335,979 @@ def test_collect_cpu_stats_handles_missing_temperature(monkeypatch):
   assert cpu_stats["temperature_c"] is None
   assert cpu_stats["temperature_reason"]
   assert cpu_stats["top_process"]["name"] == "beta"
+  assert [item["name"] for item in cpu_stats["top_processes"]] == [
+    "beta",
+    "alpha",
+  ]
+
+
+class DummyPsutilProcessChurn(DummyPsutilCpu):
+  """Stub that tracks process handle creation and PID churn."""
+
+  def __init__(self) -> None:
+    self.processes = {pid: ("proc", float(pid)) for pid in range(1, 51)}
+    self.created = []
+
+  def Process(self, pid: int):  # noqa: N802 - mirrors psutil.Process
+    self.created.append(pid)
+    return super().Process(pid)
+
+
+def test_process_table_reuses_handles_and_evicts_dead_pids(monkeypatch):
+  stub = DummyPsutilProcessChurn()
+  monkeypatch.setattr(process_table, "psutil", stub)
+  table = process_table.ProcessTable()
+
+  table.prime()
+  top = table.top(3)
+
+  assert [process.pid for process in top] == [50, 49, 48]
+  assert len(stub.created) == 50
+
+  del stub.processes[50]
+  stub.processes[99] = ("newcomer", 99.0)
+  top = table.top(2)
+
+  assert [process.pid for process in top] == [99, 49]
+  assert stub.created[50:] == [99]
+  assert len(table) == 50
+
+
+def _write_fake_procfs(root: Path, busy_jiffies: int) -> None:
+  """Write a tiny /proc tree for the procfs backend."""
+  (root / "self").mkdir(parents=True, exist_ok=True)
+  (root / "stat").write_text(
+    "cpu  0 0 0 0 0 0 0 0 0 0\n"
+    f"cpu0 {busy_jiffies} 0 0 100 0 0 0 0 0 0\n"
+    "cpu1 0 0 0 100 0 0 0 0 0 0\n"
+    "intr 0\n",
+    encoding="utf-8",
+  )
+  (root / "meminfo").write_text(
+    "MemTotal:        8388608 kB\n"
+    "MemFree:         1048576 kB\n"
+    "MemAvailable:    2097152 kB\n"
+    "Buffers:          131072 kB\n"
+    "Cached:           393216 kB\n"
+    "SReclaimable:     131072 kB\n"
+    "SwapTotal:       2097152 kB\n"
+    "SwapFree:        1048576 kB\n",
+    encoding="utf-8",
+  )
+  (root / "diskstats").write_text(
+    "   8       0 sda 10 0 8 0 20 0 16 0 0 0 0 0 0 0 0 0 0\n"
+    "   8       1 sda1 10 0 8 0 20 0 16 0 0 0 0 0 0 0 0 0 0\n",
+    encoding="utf-8",
+  )
+  (root / "self" / "mounts").write_text(
+    "/dev/sda1 / ext4 rw 0 0\n"
+    "/dev/sda1 /mnt/my\\040disk ext4 rw 0 0\n"
+    "tmpfs /run tmpfs rw 0 0\n",
+    encoding="utf-8",
+  )
+  (root / "filesystems").write_text(
+    "nodev\ttmpfs\n\text4\n",
+    encoding="utf-8",
+  )
+
+
+def test_procfs_backend_matches_psutil_shapes(tmp_path):
+  procfs_root = tmp_path / "proc"
+  sysfs_root = tmp_path / "block"
+  (sysfs_root / "sda").mkdir(parents=True)
+  _write_fake_procfs(procfs_root, busy_jiffies=0)
+  backend = backends.ProcfsBackend(str(procfs_root), str(sysfs_root))
+
+  backend.cpu_percent(interval=None, percpu=True)
+  _write_fake_procfs(procfs_root, busy_jiffies=100)
+  per_core = backend.cpu_percent(interval=None, percpu=True)
+  memory = backend.virtual_memory()
+  swap = backend.swap_memory()
+  counters = backend.disk_io_counters()
+  partitions = backend.disk_partitions(all=False)
+  backend.close()
+
+  assert per_core == [100.0, 0.0]
+  assert memory.total == 8 * 1024**3
+  assert memory.percent == 75.0
+  assert memory.cached == 512 * 1024**2
+  assert swap.percent == 50.0
+  assert counters.read_bytes == 8 * backends.DISK_SECTOR_SIZE
+  assert counters.write_bytes == 16 * backends.DISK_SECTOR_SIZE
+  assert [partition.mountpoint for partition in partitions] == [
+    "/",
+    "/mnt/my disk",
+  ]
+
+
+def _write_fake_cgroup(procfs_root: Path, cgroup_root: Path) -> None:
+  """Write a limited cgroup v2 directory and the /proc files naming it."""
+  pod = cgroup_root / "kubepods" / "pod1"
+  pod.mkdir(parents=True)
+  (procfs_root / "self").mkdir(parents=True, exist_ok=True)
+  (procfs_root / "self" / "cgroup").write_text(
+    "0::/kubepods/pod1\n",
+    encoding="utf-8",
+  )
+  (procfs_root / "self" / "mountinfo").write_text(
+    f"30 24 0:26 / {cgroup_root} rw - cgroup2 cgroup2 rw\n",
+    encoding="utf-8",
+  )
+  files = {
+    "cgroup.controllers": "cpuset cpu io memory pids\n",
+    "cpu.max": "50000 100000\n",
+    "cpu.stat": "usage_usec 0\nuser_usec 0\nsystem_usec 0\n",
+    "memory.max": f"{1024**3}\n",
+    "memory.current": f"{768 * 1024**2}\n",
+    "memory.stat": f"file {300 * 1024**2}\ninactive_file {256 * 1024**2}\n",
+    "io.stat": (
+      "8:0 rbytes=1024 wbytes=4096 rios=1 wios=2 dbytes=0 dios=0\n"
+      "259:0 rbytes=1024 wbytes=0 rios=3 wios=0 dbytes=0 dios=0\n"
+    ),
+  }
+  for name, content in files.items():
+    (pod / name).write_text(content, encoding="utf-8")
+
+
+def test_cgroup_backend_reports_against_container_limits(
+  tmp_path,
+  monkeypatch,
+):
+  procfs_root = tmp_path / "proc"
+  cgroup_root = tmp_path / "cgroup"
+  _write_fake_cgroup(procfs_root, cgroup_root)
+  path = backends._cgroup_v2_dir(str(procfs_root))
+  cgroup = backends.CgroupV2(path)
+  host = DummyPsutilMemory()
+  backend = backends.CgroupBackend(host, cgroup)
+
+  memory = backend.virtual_memory()
+  swap = backend.swap_memory()
+  counters = backend.disk_io_counters()
+  cgroup._last_cpu = (time.monotonic() - 1.0, 0)
+  (cgroup_root / "kubepods" / "pod1" / "cpu.stat").write_text(
+    "usage_usec 250000\n",
+    encoding="utf-8",
+  )
+  per_core = backend.cpu_percent(interval=None, percpu=True)
+  cgroup.close()
+
+  assert path == str(cgroup_root / "kubepods" / "pod1")
+  assert memory.total == 1024**3
+  assert memory.used == 512 * 1024**2
+  assert memory.percent == 50.0
+  assert memory.cached == 300 * 1024**2
+  assert swap.total == DummySwapMemory().total
+  assert (counters.read_bytes, counters.write_bytes) == (2048, 4096)
+  assert len(per_core) == 1
+  assert 49.0 <= per_core[0] <= 50.0
+
+  monkeypatch.setattr(backends, "_CGROUP", cgroup)
+  monkeypatch.setattr(backends, "_CGROUP_CHECKED", True)
+  monkeypatch.delenv(backends.CGROUP_ENV_VAR, raising=False)
+  wrapped = backends.select_backend(host)
+  assert isinstance(wrapped, backends.CgroupBackend)
+  assert backends.select_backend(host) is wrapped
+  monkeypatch.setenv(backends.CGROUP_ENV_VAR, backends.CGROUP_OFF)
+  assert backends.select_backend(host) is host
+
+
+def test_pressure_reader_reports_averages_and_stall_deltas(tmp_path):
+  cpu_file = tmp_path / "cpu"
+  cpu_file.write_text(
+    "some avg10=42.50 avg60=12.00 avg300=3.25 total=1000000\n"
+    "full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n",
+    encoding="utf-8",
+  )
+  reader = pressure.PressureReader(str(tmp_path))
+
+  first = reader.read(pressure.CPU_RESOURCE)
+  cpu_file.write_text(
+    "some avg10=45.00 avg60=13.00 avg300=3.50 total=1250000\n"
+    "full avg10=0.00 avg60=0.00 avg300=0.00 total=0\n",
+    encoding="utf-8",
+  )
+  second = reader.read(pressure.CPU_RESOURCE)
+  reader.close()
+
+  assert first["some"]["avg10"] == 42.5
+  assert first["some"]["total_delta_us"] is None
+  assert second["some"]["avg300"] == 3.5
+  assert second["some"]["total_delta_us"] == 250000
+  assert second["full"]["total_delta_us"] == 0
+  assert reader.read(pressure.IO_RESOURCE) is None
+
+  stalled = {"pressure": {"some": {"avg10": 45.0}}}
+  idle = {"pressure": {"some": {"avg10": 0.5}}}
+  assert summary_tools._cpu_status(30, pressure.some_avg10(stalled))[0] == (
+    "High contention"
+  )
+  assert summary_tools._cpu_status(95, pressure.some_avg10(idle))[0] == (
+    "Moderate usage"
+  )
+  assert summary_tools._cpu_status(95)[0] == "High usage"
+  assert summary_tools._overall_status(["Low usage", "High contention"]) == (
+    summary_tools.HIGH_LOAD_LABEL
+  )
+
+
+def _write_fake_process(
+  root: Path,
+  pid: int,
+  comm: str,
+  ticks: int,
+  fds: int | None,
+) -> None:
+  """Write /proc/<pid>/stat and, unless fds is None, an fd directory."""
+  base = root / str(pid)
+  base.mkdir(parents=True, exist_ok=True)
+  (base / "stat").write_text(
+    f"{pid} ({comm}) S 1 {pid} {pid} 0 -1 0 0 0 0 0 {ticks} 0 0 0 20 0 "
+    f"3 0 100 4096 256 0\n",
+    encoding="utf-8",
+  )
+  if fds is not None:
+    (base / "fd").mkdir(exist_ok=True)
+    for fd in range(fds):
+      (base / "fd" / str(fd)).touch()
+
+
+def test_process_scanner_aggregates_by_name_and_user(tmp_path, monkeypatch):
+  procfs_root = tmp_path / "proc"
+  (procfs_root / "self").mkdir(parents=True)
+  _write_fake_process(procfs_root, 1, "nginx", 100, 2)
+  _write_fake_process(procfs_root, 2, "nginx", 100, None)
+  _write_fake_process(procfs_root, 30, "my (app)", 50, 1)
+  scanner = process_snapshot.ProcessScanner(
+    str(procfs_root),
+    count_open_files=True,
+  )
+  monkeypatch.setattr(process_tools, "_SCANNER", scanner)
+  context = DummyContext()
+
+  asyncio.run(process_tools.collect_process_stats(context))
+  first = context.state["process_stats"]
+  _write_fake_process(procfs_root, 1, "nginx", 150, 2)
+  asyncio.run(process_tools.collect_process_stats(context))
+  second = context.state["process_stats"]
+
+  assert first["process_count"] == 3
+  assert first["thread_count"] == 9
+  assert first["cpu_reason"] == process_tools.PROCESS_CPU_PENDING_REASON
+  assert [group["name"] for group in first["by_name"]] == ["nginx", "my (app)"]
+  assert second["cpu_reason"] is None
+  assert second["open_files_reason"] == (
+    process_tools.OPEN_FILES_UNAVAILABLE_REASON
+  )
+  nginx, app = second["by_name"]
+  assert (nginx["processes"], nginx["open_files"]) == (2, 2)
+  assert nginx["cpu_percent"] > 0
+  assert app["cpu_percent"] == 0
+  assert nginx["rss_mb"] == bytes_to_mb(2 * 256 * process_snapshot.PAGE_SIZE)
+  assert len(second["by_user"]) == 1
+  assert second["by_user"][0]["processes"] == 3
+
+  report = generate_summary_report(context)["data"]["report"]
+  assert "- Processes: 3 (9 threads," in report
+  assert "- By name: nginx (2 procs," in report
+
+
+def test_process_scanner_notices_idle_process_waking_up(tmp_path):
+  procfs_root = tmp_path / "proc"
+  _write_fake_process(procfs_root, 1, "worker", 100, None)
+  _write_fake_process(procfs_root, 2, "idle", 100, None)
+  scanner = process_snapshot.ProcessScanner(
+    str(procfs_root),
+    idle_refresh_walks=16,
+  )
+
+  scanner.scan()
+  idle = scanner.scan()
+  _write_fake_process(procfs_root, 1, "worker", 200, None)
+  busy = scanner.scan()
+
+  assert [row["cpu_percent"] for row in idle.group_totals()] == [0, 0]
+  worker = busy.group_totals()[0]
+  assert (worker["label"], worker["cpu_percent"] > 0) == ("worker", True)
+
+
+def test_select_backend_defaults_to_psutil(monkeypatch):
+  monkeypatch.delenv(backends.BACKEND_ENV_VAR, raising=False)
+  fallback = DummyPsutilMemory()
+
+  assert backends.select_backend(fallback) is fallback
+
+
+class DummyPsutilMounts:
+  """Mount stub with WSL-style duplicates and an unreadable mount."""
+
+  def __init__(self, extra_mounts: int = 0) -> None:
+    self.partition_reads = 0
+    self.partitions = [
+      backends.CollectorRecord(
+        device="/dev/sdc",
+        mountpoint="/",
+        fstype="ext4",
+      ),
+      backends.CollectorRecord(
+        device="/dev/sdc",
+        mountpoint="/mnt/wslg/distro",
+        fstype="ext4",
+      ),
+      backends.CollectorRecord(
+        device="overlay",
+        mountpoint="/var/lib/docker/overlay2/merged",
+        fstype="overlay",
+      ),
+      backends.CollectorRecord(
+        device="/dev/loop0",
+        mountpoint="/snap/core/1",
+        fstype="squashfs",
+      ),
+      backends.CollectorRecord(
+        device="/dev/sdd",
+        mountpoint="/srv/locked",
+        fstype="xfs",
+      ),
+    ]
+    for index in range(extra_mounts):
+      self.partitions.append(
+        backends.CollectorRecord(
+          device=f"/dev/nvme{index}n1",
+          mountpoint=f"/data{index}",
+          fstype="ext4",
+        )
+      )
+
+  def disk_partitions(self, all: bool = False):  # noqa: A002
+    self.partition_reads += 1
+    return list(self.partitions)
+
+  def disk_usage(self, path: str):
+    if path == "/srv/locked":
+      raise PermissionError(path)
+    return types.SimpleNamespace(
+      total=100 * 1024**3,
+      free=40 * 1024**3,
+      percent=60.0 + len(path),
+    )
+
+
+def test_mount_table_cache_filters_dedupes_and_reuses(monkeypatch):
+  stub = DummyPsutilMounts(extra_mounts=12)
+  cache = mounts.MountTableCache(ttl=3600, watch=False)
+  monkeypatch.setattr(disk_tools, "psutil", stub)
+  monkeypatch.setattr(disk_tools, "MOUNT_TABLE", cache)
+
+  first, first_reason = disk_tools._get_drive_usage()
+  second, _ = disk_tools._get_drive_usage()
+  cache.invalidate()
+  disk_tools._get_drive_usage()
+
+  assert first == second
+  assert first_reason is None
+  assert [drive["mount"] for drive in first] == ["/"] + [
+    f"/data{index}" for index in range(12)
+  ]
+  assert [drive["used_percent"] for drive in first[:3]] == [61.0, 66.0, 66.0]
+  assert stub.partition_reads == 2
+  assert cache.refreshes == 2
+
+  other = DummyPsutilMounts()
+  assert cache.partitions(other) == [other.partitions[0], other.partitions[4]]
+  usages, timed_out = mounts.query_usage(other, cache.partitions(other))
+  assert usages[1] is None
+  assert timed_out == []
+
+
+def test_filter_partitions_keeps_container_overlay_root():
+  partitions = [
+    backends.CollectorRecord(
+      device="overlay",
+      mountpoint="/",
+      fstype="overlay",
+    ),
+    backends.CollectorRecord(
+      device="overlay",
+      mountpoint="/var/lib/docker/overlay2/merged",
+      fstype="overlay",
+    ),
+    backends.CollectorRecord(
+      device="/dev/loop0",
+      mountpoint="/",
+      fstype="squashfs",
+    ),
+    backends.CollectorRecord(
+      device="/dev/sda1",
+      mountpoint="/etc/hosts",
+      fstype="ext4",
+    ),
+  ]
+
+  assert mounts.filter_partitions(partitions) == [
+    partitions[0],
+    partitions[3],
+  ]
+
+
+def _fake_collectors(delay: float):
+  """Return collectors that block, await, and fail respectively."""
+
+  def blocking_cpu(tool_context):
+    time.sleep(delay)
+    tool_context.state["cpu_stats"] = {"usage_percent": 10.0}
+
+  async def async_disk(tool_context):
+    await asyncio.sleep(delay)
+    tool_context.state["disk_stats"] = {"drives": []}
+
+  def broken_memory(tool_context):
+    raise RuntimeError("boom")
+
+  return (
+    ("cpu_stats", blocking_cpu),
+    ("disk_stats", async_disk),
+    ("memory_stats", broken_memory),
+  )
+
+
+def test_collect_system_stats_runs_collectors_concurrently():
+  delay = 0.2
+  start = time.perf_counter()
+
+  state = asyncio.run(collection.collect_system_stats(_fake_collectors(delay)))
+
+  elapsed = time.perf_counter() - start
+  assert state == {
+    "cpu_stats": {"usage_percent": 10.0},
+    "disk_stats": {"drives": []},
+  }
+  assert elapsed < delay * 1.75
+
+
+class DummyPsutilWindow(DummyPsutilSampler):
+  """Sampler stub that also counts CPU reads and lists no partitions."""
+
+  def __init__(self) -> None:
+    super().__init__()
+    self.cpu_reads = 0
+
+  def cpu_percent(self, interval: float | None = None, percpu: bool = False):
+    self.cpu_reads += 1
+    return super().cpu_percent(interval, percpu)
+
+  def disk_partitions(self, all: bool = False):  # noqa: A002
+    return []
+
+
+def test_async_collectors_share_one_sampling_window(monkeypatch):
+  stub = DummyPsutilWindow()
+  for module in (cpu_tools, disk_tools, memory_tools, sampling_window):
+    monkeypatch.setattr(module, "psutil", stub)
+  monkeypatch.setattr(process_table, "psutil", stub)
+  monkeypatch.setattr(cpu_tools, "_PROCESS_TABLE", process_table.ProcessTable())
+  monkeypatch.setattr(sampling_window, "_LATEST", None)
+  monkeypatch.setattr(sampling_window, "SAMPLING_WINDOW_SECONDS", 0.2)
+
+  start = time.perf_counter()
+  state = asyncio.run(collection.collect_system_stats())
+  elapsed = time.perf_counter() - start
+
+  assert set(state) == {
+    "cpu_stats",
+    "memory_stats",
+    "disk_stats",
+    "process_stats",
+  }
+  assert stub.cpu_reads == 2
+  assert stub.disk_reads == 2
+  assert state["cpu_stats"]["per_core_percent"] == [30.0, 50.0]
+  assert state["cpu_stats"]["top_process"]["name"] == "beta"
+  assert state["disk_stats"]["read_mb_s"] > 0
+  assert elapsed < 0.35
+
+
+class DummyPsutilHung(DummyPsutilWindow):
+  """Window stub whose sensors and NFS mount block until released."""
+
+  def __init__(self, release: threading.Event) -> None:
+    super().__init__()
+    self.release = release
+    self.sensor_reads = 0
+
+  def sensors_temperatures(self, fahrenheit: bool = False):
+    self.sensor_reads += 1
+    self.release.wait()
+    return {}
+
+  def disk_partitions(self, all: bool = False):  # noqa: A002
+    return [
+      backends.CollectorRecord(
+        device="/dev/sda",
+        mountpoint="/",
+        fstype="ext4",
+      ),
+      backends.CollectorRecord(
+        device="nas:/export",
+        mountpoint="/mnt/nfs",
+        fstype="nfs4",
+      ),
+    ]
+
+  def disk_usage(self, path: str):
+    if path == "/mnt/nfs":
+      self.release.wait()
+    return types.SimpleNamespace(
+      total=100 * 1024**3,
+      free=50 * 1024**3,
+      percent=50.0,
+    )
+
+
+def test_collectors_return_partial_results_at_deadlines(monkeypatch):
+  release = threading.Event()
+  stub = DummyPsutilHung(release)
+  for module in (cpu_tools, disk_tools, memory_tools, sampling_window):
+    monkeypatch.setattr(module, "psutil", stub)
+  monkeypatch.setattr(process_table, "psutil", stub)
+  monkeypatch.setattr(cpu_tools, "_PROCESS_TABLE", process_table.ProcessTable())
+  monkeypatch.setattr(disk_tools, "MOUNT_TABLE", mounts.MountTableCache())
+  monkeypatch.setattr(sampling_window, "_LATEST", None)
+  monkeypatch.setattr(sampling_window, "SAMPLING_WINDOW_SECONDS", 0.05)
+  monkeypatch.setenv(deadlines.PROBE_TIMEOUT_ENV_VAR, "100")
+
+  late_write = threading.Event()
+
+  def stuck_collector(tool_context):
+    release.wait()
+    tool_context.state["stuck_stats"] = {"late": True}
+    late_write.set()
+
+  collectors = collection.COLLECTORS + (("stuck_stats", stuck_collector),)
+  start = time.perf_counter()
+  try:
+    state = asyncio.run(collection.collect_system_stats(collectors, 0.4))
+    elapsed = time.perf_counter() - start
+    # The hung sensor read is joined, not retried on another thread.
+    asyncio.run(collection.collect_system_stats(timeout=0.4))
+  finally:
+    release.set()
+  assert late_write.wait(5)
+
+  assert elapsed < 0.6
+  assert stub.sensor_reads == 1
+  assert set(state) == {
+    "cpu_stats",
+    "memory_stats",
+    "disk_stats",
+    "process_stats",
+    "stuck_stats",
+  }
+  assert state["stuck_stats"] == {"stats_reason": "timed out after 400 ms"}
+  assert state["cpu_stats"]["top_process"]["name"] == "beta"
+  assert state["cpu_stats"]["temperature_reason"] == "timed out after 100 ms"
+  assert [drive["mount"] for drive in state["disk_stats"]["drives"]] == ["/"]
+  assert state["disk_stats"]["drives_reason"] == (
+    "timed out after 100 ms: /mnt/nfs"
+  )
+
+
+def test_direct_collector_agent_emits_state_delta(monkeypatch):
+  monkeypatch.setattr(collection, "COLLECTORS", _fake_collectors(0))
+
+  class Invocation:
+    invocation_id = "invocation-1"
+    branch = None
+
+  async def run_agent():
+    return [
+      event
+      async for event in collector.direct_collector_agent._run_async_impl(
+        Invocation()
+      )
+    ]
+
+  events = asyncio.run(run_agent())
+
+  assert len(events) == 1
+  event = events[0].kwargs
+  assert event["author"] == "system_info_gatherer"
+  assert set(event["actions"].state_delta) == {"cpu_stats", "disk_stats"}
+  assert "usage_percent" in event["content"].parts[0].text
+
+
+def test_metric_history_wraps_and_answers_window_queries():
+  metric_history = history.MetricHistory(capacity=4)
+  for second in range(6):
+    metric_history.record(
+      history.CPU_GROUP,
+      history.cpu_history_values(
+        {"usage_percent": 10.0 * second, "per_core_percent": [second]}
+      ),
+      timestamp=1000.0 + second,
+    )
+
+  timestamps, values = metric_history.window(
+    history.CPU_GROUP,
+    "usage_percent",
+    window_seconds=60,
+    now=1005.0,
+  )
+  summary = metric_history.summarize(
+    history.CPU_GROUP,
+    "usage_percent",
+    window_seconds=2,
+    now=1005.0,
+  )
+
+  assert list(timestamps) == [1002.0, 1003.0, 1004.0, 1005.0]
+  assert list(values) == [20.0, 30.0, 40.0, 50.0]
+  assert summary.count == 3
+  assert summary.mean == 40.0
+  assert summary.maximum == 50.0
+  assert summary.p95 == 50.0
+  assert round(summary.slope_per_minute, 6) == 600.0
+  assert "core:0" in metric_history.series_names(history.CPU_GROUP)
+
+
+def test_metric_history_evicts_series_that_stop_reporting():
+  metric_history = history.MetricHistory(capacity=3)
+  metric_history.record(
+    history.DISK_GROUP,
+    {"mount:/mnt/a": 10.0, "max_used_percent": 10.0},
+    timestamp=10.0,
+  )
+  for second in range(1, 3):
+    metric_history.record(
+      history.DISK_GROUP,
+      {"max_used_percent": 20.0},
+      timestamp=10.0 + second,
+    )
+  assert "mount:/mnt/a" in metric_history.series_names(history.DISK_GROUP)
+
+  metric_history.record(
+    history.DISK_GROUP,
+    {"max_used_percent": 30.0},
+    timestamp=5.0,
+  )
+  timestamps, _ = metric_history.window(
+    history.DISK_GROUP,
+    "max_used_percent",
+    window_seconds=60,
+    now=20.0,
+  )
+
+  assert metric_history.series_names(history.DISK_GROUP) == [
+    "max_used_percent"
+  ]
+  assert list(timestamps) == [11.0, 12.0, 12.0]
+
+
+def test_metric_store_persists_rollups_and_prunes(tmp_path):
+  store_path = tmp_path / "history.sqlite3"
+  base = time.time() // 3600 * 3600 - 3600
+  metric_history = history.MetricHistory(capacity=4)
+  store = metric_store.MetricStore(store_path, prune_interval=3600)
+  metric_history.add_sink(store.enqueue)
+  for second, usage in ((0, 10.0), (30, 30.0), (90, 50.0)):
+    metric_history.record(
+      history.CPU_GROUP,
+      {"usage_percent": usage, "missing": None},
+      timestamp=base + second,
+    )
+
+  assert store.flush(timeout=5)
+  raw = store.query_range(
+    history.CPU_GROUP,
+    "usage_percent",
+    base,
+    base + 30,
+  )
+  minutes = store.query_range(
+    history.CPU_GROUP,
+    "usage_percent",
+    base,
+    base + 3600,
+    resolution=metric_store.MINUTE_RESOLUTION,
+  )
+  hours = store.query_range(
+    history.CPU_GROUP,
+    "usage_percent",
+    base,
+    base + 3600,
+    resolution=metric_store.HOUR_RESOLUTION,
+  )
+  store._prune(now=base + 24 * 3600 + 120)
+  pruned = store.query_range(
+    history.CPU_GROUP,
+    "usage_percent",
+    base,
+    base + 3600,
+  )
+  store.close()
+
+  reopened = metric_store.MetricStore(store_path)
+  persisted = reopened.query_range(
+    history.CPU_GROUP,
+    "usage_percent",
+    base,
+    base + 3600,
+    resolution=metric_store.HOUR_RESOLUTION,
+  )
+  reopened.close()
+
+  assert [row["value"] for row in raw] == [10.0, 30.0]
+  assert [(row["ts"], row["count"], row["mean"]) for row in minutes] == [
+    (base, 2, 20.0),
+    (base + 60, 1, 50.0),
+  ]
+  assert hours == [
+    {"ts": base, "count": 3, "mean": 30.0, "min": 10.0, "max": 50.0}
+  ]
+  assert pruned == []
+  assert persisted == hours
+
+
+def test_metric_store_survives_write_errors_and_flush_fails_fast(tmp_path):
+  store = metric_store.MetricStore(tmp_path / "history.sqlite3")
+  now = time.time()
+  write = store._write
+  failures = [RuntimeError("boom")]
+
+  def flaky_write(rows):
+    if failures:
+      raise failures.pop()
+    write(rows)
+
+  store._write = flaky_write
+  store.enqueue(history.CPU_GROUP, {"usage_percent": 10.0}, now)
+  assert store.flush(timeout=5)
+  store.enqueue(history.CPU_GROUP, {"usage_percent": 20.0}, now)
+  assert store.flush(timeout=5)
+  stored = store.query_range(history.CPU_GROUP, "usage_percent", 0, now)
+  store.close()
+  store.enqueue(history.CPU_GROUP, {"usage_percent": 30.0}, now)
+
+  assert [row["value"] for row in stored] == [20.0]
+  # The thread is gone, so nothing will ever commit the row.
+  assert store.flush() is False
+
+
+def test_host_exporter_shares_samples_and_serves_stale(monkeypatch):
+  from deployment.metrics import MetricsRegistry
+
+  release = threading.Event()
+  calls = []
+
+  def _collect():
+    calls.append(len(calls))
+    if len(calls) > 1:
+      release.wait(5)
+    return {
+      "cpu_stats": {"usage_percent": 10.0 + len(calls)},
+      "disk_stats": {
+        "drives": [{"mount": "/", "total_gb": 100.0, "free_gb": 40.0}],
+      },
+    }
+
+  host = exporter.HostMetricsExporter(interval=60, collect=_collect)
+  registry = MetricsRegistry()
+  registry.register_collector(host.families)
+
+  scrapes = [threading.Thread(target=registry.render) for _ in range(8)]
+  for scrape in scrapes:
+    scrape.start()
+  for scrape in scrapes:
+    scrape.join()
+  text = registry.render()
+
+  assert calls == [0]
+  assert "host_cpu_usage_percent 11" in text
+  assert 'host_disk_free_gb{mount="/"} 40' in text
+  assert "host_memory_total_gb" not in text
+
+  host.interval = 0.001
+  time.sleep(0.01)
+  started = time.perf_counter()
+  stale = registry.render()
+  assert time.perf_counter() - started < 1
+  assert "host_cpu_usage_percent 11" in stale
+
+  release.set()
+  deadline = time.time() + 5
+  while host.collections < 2 and time.time() < deadline:
+    time.sleep(0.01)
+  host.interval = 60
+  assert "host_cpu_usage_percent 12" in registry.render()
+  workers = [
+    thread for thread in threading.enumerate()
+    if thread.name == "host-exporter-refresh"
+  ]
+  assert len(workers) == 1
+  host.stop(timeout=5)
+  assert not workers[0].is_alive()
+  assert len(calls) == 2
+
+
+class FakeStatsSource:
+  """Exporter stand-in for one in-process fleet host."""
+
+  in_flight = 0
+  max_in_flight = 0
+  lock = threading.Lock()
+
+  def __init__(self, cpu: float, delay: float = 0.01, ready: bool = True):
+    self.cpu = cpu
+    self.delay = delay
+    self.ready = ready
+
+  def snapshot(self):
+    # Slow hosts keep running after the poller gives up, so only
+    # requests the poller is still waiting on are counted.
+    counted = self.delay < 0.3
+    with FakeStatsSource.lock:
+      FakeStatsSource.in_flight += counted
+      FakeStatsSource.max_in_flight = max(
+        FakeStatsSource.max_in_flight,
+        FakeStatsSource.in_flight,
+      )
+    time.sleep(self.delay)
+    with FakeStatsSource.lock:
+      FakeStatsSource.in_flight -= counted
+    if not self.ready:
+      return None, None
+    return {
+      "cpu_stats": {"usage_percent": self.cpu},
+      "memory_stats": {"available_percent": 60, "used_percent": 40},
+      "disk_stats": {"drives": [{"mount": "/", "used_percent": 20}]},
+    }, 1.0
+
+
+def test_fleet_collector_polls_hosts_concurrently_with_reuse():
+  sources = [FakeStatsSource(cpu=index * 5) for index in range(20)]
+  sources.append(FakeStatsSource(cpu=0, delay=1.0))
+  sources.append(FakeStatsSource(cpu=0, ready=False))
+  servers = [
+    fleet.serve_stats(0, source=source, host_name=f"host-{index}")
+    for index, source in enumerate(sources)
+  ]
+  addresses = [f"127.0.0.1:{server.server_address[1]}" for server in servers]
+  poller = fleet.FleetCollector(addresses, concurrency=4, timeout=0.3)
+
+  async def _poll_twice():
+    await poller.poll()
+    return await poller.poll()
+
+  try:
+    started = time.perf_counter()
+    results = asyncio.run(_poll_twice())
+    elapsed = time.perf_counter() - started
+  finally:
+    poller.close()
+    stoppers = [
+      threading.Thread(target=server.shutdown) for server in servers
+    ]
+    for stopper in stoppers:
+      stopper.start()
+    for stopper in stoppers:
+      stopper.join()
+    for server in servers:
+      server.server_close()
+
+  assert FakeStatsSource.max_in_flight <= 4
+  assert elapsed < 2
+  assert [server.connections for server in servers[:20]] == [1] * 20
+  assert [result["host"] for result in results[:20]] == [
+    f"host-{index}" for index in range(20)
+  ]
+  assert results[20]["error"] == "timed out after 300 ms"
+  assert results[21]["error"] == fleet.NO_SAMPLE_ERROR
+
+  summary = fleet.summarize_fleet(results, top=2)
+  assert summary["reachable"] == 20
+  assert summary["severity_counts"]["red"] == 4
+  assert summary["cpu_usage_percent"]["max"] == 95
+  assert [row["host"] for row in summary["worst_hosts"]] == [
+    "host-19",
+    "host-18",
+  ]
+  report = fleet.format_fleet_report(summary)
+  assert "20 of 22 hosts reporting" in report
+
+
+def test_fleet_collector_reports_malformed_json_per_host():
+  responses = [
+    (200, b"[1, 2]"),
+    (503, b'"warming up"'),
+    (200, b'{"host": "bad-state", "state": [1, 2]}'),
+    (200, b'{"host": "bad-block", "state": {"cpu_stats": [1, 2]}}'),
+  ]
+
+  async def _poll():
+    servers = []
+    for status, body in responses:
+
+      async def handle(reader, writer, status=status, body=body):
+        await reader.readuntil(b"\r\n\r\n")
+        writer.write(
+          (
+            f"HTTP/1.1 {status} X\r\n"
+            f"Content-Type: {fleet.JSON_CONTENT_TYPE}\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n"
+          ).encode("ascii")
+          + body
+        )
+        await writer.drain()
+        writer.close()
+
+      servers.append(await asyncio.start_server(handle, "127.0.0.1", 0))
+    poller = fleet.FleetCollector(
+      [f"127.0.0.1:{server.sockets[0].getsockname()[1]}" for server in servers],
+      timeout=1,
+    )
+    try:
+      return await poller.poll()
+    finally:
+      poller.close()
+      for server in servers:
+        server.close()
+        await server.wait_closed()
+
+  results = asyncio.run(_poll())
+
+  assert [result["error"] for result in results] == [
+    "Stats payload is not a JSON object.",
+    "HTTP 503",
+    "Stats state is not a JSON object.",
+    "Stats block cpu_stats is not a JSON object.",
+  ]
+  assert [result["state"] for result in results] == [None] * 4
+
+  summary = fleet.summarize_fleet(results)
+  assert summary["reachable"] == 0
+  assert [row["host"] for row in summary["unreachable"]][2:] == [
+    "bad-state",
+    "bad-block",
+  ]
+
+
+def test_generate_summary_report_includes_history_trends(monkeypatch):
+  metric_history = history.MetricHistory(capacity=8)
+  monkeypatch.setattr(history, "METRIC_HISTORY", metric_history)
+  monkeypatch.setattr(trend_tools, "METRIC_HISTORY", metric_history)
+  now = metric_history.now()
+  for offset, usage in ((-20, 40.0), (-10, 60.0)):
+    metric_history.record(
+      history.CPU_GROUP,
+      {"usage_percent": usage},
+      timestamp=now + offset,
+    )
+
+  context = DummyContext()
+  report = generate_summary_report(context)["data"]["report"]
+
+  assert "Trends (last 5 min):" in report
+  assert "- CPU usage: avg 50.0%, max 60.0%" in report
 
 
 def test_generate_summary_report_uses_sections():
@@ -242,3 +1354,74 @@ def test_generate_summary_report_uses_sections():
   assert "CPU:" in report
   assert "Disk:" in report
   assert "Overall:" in report
+
+  context.state["memory_stats"] = deadlines.timed_out_stats(
+    "timed out after 1500 ms"
+  )
+  report = generate_summary_report(context)["data"]["report"]
+  assert "Memory:" not in report
+  assert "Memory stats unavailable: timed out after 1500 ms." in report
+
+
+def test_background_sampler_keeps_bounded_ring_buffer(monkeypatch):
+  monkeypatch.setattr(sampler, "psutil", DummyPsutilSampler())
+  background = sampler.BackgroundSampler(interval=1.0, buffer_size=2)
+
+  background._prime()
+  first = background.sample_once()
+  background.sample_once()
+  third = background.sample_once()
+
+  snapshots = background.snapshots()
+  assert len(snapshots) == 2
+  assert snapshots[-1] is third
+  assert first not in snapshots
+  assert third.per_core_percent == [30.0, 50.0]
+  assert third.read_mb_s is not None
+  assert third.write_mb_s is not None
+
+
+def test_background_sampler_ignores_malformed_env_settings(monkeypatch):
+  monkeypatch.setattr(sampler, "psutil", DummyPsutilSampler())
+  monkeypatch.setenv(sampler.SAMPLER_INTERVAL_ENV_VAR, "abc")
+  monkeypatch.setenv(sampler.SAMPLER_BUFFER_SIZE_ENV_VAR, "-3")
+
+  try:
+    assert sampler.start_background_sampler(force=True) is True
+    background = sampler.get_background_sampler()
+  finally:
+    sampler.stop_background_sampler()
+
+  assert background.interval == sampler.DEFAULT_SAMPLER_INTERVAL
+  assert background._snapshots.maxlen == sampler.DEFAULT_SAMPLER_BUFFER_SIZE
+
+
+def test_collectors_read_latest_background_snapshot(monkeypatch):
+  stub = DummyPsutilSampler()
+  monkeypatch.setattr(sampler, "psutil", stub)
+  _use_cpu_stub(monkeypatch, stub)
+  monkeypatch.setattr(memory_tools, "psutil", stub)
+  monkeypatch.setenv(sampler.SAMPLER_INTERVAL_ENV_VAR, "60")
+
+  assert sampler.start_background_sampler() is False
+  try:
+    assert sampler.start_background_sampler(force=True) is True
+    sampler.get_background_sampler().sample_once()
+
+    context = DummyContext()
+    cpu_result = collect_cpu_stats(context)
+    memory_result = collect_memory_stats(context)
+    second_cpu_result = collect_cpu_stats(context)
+  finally:
+    sampler.stop_background_sampler()
+
+  assert cpu_result["data"]["per_core_percent"] == [30.0, 50.0]
+  assert cpu_result["data"]["usage_percent"] == 40.0
+  # The table is primed on the sampler path too, but has no delta yet.
+  assert cpu_result["data"]["top_process"] is None
+  assert cpu_result["data"]["top_process_reason"] == (
+    cpu_tools.TOP_PROCESS_PENDING_REASON
+  )
+  assert second_cpu_result["data"]["top_process"]["name"] == "beta"
+  assert memory_result["data"]["used_percent"] == 75.0
+  assert sampler.get_latest_snapshot() is None